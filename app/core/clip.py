@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import List, Sequence
+
+# -------- Sutherland–Hodgman against an axis-aligned rectangle --------
+# Polygons are flat [x0, y0, x1, y1, ...] lists (screen or lon/lat space).
+
+def _clip_edge(pts: Sequence[float], axis: int, limit: float, keep_greater: bool) -> List[float]:
+    out: List[float] = []
+    n = len(pts) // 2
+    if n == 0:
+        return out
+    px, py = pts[2 * (n - 1)], pts[2 * (n - 1) + 1]
+    p_in = (px, py)[axis] >= limit if keep_greater else (px, py)[axis] <= limit
+    for i in range(n):
+        cx, cy = pts[2 * i], pts[2 * i + 1]
+        c_in = (cx, cy)[axis] >= limit if keep_greater else (cx, cy)[axis] <= limit
+        if c_in != p_in:
+            # edge crosses the clip line: emit the intersection
+            if axis == 0:
+                t = (limit - px) / (cx - px)
+                out.extend((limit, py + t * (cy - py)))
+            else:
+                t = (limit - py) / (cy - py)
+                out.extend((px + t * (cx - px), limit))
+        if c_in:
+            out.extend((cx, cy))
+        px, py, p_in = cx, cy, c_in
+    return out
+
+def clip_polygon(pts: Sequence[float], xmin: float, ymin: float, xmax: float, ymax: float) -> List[float]:
+    """Clip a polygon to the rectangle; returns [] when nothing is left."""
+    out: List[float] = list(pts)
+    for axis, limit, keep_greater in ((0, xmin, True), (0, xmax, False), (1, ymin, True), (1, ymax, False)):
+        out = _clip_edge(out, axis, limit, keep_greater)
+        if not out:
+            break
+    return out
@@ -67,6 +67,12 @@ POINT_FILL = "#1f77b4"
 POINT_OUTLINE = "white"
 POINT_LABEL_COLOR = "#111"
 POINT_FONT = ("Arial", 16, "bold")
+# Hover/click on a site snaps to the nearest one within this many pixels
+SNAP_RADIUS_PX = 18
+POINT_HIGHLIGHT_COLOR = HOVER_FILL
+
+# Geometry, points and labels further than this outside the canvas are culled/clipped
+VIEW_MARGIN_PX = 200
 
 MARKER_COLOR = "#d33"
 MARKER_LABEL_COLOR = "#444"
@@ -75,6 +81,75 @@ MARKER_FONT = ("Arial", 9)
 
 TITLE = "Saudi Arabia Outline (Tkinter)"
 
-ANIM_STEPS = 18
+# Zoom animation is driven by wall-clock time: it always lasts ~ANIM_TOTAL_MS,
+# aiming for one frame per ANIM_FRAME_MS and dropping frames when rendering is slow
 ANIM_TOTAL_MS = 280
-TARGET_PADDING_RATIO = 0.06
\ No newline at end of file
+ANIM_FRAME_MS = 16
+ANIM_EASING = "ease_in_out_cubic"
+# While moving, draw a coarser LOD level (error budget multiplied by this)
+ANIM_FAST_RENDER = True
+ANIM_LOD_ERROR_SCALE = 4.0
+TARGET_PADDING_RATIO = 0.06
+
+# Level of detail: rings are pre-simplified (Douglas–Peucker) at these
+# tolerances in degrees; a level is drawn once its error is under LOD_MAX_ERROR_PX
+LOD_TOLERANCES = (0.002, 0.008, 0.03, 0.1)
+LOD_MAX_ERROR_PX = 0.75
+
+# Detail layers are parsed on worker threads once the main map is up
+PREFETCH_WORKERS = 2
+PREFETCH_POLL_MS = 15
+
+# Loaded detail layers kept in memory (LRU, invalidated on file mtime change)
+LAYER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Sector fills/outlines are pre-rendered with Pillow into tiles (cached on
+# disk per zoom level) and shown as one image; vector polygons are then only
+# drawn for the hovered sector. Without Pillow everything stays vector.
+RASTER_BASEMAP = True
+RASTER_TILE_PX = 512
+RASTER_MEM_TILES = 64
+# Tile PNGs under cache/tiles/, least recently used deleted beyond this many bytes
+RASTER_DISK_MAX_BYTES = 256 * 1024 * 1024
+# Animation frames only use tiles already in memory; missing ones are
+# rendered on this many worker threads
+RASTER_WORKERS = 1
+
+# New files under "CNS drawings" are picked up while the app runs: inotify on
+# Linux, else the directory mtimes are polled every DRAWINGS_POLL_S seconds.
+# The on-disk index is re-saved once changes have been quiet for DRAWINGS_SAVE_DELAY_S.
+DRAWINGS_WATCH = True
+DRAWINGS_POLL_S = 10.0
+DRAWINGS_SAVE_DELAY_S = 5.0
+
+# Popup thumbnails are decoded on worker threads; the popup shows placeholders
+# and checks for finished ones every THUMB_POLL_MS
+THUMB_WORKERS = 2
+THUMB_POLL_MS = 30
+# The site popup looks up its drawings/images/video on a worker thread and
+# checks for the result every POPUP_POLL_MS
+POPUP_POLL_MS = 15
+# Pre-scaled thumbnails (and the corner logo) are kept as PNGs under
+# cache/thumbs/, least recently used deleted beyond this many bytes
+THUMB_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Site search: results listed per keystroke, and how much of the sector
+# (as a fraction of its extent) is shown around a picked site
+SEARCH_MAX_RESULTS = 8
+SEARCH_ZOOM_FRACTION = 0.35
+
+# Frequency-reuse check (python -m app.sites --conflicts): different sites on
+# the same frequency must be SEPARATION_CO_CHANNEL_KM apart, and on frequencies
+# within one channel (SEPARATION_CHANNEL_KHZ) SEPARATION_ADJACENT_KM apart.
+# The guard frequencies every site carries are not checked.
+SEPARATION_CO_CHANNEL_KM = 300.0
+SEPARATION_ADJACENT_KM = 50.0
+SEPARATION_CHANNEL_KHZ = 25
+SEPARATION_EXEMPT_MHZ = (121.5, 243.0)
+
+# Coverage overlay (main map, toggled with the "Coverage" button): each cell
+# of a COVERAGE_CELL_DEG grid is tinted by its nearest site, with the cell
+# boundaries between sites drawn solid. The grid is cached per dataset.
+COVERAGE_CELL_DEG = 0.025
+COVERAGE_ALPHA = 70
+COVERAGE_EDGE_RGBA = (44, 62, 80, 200)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+import colorsys
+import hashlib
+import io
+import math
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Sequence, Tuple
+from . import config as C
+from .models import Bounds
+from .projection import Viewport
+from .sites import Site, SiteRegistry
+from .spatial import EARTH_RADIUS_KM
+from app.core.paths import cache_path
+
+# NumPy (optional): without it there is no coverage grid
+try:
+    import numpy as np  # type: ignore
+    _NP_AVAILABLE = True
+except Exception:
+    _NP_AVAILABLE = False
+
+# Pillow (optional): without it the grid still answers lookups, but isn't drawn
+try:
+    from PIL import Image  # type: ignore
+    _PIL_AVAILABLE = True
+except Exception:
+    _PIL_AVAILABLE = False
+
+# Whether a coverage grid can be built here (the app only offers the overlay then)
+AVAILABLE = _NP_AVAILABLE
+
+# Nearest-site (Voronoi) grid.
+#
+# The main map's bounds are cut into square cells of COVERAGE_CELL_DEG; row 0
+# is the northernmost. Each cell stores the site closest to its centre by
+# great-circle distance and that distance, so "which site serves this
+# position" is one array read. Cells whose nearest site differs from the
+# next cell's (right or below) trace the Voronoi boundaries.
+#
+# Haversine separates over a lon/lat grid: for one site,
+#   h = sin^2(dlat/2) + cos(lat) cos(lat_s) sin^2(dlon/2)
+# is a per-row term plus a per-row factor times a per-column term, so each
+# site costs one multiply-add per cell, and only h (monotonic in distance)
+# is compared until the winner's distance is taken.
+#
+# Grids are saved as cache/coverage/<dataset version>-<digest>.npz, the
+# digest covering the bounds and cell size; other versions are removed.
+
+# bump when grids are computed differently, so old files aren't reused
+COVERAGE_VERSION = 1
+
+
+def site_color(site_id: int) -> Tuple[int, int, int]:
+    """A colour per site, with neighbouring ids far apart in hue."""
+    r, g, b = colorsys.hsv_to_rgb((site_id * 0.618033988749895) % 1.0, 0.55, 0.95)
+    return int(r * 255), int(g * 255), int(b * 255)
+
+
+class CoverageGrid:
+    """Nearest site id (-1: none) and its distance in km for every cell of `bounds`."""
+
+    def __init__(self, bounds: Bounds, cell_deg: float, nearest: "np.ndarray", dist_km: "np.ndarray",
+                 version: str = "") -> None:
+        self.bounds = bounds
+        self.cell_deg = cell_deg
+        self.nearest = nearest
+        self.dist_km = dist_km
+        self.version = version
+        self.rows, self.cols = nearest.shape
+        self._image: Optional["Image.Image"] = None
+
+    # ---- building ----
+    @classmethod
+    def build(cls, sites: Sequence[Site], bounds: Bounds, cell_deg: float, version: str = "") -> "CoverageGrid":
+        cols = max(1, math.ceil((bounds.max_lon - bounds.min_lon) / cell_deg))
+        rows = max(1, math.ceil((bounds.max_lat - bounds.min_lat) / cell_deg))
+        # cells start at the top-left corner; the last row/column may overhang
+        grid = Bounds(bounds.min_lon, bounds.min_lon + cols * cell_deg, bounds.max_lat - rows * cell_deg, bounds.max_lat)
+        lam = np.radians(grid.min_lon + (np.arange(cols) + 0.5) * cell_deg)
+        phi = np.radians(grid.max_lat - (np.arange(rows) + 0.5) * cell_deg)
+        cos_phi = np.cos(phi)
+
+        best = np.full((rows, cols), np.inf)
+        nearest = np.full((rows, cols), -1, dtype=np.int32)
+        h = np.empty((rows, cols))
+        for s in sites:
+            ps, ls = math.radians(s.lat), math.radians(s.lon)
+            a = np.sin((phi - ps) / 2) ** 2
+            k = cos_phi * math.cos(ps)
+            b = np.sin((lam - ls) / 2) ** 2
+            np.multiply(k[:, None], b[None, :], out=h)
+            h += a[:, None]
+            closer = h < best
+            best[closer] = h[closer]
+            nearest[closer] = s.id
+        dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(best, 0.0, 1.0)))
+        return cls(grid, cell_deg, nearest, dist.astype(np.float32), version)
+
+    # ---- lookups ----
+    def cell_of(self, lon: float, lat: float) -> Optional[Tuple[int, int]]:
+        """(row, col) of the cell holding (lon, lat), or None outside the grid."""
+        c = int((lon - self.bounds.min_lon) / self.cell_deg)
+        r = int((self.bounds.max_lat - lat) / self.cell_deg)
+        if lon < self.bounds.min_lon or lat > self.bounds.max_lat or c >= self.cols or r >= self.rows:
+            return None
+        return r, c
+
+    def at(self, lon: float, lat: float) -> Optional[Tuple[int, float]]:
+        """(nearest site id, km from the cell centre to it) for (lon, lat), or None."""
+        rc = self.cell_of(lon, lat)
+        if rc is None or self.nearest[rc] < 0:
+            return None
+        return int(self.nearest[rc]), float(self.dist_km[rc])
+
+    def boundaries(self) -> "np.ndarray":
+        """rows x cols mask of cells on a Voronoi boundary (nearest site differs to the right or below)."""
+        edge = np.zeros(self.nearest.shape, dtype=bool)
+        edge[:, :-1] |= self.nearest[:, :-1] != self.nearest[:, 1:]
+        edge[:-1, :] |= self.nearest[:-1, :] != self.nearest[1:, :]
+        return edge
+
+    # ---- drawing ----
+    def image(self) -> "Image.Image":
+        """RGBA, one pixel per cell: translucent site colours with opaque boundaries."""
+        if self._image is None:
+            n = int(self.nearest.max()) + 1
+            palette = np.zeros((n + 1, 4), dtype=np.uint8)  # last entry: no site
+            for i in range(n):
+                palette[i] = (*site_color(i), C.COVERAGE_ALPHA)
+            rgba = palette[self.nearest]
+            rgba[self.boundaries() & (self.nearest >= 0)] = C.COVERAGE_EDGE_RGBA
+            self._image = Image.fromarray(rgba, "RGBA")
+        return self._image
+
+    def render_view(self, vp: Viewport, fast: bool = False) -> "Image.Image":
+        """The overlay for a whole canvas (vp.width x vp.height) at this view; transparent off the grid."""
+        sx, sy = vp.scale
+        lon_left = vp.bounds.min_lon - vp.padding / sx
+        lat_top = vp.bounds.max_lat + vp.padding / sy
+        x0 = (lon_left - self.bounds.min_lon) / self.cell_deg
+        y0 = (self.bounds.max_lat - lat_top) / self.cell_deg
+        x1 = x0 + vp.width / sx / self.cell_deg
+        y1 = y0 + vp.height / sy / self.cell_deg
+        resample = Image.NEAREST if fast else Image.BILINEAR
+        return self.image().transform((vp.width, vp.height), Image.EXTENT, (x0, y0, x1, y1), resample)
+
+    # ---- storage ----
+    def save(self, path: Path) -> None:
+        buf = io.BytesIO()
+        b = self.bounds
+        np.savez_compressed(buf, nearest=self.nearest, dist_km=self.dist_km,
+                            grid=np.array([b.min_lon, b.max_lon, b.min_lat, b.max_lat, self.cell_deg]))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(buf.getvalue())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, version: str = "") -> "CoverageGrid":
+        with np.load(path) as f:
+            g = f["grid"].tolist()
+            return cls(Bounds(*g[:4]), g[4], f["nearest"], f["dist_km"], version)
+
+
+def coverage_grid(registry: SiteRegistry, bounds: Bounds, cell_deg: float = C.COVERAGE_CELL_DEG) -> CoverageGrid:
+    """The grid for these sites over `bounds`, from cache/coverage/ if built before for this dataset version."""
+    digest = hashlib.sha1(repr(
+        (bounds.min_lon, bounds.max_lon, bounds.min_lat, bounds.max_lat, cell_deg, len(registry), COVERAGE_VERSION)
+    ).encode("utf-8")).hexdigest()[:16]
+    path = cache_path("coverage", f"{registry.version}-{digest}.npz")
+    if registry.version:
+        try:
+            return CoverageGrid.load(path, registry.version)
+        except (OSError, ValueError, KeyError):
+            pass
+    grid = CoverageGrid.build(registry.sites, bounds, cell_deg, registry.version)
+    if registry.version:
+        try:
+            grid.save(path)
+            for old in path.parent.glob("*.npz"):
+                if not old.name.startswith(f"{registry.version}-"):
+                    old.unlink()
+        except OSError:
+            pass
+    return grid
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = Lock()
+
+def coverage_grid_async(registry: SiteRegistry, bounds: Bounds) -> "Future[CoverageGrid]":
+    """coverage_grid() on a background thread (NumPy releases the GIL for the heavy part)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="coverage")
+        return _pool.submit(coverage_grid, registry, bounds)
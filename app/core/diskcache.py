@@ -0,0 +1,101 @@
+from __future__ import annotations
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+# Pillow (optional): the caches built on this are only used when it is there
+try:
+    from PIL import Image  # type: ignore
+    _PIL_AVAILABLE = True
+except Exception:
+    _PIL_AVAILABLE = False
+
+# Images kept as PNGs under one directory, by name: "a/b" is stored as
+# a/b.png. A file's mtime is its last use; once the directory outgrows its
+# byte budget the least recently used go (with the directories they leave
+# empty). Files are written to a temporary name and renamed into place, so
+# a reader never sees half a PNG, and what is on disk is scanned once per
+# process, so a new process picks up the old one's order.
+
+
+class PngDiskCache:
+    """PNG images on disk by name, LRU within `max_bytes` (thread-safe)."""
+
+    def __init__(self, max_bytes: int, directory: Path) -> None:
+        self.max_bytes = max_bytes
+        self.dir = Path(directory)
+        self._lock = Lock()
+        self._entries: Optional["OrderedDict[str, int]"] = None  # name -> bytes, least recent first
+        self._total = 0
+
+    def path(self, name: str) -> Path:
+        return self.dir / f"{name}.png"
+
+    def get(self, name: str) -> Optional["Image.Image"]:
+        path = self.path(name)
+        try:
+            with Image.open(path) as img:
+                img.load()
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            entries = self._scan()
+            if name in entries:
+                entries.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return img
+
+    def put(self, name: str, img: "Image.Image") -> None:
+        dst = self.path(name)
+        try:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+            img.save(tmp, format="PNG")
+            os.replace(tmp, dst)
+            size = dst.stat().st_size
+        except OSError:
+            return
+        with self._lock:
+            entries = self._scan()
+            self._total += size - entries.pop(name, 0)
+            entries[name] = size
+            while self._total > self.max_bytes and len(entries) > 1:
+                old, old_size = entries.popitem(last=False)
+                self._total -= old_size
+                self._remove(old)
+
+    def _remove(self, name: str) -> None:
+        path = self.path(name)
+        try:
+            os.remove(path)
+            for parent in path.parents:
+                if parent == self.dir:
+                    break
+                os.rmdir(parent)
+        except OSError:
+            pass
+
+    def _scan(self) -> "OrderedDict[str, int]":
+        # what is on disk, oldest use first (once per process; later kept up to date here)
+        if self._entries is None:
+            found = []
+            for top, _dirs, files in os.walk(self.dir):
+                for fname in files:
+                    if not fname.endswith(".png"):
+                        continue
+                    path = os.path.join(top, fname)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    name = Path(path).relative_to(self.dir).with_suffix("").as_posix()
+                    found.append((st.st_mtime_ns, name, st.st_size))
+            found.sort()
+            self._entries = OrderedDict((name, size) for _m, name, size in found)
+            self._total = sum(self._entries.values())
+        return self._entries
@@ -0,0 +1,465 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from .text import normalize
+from app.core.paths import cache_path, drawings_root
+
+# Index of the "CNS drawings" tree.
+#
+# The tree is listed once with os.scandir and kept as one record per
+# directory (its mtime, relevant files and subdirectories). The records are
+# saved under cache/drawings/; on the next start only directories whose mtime
+# changed are listed again, since adding, removing or renaming an entry
+# always touches its parent directory's mtime.
+#
+# From the records we derive, in memory: every file in os.walk order, files
+# by kind, normalized-token postings and video files by stem. The popup's
+# lookups (site/equipment drawing, frequency images, rack video) keep their
+# original scoring but only ever look at candidates from these maps.
+#
+# While the app runs, a DrawingsWatcher (app/core/watch.py) feeds single
+# entry additions and removals to add_entry()/remove_entry(), which update
+# the maps in place instead of listing anything again.
+
+INDEX_VERSION = 1
+
+KIND_EXTS: Dict[str, Tuple[str, ...]] = {
+    "pdf": (".pdf",),
+    "image": (".png", ".jpg", ".jpeg"),
+    "video": (".mp4", ".mkv", ".avi", ".mov", ".webm"),
+}
+_KIND_OF_EXT = {ext: kind for kind, exts in KIND_EXTS.items() for ext in exts}
+
+FREQ_DIR = "freq"
+VIDEO_DIR = "videos"
+
+# leading articles skipped in site names ("Al Jouf" matches "jouf")
+_SITE_STOPWORDS = {"al", "el"}
+SITE_ROOM_KW = ["equipment room", "rack room", "room layout", "shelter layout", "layout"]
+SITE_EXCLUDE_KW = ["radio", "radios", "front", "back", "r&s", "rack front", "elevation"]
+EQUIP_INCLUDE_KW = ["radio", "radios", "elevation", "front", "back", "rack front", "rcag", "equipment"]
+EQUIP_EXCLUDE_KW = ["room layout", "equipment room", "rack room", "shelter layout", "layout"]
+
+
+def kind_of(filename: str) -> Optional[str]:
+    return _KIND_OF_EXT.get(os.path.splitext(filename)[1].lower())
+
+
+class DrawingFile(NamedTuple):
+    path: str       # root joined with the relative path, as os.walk would report it
+    rel_dir: str    # directory relative to the root ("" for the root itself)
+    name: str
+    norm: str       # normalize(name)
+    kind: str       # "pdf" | "image" | "video"
+    order: Tuple[int, ...]  # sorts in os.walk order (keeps the original tie-breaking)
+
+
+class _DirRecord(NamedTuple):
+    mtime_ns: int
+    files: List[str]    # names of indexed files, in scandir order
+    subdirs: List[str]  # names, in scandir order
+
+
+class DrawingsIndex:
+    """Persistent, incrementally refreshed index of a drawings tree."""
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = Path(root) if root is not None else drawings_root()
+        self._base = os.fspath(self.root)
+        self._dirs: Dict[str, _DirRecord] = {}
+        self._lock = threading.RLock()
+        # set while a watcher is applying changes, so nobody needs to poll
+        self.live = False
+        self._reset_derived()
+
+    # ---- persistence ----
+    def _cache_file(self) -> Path:
+        digest = hashlib.sha1(os.fsencode(self.root.resolve())).hexdigest()[:16]
+        return cache_path("drawings", f"index-{digest}.json")
+
+    @classmethod
+    def load(cls, root: Optional[Path] = None) -> "DrawingsIndex":
+        """Index from the on-disk cache, brought up to date (and re-saved) if the tree changed."""
+        index = cls(root)
+        try:
+            data = json.loads(index._cache_file().read_text(encoding="utf-8"))
+            if data.get("version") == INDEX_VERSION and data.get("root") == index._base:
+                records = {rel: _DirRecord(int(m), list(f), list(d)) for rel, (m, f, d) in data["dirs"].items()}
+                for rel in _walk(records):
+                    index._set_dir(rel, records[rel])
+        except (OSError, ValueError, KeyError, TypeError):
+            index._dirs = {}
+            index._reset_derived()
+        if index.refresh() or not index._dirs:
+            index.save()
+        return index
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": INDEX_VERSION,
+                "root": self._base,
+                "dirs": {rel: [r.mtime_ns, r.files, r.subdirs] for rel, r in self._dirs.items()},
+            }
+        dst = self._cache_file()
+        try:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, dst)
+        except OSError:
+            pass
+
+    # ---- scanning ----
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self._base, rel) if rel else self._base
+
+    def _scan_dir(self, rel: str) -> Optional[_DirRecord]:
+        path = self._abs(rel)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            files: List[str] = []
+            subdirs: List[str] = []
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            # like os.walk: symlinked directories are listed but not entered
+                            if not entry.is_symlink():
+                                subdirs.append(entry.name)
+                        elif kind_of(entry.name) is not None and entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return _DirRecord(mtime_ns, files, subdirs)
+
+    def refresh(self) -> bool:
+        """Re-list directories whose mtime changed (new ones fully); returns True if anything did."""
+        with self._lock:
+            changed, listed = self._validate("")
+            seen = set(listed)
+            for rel in [r for r in self._dirs if r not in seen]:
+                self._drop_tree(rel)
+                changed = True
+            return changed
+
+    def _validate(self, top: str) -> Tuple[bool, List[str]]:
+        """Bring the subtree at `top` up to date; returns (changed, its directories)."""
+        changed = False
+        seen: List[str] = []
+        stack = [top]
+        while stack:
+            rel = stack.pop()
+            rec = self._dirs.get(rel)
+            try:
+                mtime_ns = os.stat(self._abs(rel)).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if mtime_ns is not None and (rec is None or rec.mtime_ns != mtime_ns):
+                rec = self._scan_dir(rel)
+                if rec is not None:
+                    self._set_dir(rel, rec)
+                changed = True
+            if mtime_ns is None or rec is None:
+                if rel in self._dirs:
+                    self._drop_tree(rel)
+                    changed = True
+                continue
+            seen.append(rel)
+            stack.extend(_join(rel, d) for d in rec.subdirs)
+        return changed, seen
+
+    # ---- deltas ----
+    # Applied as the watcher reports them. Record mtimes are left alone, so a
+    # later refresh() (next start, or after lost events) still re-lists every
+    # directory that changed.
+    def add_entry(self, rel_dir: str, name: str, is_dir: bool) -> List[str]:
+        """`name` appeared in `rel_dir`; returns the directories that became indexed."""
+        with self._lock:
+            rec = self._dirs.get(rel_dir)
+            if rec is None:
+                return []
+            path = os.path.join(self._abs(rel_dir), name)
+            if is_dir:
+                if name in rec.subdirs or os.path.islink(path):
+                    return []
+                self._set_dir(rel_dir, rec._replace(subdirs=rec.subdirs + [name]))
+                return self._validate(_join(rel_dir, name))[1]
+            if name not in rec.files and kind_of(name) is not None and os.path.isfile(path):
+                self._set_dir(rel_dir, rec._replace(files=rec.files + [name]))
+            return []
+
+    def remove_entry(self, rel_dir: str, name: str, is_dir: bool) -> List[str]:
+        """`name` left `rel_dir`; returns the directories that stopped being indexed."""
+        with self._lock:
+            rec = self._dirs.get(rel_dir)
+            if rec is None:
+                return []
+            if is_dir:
+                if name not in rec.subdirs:
+                    return []
+                gone = list(_walk(self._dirs, _join(rel_dir, name)))
+                self._set_dir(rel_dir, rec._replace(subdirs=[d for d in rec.subdirs if d != name]))
+                return gone
+            if name in rec.files:
+                self._set_dir(rel_dir, rec._replace(files=[f for f in rec.files if f != name]))
+            return []
+
+    def revalidate(self, rels: Iterable[str]) -> List[str]:
+        """refresh() limited to the subtrees at `rels`; returns their directories."""
+        with self._lock:
+            out: List[str] = []
+            for rel in rels:
+                if rel in self._dirs:
+                    out.extend(self._validate(rel)[1])
+            return out
+
+    def stale(self) -> bool:
+        """True if a directory's mtime moved since it was listed (stats without holding the lock)."""
+        with self._lock:
+            known = [(rel, rec.mtime_ns) for rel, rec in self._dirs.items()]
+        for rel, mtime_ns in known:
+            try:
+                if os.stat(self._abs(rel)).st_mtime_ns != mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return not known
+
+    def directories(self) -> List[str]:
+        """Indexed directories (relative to the root), in walk order."""
+        with self._lock:
+            return list(_walk(self._dirs))
+
+    # ---- derived lookups ----
+    # Kept up to date file by file as records change. A file's `order` is its
+    # directory's key followed by (-1, slot), and a subdirectory's key is its
+    # parent's followed by (slot,), with slots handed out per directory in
+    # listing order; sorting by `order` then reproduces os.walk order (a
+    # directory's files before anything in its subdirectories). Entries that
+    # arrive later sort after their siblings.
+    def _reset_derived(self) -> None:
+        self._files: Dict[str, DrawingFile] = {}
+        self._by_kind: Dict[str, Dict[str, DrawingFile]] = {k: {} for k in KIND_EXTS}
+        self._postings: Dict[str, Set[str]] = {}
+        self._videos_by_stem: Dict[str, Dict[str, DrawingFile]] = {}
+        self._substr_memo: Dict[str, Set[str]] = {}
+        self._sorted: Dict[Optional[str], List[DrawingFile]] = {}
+        self._dir_keys: Dict[str, Tuple[int, ...]] = {"": ()}
+        self._slots: Dict[str, int] = {}
+
+    def _slot(self, rel: str) -> int:
+        n = self._slots.get(rel, 0)
+        self._slots[rel] = n + 1
+        return n
+
+    def _set_dir(self, rel: str, rec: _DirRecord) -> None:
+        """Store `rec` for `rel`, indexing new files and dropping what disappeared."""
+        old = self._dirs.get(rel)
+        self._dirs[rel] = rec
+        old_files = set(old.files) if old is not None else set()
+        old_subdirs = set(old.subdirs) if old is not None else set()
+        if old is not None:
+            new_files, new_subdirs = set(rec.files), set(rec.subdirs)
+            for name in old.files:
+                if name not in new_files:
+                    self._remove_file(os.path.join(self._abs(rel), name))
+            for d in old.subdirs:
+                if d not in new_subdirs:
+                    self._drop_tree(_join(rel, d))
+        key = self._dir_keys[rel]
+        for name in rec.files:
+            if name not in old_files:
+                self._add_file(rel, name, key + (-1, self._slot(rel)))
+        for d in rec.subdirs:
+            if d not in old_subdirs:
+                self._dir_keys[_join(rel, d)] = key + (self._slot(rel),)
+
+    def _drop_tree(self, top: str) -> None:
+        for rel in list(_walk(self._dirs, top)):
+            for name in self._dirs.pop(rel).files:
+                self._remove_file(os.path.join(self._abs(rel), name))
+            self._slots.pop(rel, None)
+        prefix = top + os.sep if top else ""
+        for rel in [r for r in self._dir_keys if r and (r == top or r.startswith(prefix))]:
+            del self._dir_keys[rel]
+
+    def _add_file(self, rel: str, name: str, order: Tuple[int, ...]) -> None:
+        kind = kind_of(name)
+        if kind is None:
+            return
+        f = DrawingFile(os.path.join(self._abs(rel), name), rel, name, normalize(name), kind, order)
+        self._files[f.path] = f
+        self._by_kind[kind][f.path] = f
+        for tok in set(f.norm.split()):
+            self._postings.setdefault(tok, set()).add(f.path)
+        if kind == "video" and _under(rel, VIDEO_DIR):
+            self._videos_by_stem.setdefault(os.path.splitext(name)[0], {})[f.path] = f
+        for needle, hits in self._substr_memo.items():
+            if needle in f.norm:
+                hits.add(f.path)
+        self._sorted.clear()
+
+    def _remove_file(self, path: str) -> None:
+        f = self._files.pop(path, None)
+        if f is None:
+            return
+        del self._by_kind[f.kind][path]
+        for tok in set(f.norm.split()):
+            post = self._postings.get(tok)
+            if post is not None:
+                post.discard(path)
+                if not post:
+                    del self._postings[tok]
+        stem = os.path.splitext(f.name)[0]
+        videos = self._videos_by_stem.get(stem)
+        if videos is not None:
+            videos.pop(path, None)
+            if not videos:
+                del self._videos_by_stem[stem]
+        for hits in self._substr_memo.values():
+            hits.discard(path)
+        self._sorted.clear()
+
+    def files(self, kind: Optional[str] = None) -> List[DrawingFile]:
+        """Indexed files (of one kind), in walk order."""
+        with self._lock:
+            out = self._sorted.get(kind)
+            if out is None:
+                out = self._files if kind is None else self._by_kind.get(kind, {})
+                out = self._sorted[kind] = sorted(out.values(), key=_order)
+            return list(out)
+
+    def containing(self, needle: str, kind: Optional[str] = None) -> List[DrawingFile]:
+        """Files whose normalized name contains `needle` as a substring, in walk order."""
+        with self._lock:
+            if not needle:
+                return self.files(kind)
+            if needle != normalize(needle) or " " in needle:
+                # spans several tokens (or can't match a token): check the names themselves
+                hits: Iterable[str] = [p for p, f in self._files.items() if needle in f.norm]
+            else:
+                hits = self._substr_memo.get(needle)
+                if hits is None:
+                    # a single-token needle can only occur inside one token: scan the vocabulary, not the files
+                    found: Set[str] = set()
+                    for tok, post in self._postings.items():
+                        if needle in tok:
+                            found.update(post)
+                    hits = self._substr_memo[needle] = found
+            out = [self._files[p] for p in hits]
+            return sorted((f for f in out if kind is None or f.kind == kind), key=_order)
+
+    def _candidates(self, tokens: Iterable[str], kind: str) -> List[DrawingFile]:
+        found: Dict[str, DrawingFile] = {}
+        for t in tokens:
+            if t:
+                found.update((f.path, f) for f in self.containing(t, kind))
+        return sorted(found.values(), key=_order)
+
+    # ---- popup lookups ----
+    @staticmethod
+    def site_tokens(site_id: str) -> List[str]:
+        return [t for t in normalize(str(site_id)).split() if t not in _SITE_STOPWORDS] or [site_id]
+
+    def _best_pdf(self, site_id: str, include_kw: List[str], exclude_kw: List[str]) -> Optional[str]:
+        """Highest-scoring PDF naming the site (3 per token, 2 per keyword, shorter names first)."""
+        tokens = self.site_tokens(site_id)
+        best, best_score = None, -1.0
+        for f in self._candidates(tokens, "pdf"):
+            if any(ex in f.norm for ex in exclude_kw):
+                continue
+            token_hits = sum(1 for t in tokens if t and t in f.norm)
+            if token_hits == 0:
+                continue
+            score = token_hits * 3 + sum(2 for kw in include_kw if kw in f.norm) - (len(f.norm) / 200.0)
+            if score > best_score:
+                best_score, best = score, f.path
+        if best is None:
+            # anything naming every token, even if excluded above
+            for f in self._candidates(tokens[:1], "pdf"):
+                if all(t in f.norm for t in tokens):
+                    return f.path
+        return best
+
+    def site_drawing(self, site_id: str) -> Optional[str]:
+        return self._best_pdf(site_id, SITE_ROOM_KW, SITE_EXCLUDE_KW)
+
+    def equipment_drawing(self, site_id: str) -> Optional[str]:
+        return self._best_pdf(site_id, EQUIP_INCLUDE_KW, EQUIP_EXCLUDE_KW)
+
+    def frequency_images(self, site_id: str, limit: int = 1) -> List[str]:
+        """
+        Images naming the site, best first; images under freq/ always score
+        at least 0.1, so with no match the best of those is returned.
+        """
+        tokens = [t for t in normalize(site_id).split() if t]
+
+        def score(f: DrawingFile) -> float:
+            site_hits = sum(1 for t in tokens if t in f.norm)
+            kw_hits = 1 if site_id in f.norm else 0
+            s = site_hits * 3 + kw_hits * 2 - (len(f.norm) / 300.0)
+            if s <= 0 and _under(f.rel_dir, FREQ_DIR):
+                s = 0.1
+            return s
+
+        scored = [(score(f), f) for f in self._candidates(tokens, "image")]
+        if sum(1 for s, _f in scored if s > 0.1) < limit:
+            # not enough real matches: fall back to ranking every image, as a full scan would
+            scored = [(score(f), f) for f in self.files("image")]
+        # ties go to freq/ first (it used to be searched before the rest of the tree), then walk order
+        scored.sort(key=lambda x: (-x[0], x[1].name, not _under(x[1].rel_dir, FREQ_DIR), x[1].order))
+        return [f.path for _s, f in scored[:limit]]
+
+    def rack_video(self, site_id: str) -> Optional[str]:
+        """First video under videos/ whose file stem is exactly `site_id`."""
+        with self._lock:
+            hits = self._videos_by_stem.get(site_id.strip())
+            return min(hits.values(), key=_order).path if hits else None
+
+
+def _under(rel: str, top: str) -> bool:
+    return rel == top or rel.startswith(top + os.sep)
+
+def _join(rel: str, name: str) -> str:
+    return os.path.join(rel, name) if rel else name
+
+def _order(f: DrawingFile) -> Tuple[int, ...]:
+    return f.order
+
+def _walk(dirs: Dict[str, _DirRecord], rel: str = "") -> Iterator[str]:
+    # os.walk (top-down) order: a directory, then each subdirectory in turn
+    rec = dirs.get(rel)
+    if rec is None:
+        return
+    yield rel
+    for d in rec.subdirs:
+        yield from _walk(dirs, _join(rel, d))
+
+
+# -------- Shared instance --------
+# without a watcher, re-validate directory mtimes at most this often (a stat per directory, no listing)
+REVALIDATE_S = 5.0
+
+_index: Optional[DrawingsIndex] = None
+_index_checked = 0.0
+_index_lock = threading.Lock()
+
+def drawings_index() -> DrawingsIndex:
+    """The process-wide index of drawings_root(), loaded on first use and kept up to date."""
+    global _index, _index_checked
+    with _index_lock:
+        now = time.monotonic()
+        if _index is None:
+            _index = DrawingsIndex.load()
+        elif not _index.live and now - _index_checked >= REVALIDATE_S and _index.refresh():
+            _index.save()
+        _index_checked = now
+        return _index
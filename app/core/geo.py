@@ -1,23 +1,57 @@
 from __future__ import annotations
 import json
+import re
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
-from .models import Bounds, Ring, PointFeature
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from .models import Bounds, Ring, PointFeature, GeometryStore, GeometryBuilder, RingView, Layer
+from . import geocache
+from . import config as C
+from .simplify import LodPyramid
+from .spatial import SiteIndex
+from .labels import pole_anchors
 from app.core.paths import config_path
 
+# NumPy (optional) for vectorised bounds/centroid math over the flat buffers
+try:
+    import numpy as np  # type: ignore
+    _NP_AVAILABLE = True
+except Exception:
+    _NP_AVAILABLE = False
 
 # Optional: default GeoJSON file in /config
 DEFAULT_GEOJSON = config_path("sa_combined.json")
 
 # -------- GeoJSON iteration helpers --------
-def iter_rings(geometry: Dict[str, Any]) -> Iterable[Ring]:
-    """Yield rings from a GeoJSON Polygon; holes ignored for simplicity."""
+def _valid_ring(ring: Any) -> bool:
+    return isinstance(ring, list) and all(
+        isinstance(pt, list) and len(pt) >= 2
+        and isinstance(pt[0], (int, float)) and isinstance(pt[1], (int, float))
+        for pt in ring
+    )
+
+def iter_polygons(geometry: Dict[str, Any]) -> Iterable[List[list]]:
+    """Yield each polygon of a Polygon/MultiPolygon as its raw rings (shell first, then holes)."""
     gtype = geometry.get("type")
     coords = geometry.get("coordinates", [])
-    if gtype == "Polygon" and isinstance(coords, list):
-        for ring in coords:
-            if isinstance(ring, list) and all(isinstance(pt, list) and len(pt) == 2 for pt in ring):
-                yield [(float(pt[0]), float(pt[1])) for pt in ring]
+    if not isinstance(coords, list):
+        return
+    if gtype == "Polygon":
+        polys = [coords]
+    elif gtype == "MultiPolygon":
+        polys = coords
+    else:
+        return
+    for poly in polys:
+        if isinstance(poly, list):
+            rings = [ring for ring in poly if _valid_ring(ring)]
+            if rings:
+                yield rings
+
+def iter_rings(geometry: Dict[str, Any]) -> Iterable[Ring]:
+    """Yield every ring (shells and holes) of a Polygon/MultiPolygon."""
+    for rings in iter_polygons(geometry):
+        for ring in rings:
+            yield [(float(pt[0]), float(pt[1])) for pt in ring]
 
 def iter_points(feature: Dict[str, Any]) -> Iterable[PointFeature]:
     geom = feature.get("geometry", {})
@@ -32,51 +66,412 @@ def iter_points(feature: Dict[str, Any]) -> Iterable[PointFeature]:
         lon, lat = float(coords[0]), float(coords[1])
         yield (lon, lat, site, sector_id, freq, power)
 
-# -------- Loaders --------
-def load_geo_from_json(path: Path | str) -> Tuple[List[Ring], List[PointFeature]]:
-    """Load rings (Polygons) and points (Point) from a FeatureCollection."""
-    path = Path(path)  # allow either Path or string
+# -------- Streaming reader --------
+_TOKEN = re.compile(r'["{}\[\]]')
+_STR_TOKEN = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[\s,\]}]')
+_WS = re.compile(r'[ \t\n\r]*')
+
+def iter_features(path: Path | str, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the features of a FeatureCollection one at a time.
+    Only the feature being decoded is held in memory, so peak memory tracks
+    the largest single feature rather than the whole file.
+    """
+    path = Path(path)
     with path.open("r", encoding="utf-8") as f:
-        gj = json.load(f)
+        yield from _FeatureReader(f, chunk_size)
+
+class _FeatureReader:
+    """Incremental scanner over the top-level "features" array of a GeoJSON file."""
+
+    def __init__(self, f: TextIO, chunk_size: int) -> None:
+        self._f = f
+        self._chunk = max(1, chunk_size)
+        self._buf = ""
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        i = self._find_features_array()
+        if i is None:
+            return
+        while True:
+            i = self._skip_ws(i)
+            ch = self._char(i)
+            if ch == ",":
+                i += 1
+                continue
+            if ch == "]":
+                return
+            if ch == "":
+                raise ValueError("Unexpected end of GeoJSON inside 'features'")
+            end = self._value_end(i)
+            feat = json.loads(self._buf[i:end])
+            # drop everything consumed so far; the buffer never outgrows one feature
+            self._buf = self._buf[end:]
+            i = 0
+            if isinstance(feat, dict):
+                yield feat
+
+    # ---- buffer ----
+    def _more(self) -> bool:
+        # grow geometrically so one huge feature doesn't cost O(n^2) in appends
+        data = self._f.read(max(self._chunk, len(self._buf)))
+        if not data:
+            return False
+        self._buf += data
+        return True
+
+    def _char(self, i: int) -> str:
+        while i >= len(self._buf):
+            if not self._more():
+                return ""
+        return self._buf[i]
+
+    def _skip_ws(self, i: int) -> int:
+        while True:
+            i = _WS.match(self._buf, i).end() if i < len(self._buf) else i
+            if i < len(self._buf) or not self._more():
+                return i
+
+    # ---- scanning (indices stay valid: the buffer only grows while scanning) ----
+    def _string_end(self, i: int) -> int:
+        j = i + 1
+        while True:
+            m = _STR_TOKEN.search(self._buf, j)
+            if m is None:
+                j = max(j, len(self._buf))
+                if not self._more():
+                    raise ValueError("Unterminated string in GeoJSON")
+                continue
+            if m.group() == '"':
+                return m.end()
+            j = m.end() + 1  # skip the escaped character
+
+    def _value_end(self, i: int) -> int:
+        ch = self._buf[i]
+        if ch == '"':
+            return self._string_end(i)
+        if ch not in "{[":
+            while True:
+                m = _SCALAR_END.search(self._buf, i)
+                if m is not None:
+                    return m.start()
+                i = len(self._buf)
+                if not self._more():
+                    return i
+        depth = 0
+        while True:
+            m = _TOKEN.search(self._buf, i)
+            if m is None:
+                i = max(i, len(self._buf))
+                if not self._more():
+                    raise ValueError("Unexpected end of GeoJSON")
+                continue
+            c = m.group()
+            if c == '"':
+                i = self._string_end(m.start())
+                continue
+            i = m.end()
+            if c in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return i
+
+    def _find_features_array(self) -> Optional[int]:
+        """Advance past the '[' of the root object's "features" member; None if there is none."""
+        i = self._skip_ws(0)
+        if self._char(i) != "{":
+            raise ValueError("GeoJSON root must be an object")
+        i += 1
+        depth = 1
+        while True:
+            m = _TOKEN.search(self._buf, i)
+            if m is None:
+                i = max(i, len(self._buf))
+                if not self._more():
+                    return None
+                continue
+            c = m.group()
+            if c == '"':
+                end = self._string_end(m.start())
+                i = end
+                if depth == 1:
+                    j = self._skip_ws(end)
+                    if self._char(j) == ":":
+                        key = json.loads(self._buf[m.start():end])
+                        j = self._skip_ws(j + 1)
+                        if key == "features" and self._char(j) == "[":
+                            self._buf = self._buf[j + 1:]
+                            return 0
+                        i = j
+                continue
+            i = m.end()
+            if c in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return None
+
+# -------- Loaders --------
+def load_geo_from_json(path: Path | str, use_cache: bool = True) -> Tuple[GeometryStore, List[PointFeature]]:
+    """
+    Load rings (Polygon/MultiPolygon) and points (Point) from a FeatureCollection.
+    The first load compiles the file into a binary cache (see geocache);
+    later loads memory-map that instead of parsing JSON.
+    """
+    store, points, _anchors, _lod = _load_compiled(Path(path), use_cache, want_anchors=False)
+    return store, points
+
+def _load_compiled(path: Path, use_cache: bool = True, want_anchors: bool = True, want_lod: bool = False
+                   ) -> Tuple[GeometryStore, List[PointFeature], Dict[int, Tuple[float, float]], Optional[LodPyramid]]:
+    # label anchors and LOD levels depend only on the geometry: computed once, then
+    # cached with it (anchors not at all when they would be neither cached nor returned)
+    if use_cache:
+        cached = geocache.read_cache(path)
+        if cached is not None:
+            store, points, anchors, levels = cached
+            if not want_lod or not store.n_vertices:
+                return store, points, anchors, None
+            if levels is not None and levels[0] == _lod_tolerances():
+                return store, points, anchors, LodPyramid.from_levels(
+                    store, levels[0], levels[1], C.LOD_MAX_ERROR_PX)
+            # cached without levels (or for other tolerances): build them and re-cache
+            lod = _build_lod(store)
+            geocache.write_cache(path, store, points, anchors, (lod.tolerances, lod.levels[1:]))
+            return store, points, anchors, lod
+
+    store, points = _parse_geojson(path)
+    anchors = pole_anchors(store) if use_cache or want_anchors else {}
+    lod = _build_lod(store) if want_lod and store.n_vertices else None
+    if use_cache:
+        geocache.write_cache(path, store, points, anchors,
+                             None if lod is None else (lod.tolerances, lod.levels[1:]))
+    return store, points, anchors, lod
+
+def _lod_tolerances() -> Tuple[float, ...]:
+    return tuple(sorted(t for t in C.LOD_TOLERANCES if t > 0.0))
 
-    rings: List[Ring] = []
+def _build_lod(store: GeometryStore) -> LodPyramid:
+    return LodPyramid(store, C.LOD_TOLERANCES, C.LOD_MAX_ERROR_PX)
+
+def _parse_geojson(path: Path) -> Tuple[GeometryStore, List[PointFeature]]:
+    builder = GeometryBuilder()
     points: List[PointFeature] = []
-    features = gj.get("features", [])
-    for feat in features:
-        geom = feat.get("geometry", {})
-        for ring in iter_rings(geom):
-            rings.append(ring)
+    for feat in iter_features(path):
+        geom = feat.get("geometry") or {}
+        polys = list(iter_polygons(geom))
+        if polys:
+            builder.add_polygons(polys)
         for p in iter_points(feat):
             points.append(p)
-    return rings, points
+    return builder.build(), points
+
+def load_layer(path: Path | str) -> Layer:
+    """Load a file as a Layer (geometry, points, bounds). Safe to call from worker threads."""
+    path = Path(path)
+    mtime_ns = path.stat().st_mtime_ns
+    store, points, anchors, lod = _load_compiled(path, want_lod=True)
+    bounds = compute_bounds(store) if store.n_vertices else None
+    return Layer(path=path, rings=store, points=points, bounds=bounds, mtime_ns=mtime_ns,
+                 anchors=anchors, lod=lod, sites=SiteIndex(points))
 
 # Optional convenience: load the default combined file from /config
-def load_default_geo() -> Tuple[List[Ring], List[PointFeature]]:
+def load_default_geo() -> Tuple[GeometryStore, List[PointFeature]]:
     return load_geo_from_json(DEFAULT_GEOJSON)
 # -------- Bounds & padding --------
-def compute_bounds(rings: List[Ring]) -> Bounds:
-    if not rings:
-        raise RuntimeError("No polygon coordinates found in the GeoJSON.")
-    lons = [lon for ring in rings for (lon, _lat) in ring]
-    lats = [lat for ring in rings for (_lon, lat) in ring]
-    min_lon, max_lon = min(lons), max(lons)
-    min_lat, max_lat = min(lats), max(lats)
+def _make_bounds(min_lon: float, max_lon: float, min_lat: float, max_lat: float) -> Bounds:
     if max_lon == min_lon:
         max_lon += 1e-9
     if max_lat == min_lat:
         max_lat += 1e-9
-    return Bounds(min_lon, max_lon, min_lat, max_lat)
-
-def ring_bounds(ring: Ring) -> Bounds:
-    lons = [p[0] for p in ring]
-    lats = [p[1] for p in ring]
-    mn_lon, mx_lon = min(lons), max(lons)
-    mn_lat, mx_lat = min(lats), max(lats)
-    if mx_lon == mn_lon:
-        mx_lon += 1e-9
-    if mx_lat == mn_lat:
-        mx_lat += 1e-9
-    return Bounds(mn_lon, mx_lon, mn_lat, mx_lat)
+    return Bounds(float(min_lon), float(max_lon), float(min_lat), float(max_lat))
+
+def _flat_coords(rings: GeometryStore | List[Ring]) -> List[float]:
+    if isinstance(rings, GeometryStore):
+        return rings.coords.tolist()
+    return [v for ring in rings for pt in ring for v in pt]
+
+def compute_bounds(rings: GeometryStore | List[Ring]) -> Bounds:
+    if _NP_AVAILABLE and isinstance(rings, GeometryStore) and rings.n_vertices:
+        xy = np.frombuffer(rings.coords, dtype=np.float64).reshape(-1, 2)
+        mn, mx = xy.min(axis=0), xy.max(axis=0)
+        return _make_bounds(mn[0], mx[0], mn[1], mx[1])
+    flat = _flat_coords(rings)
+    if not flat:
+        raise RuntimeError("No polygon coordinates found in the GeoJSON.")
+    lons, lats = flat[0::2], flat[1::2]
+    return _make_bounds(min(lons), max(lons), min(lats), max(lats))
+
+def geom_bounds(store: GeometryStore, geom: int) -> Bounds:
+    """Bounds of every ring of feature `geom` (all parts of a MultiPolygon)."""
+    rings = store.geom_rings(geom)
+    start = store.ring_offsets[rings.start]
+    stop = store.ring_offsets[rings.stop]
+    return ring_bounds(RingView(store.coords[2 * start:2 * stop]))
+
+def ring_bounds(ring: Ring | RingView) -> Bounds:
+    if isinstance(ring, RingView):
+        if _NP_AVAILABLE:
+            xy = np.frombuffer(ring.flat, dtype=np.float64).reshape(-1, 2)
+            mn, mx = xy.min(axis=0), xy.max(axis=0)
+            return _make_bounds(mn[0], mx[0], mn[1], mx[1])
+        flat = ring.flat.tolist()
+        lons, lats = flat[0::2], flat[1::2]
+    else:
+        lons = [p[0] for p in ring]
+        lats = [p[1] for p in ring]
+    return _make_bounds(min(lons), max(lons), min(lats), max(lats))
+
+def ring_area(ring: Ring | RingView) -> float:
+    """Signed shoelace area in degrees² (positive = counter-clockwise)."""
+    if _NP_AVAILABLE and isinstance(ring, RingView):
+        xy = np.frombuffer(ring.flat, dtype=np.float64).reshape(-1, 2)
+        x, y = xy[:, 0], xy[:, 1]
+        return float((x * np.roll(y, -1) - np.roll(x, -1) * y).sum() / 2.0)
+    pts = list(ring)
+    n = len(pts)
+    acc = 0.0
+    for i in range(n):
+        x0, y0 = pts[i]
+        x1, y1 = pts[(i + 1) % n]
+        acc += x0 * y1 - x1 * y0
+    return acc / 2.0
+
+def polygon_centroid(ring: Ring | RingView) -> Tuple[float, float]:
+    """Area centroid of a ring; falls back to the bbox centre for degenerate (zero-area) rings."""
+    if _NP_AVAILABLE and isinstance(ring, RingView):
+        if not len(ring):
+            return 0.0, 0.0
+        xy = np.frombuffer(ring.flat, dtype=np.float64).reshape(-1, 2)
+        x, y = xy[:, 0], xy[:, 1]
+        x1, y1 = np.roll(x, -1), np.roll(y, -1)
+        cross = x * y1 - x1 * y
+        area = cross.sum() / 2.0
+        if area == 0.0:
+            return float(x.min() + x.max()) / 2.0, float(y.min() + y.max()) / 2.0
+        return (float(((x + x1) * cross).sum() / (6.0 * area)),
+                float(((y + y1) * cross).sum() / (6.0 * area)))
+
+    ring = list(ring)
+    if not ring:
+        return 0.0, 0.0
+    area_acc = cx_acc = cy_acc = 0.0
+    n = len(ring)
+    for i in range(n):
+        x0, y0 = ring[i]
+        x1, y1 = ring[(i + 1) % n]
+        cross = x0 * y1 - x1 * y0
+        area_acc += cross
+        cx_acc += (x0 + x1) * cross
+        cy_acc += (y0 + y1) * cross
+    area = area_acc / 2.0
+    if area == 0.0:
+        lons = [lon for lon, _lat in ring]
+        lats = [lat for _lon, lat in ring]
+        return (min(lons) + max(lons)) / 2.0, (min(lats) + max(lats)) / 2.0
+    return cx_acc / (6.0 * area), cy_acc / (6.0 * area)
+
+# -------- Batched (whole-layer) variants --------
+def _ring_starts(store: GeometryStore):
+    """(starts, lengths) of every ring as NumPy index arrays."""
+    offs = np.frombuffer(store.ring_offsets, dtype=np.int64)
+    return offs[:-1], np.diff(offs)
+
+def ring_bounds_all(store: GeometryStore) -> List[Bounds]:
+    """Bounds of every ring in one pass over the coordinate buffer."""
+    if not _NP_AVAILABLE or not store.n_vertices:
+        return [ring_bounds(store[i]) if len(store[i]) else _make_bounds(0.0, 0.0, 0.0, 0.0)
+                for i in range(len(store))]
+    xy = np.frombuffer(store.coords, dtype=np.float64).reshape(-1, 2)
+    starts, lengths = _ring_starts(store)
+    out = [_make_bounds(0.0, 0.0, 0.0, 0.0)] * len(store)
+    nz = np.flatnonzero(lengths)  # reduceat misbehaves on empty segments
+    if nz.size:
+        mn = np.minimum.reduceat(xy, starts[nz], axis=0)
+        mx = np.maximum.reduceat(xy, starts[nz], axis=0)
+        for k, i in enumerate(nz.tolist()):
+            out[i] = _make_bounds(mn[k, 0], mx[k, 0], mn[k, 1], mx[k, 1])
+    return out
+
+def ring_areas_all(store: GeometryStore) -> List[float]:
+    """Signed area of every ring (see ring_area)."""
+    if not _NP_AVAILABLE or not store.n_vertices:
+        return [ring_area(store[i]) for i in range(len(store))]
+    cross, _x, _y, _x1, _y1 = _edge_terms(store)
+    return _segment_sums(store, cross / 2.0)
+
+def ring_centroids_all(store: GeometryStore) -> List[Tuple[float, float]]:
+    """Area centroid of every ring (see polygon_centroid) in one vectorised call."""
+    if not _NP_AVAILABLE or not store.n_vertices:
+        return [polygon_centroid(store[i]) for i in range(len(store))]
+    cross, x, y, x1, y1 = _edge_terms(store)
+    areas = _segment_sums(store, cross / 2.0)
+    cxs = _segment_sums(store, (x + x1) * cross)
+    cys = _segment_sums(store, (y + y1) * cross)
+    bounds = None
+    out: List[Tuple[float, float]] = []
+    for i, (a, cx, cy) in enumerate(zip(areas, cxs, cys)):
+        if a == 0.0:
+            if bounds is None:
+                bounds = ring_bounds_all(store)
+            b = bounds[i]
+            out.append(((b.min_lon + b.max_lon) / 2.0, (b.min_lat + b.max_lat) / 2.0)
+                       if len(store[i]) else (0.0, 0.0))
+        else:
+            out.append((cx / (6.0 * a), cy / (6.0 * a)))
+    return out
+
+def point_in_ring(flat, lon: float, lat: float) -> bool:
+    """Even-odd test of (lon, lat) against a lon/lat-interleaved ring."""
+    xs, ys = flat[0::2], flat[1::2]
+    inside = False
+    j = len(xs) - 1
+    for i in range(len(xs)):
+        yi, yj = ys[i], ys[j]
+        if (yi > lat) != (yj > lat) and lon < xs[i] + (lat - yi) * (xs[j] - xs[i]) / (yj - yi):
+            inside = not inside
+        j = i
+    return inside
+
+def geom_at(store: GeometryStore, lon: float, lat: float,
+            bboxes: Optional[List[Bounds]] = None) -> Optional[int]:
+    """
+    Feature drawn at (lon, lat), or None. Rings are tested top-most (last) first,
+    like they are painted: a hole on top shows background, so it hits nothing.
+    """
+    if bboxes is None:
+        bboxes = ring_bounds_all(store)
+    for r in range(len(store) - 1, -1, -1):
+        b = bboxes[r]
+        if not (b.min_lon <= lon <= b.max_lon and b.min_lat <= lat <= b.max_lat):
+            continue
+        if point_in_ring(store.ring_coords(r).tolist(), lon, lat):
+            return None if store.is_hole(r) else store.geom_of_ring(r)
+    return None
+
+def _edge_terms(store: GeometryStore):
+    """Per-vertex shoelace terms, with each ring's last vertex wrapping to its own first."""
+    xy = np.frombuffer(store.coords, dtype=np.float64).reshape(-1, 2)
+    x, y = xy[:, 0], xy[:, 1]
+    starts, lengths = _ring_starts(store)
+    nxt = np.arange(1, len(x) + 1)
+    nz = lengths > 0
+    nxt[(starts + lengths - 1)[nz]] = starts[nz]
+    x1, y1 = x[nxt], y[nxt]
+    return x * y1 - x1 * y, x, y, x1, y1
+
+def _segment_sums(store: GeometryStore, values) -> List[float]:
+    starts, lengths = _ring_starts(store)
+    out = [0.0] * len(store)
+    nz = np.flatnonzero(lengths)
+    if nz.size:
+        sums = np.add.reduceat(values, starts[nz])
+        for k, i in enumerate(nz.tolist()):
+            out[i] = float(sums[k])
+    return out
 
 def pad_bounds(b: Bounds, ratio: float) -> Bounds:
     w = b.max_lon - b.min_lon
@@ -0,0 +1,180 @@
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+import math
+from typing import Dict, List, Optional, Tuple
+from .models import GeometryStore, LngLat, PointFeature
+from app.core.paths import cache_path
+
+# Compiled GeoJSON cache.
+#
+# Layout (little-endian, every section 8-byte aligned):
+#   header           see _HEADER
+#   coords           float64[2 * n_vertices]   lon, lat interleaved
+#   ring_offsets     int64[n_rings + 1]        vertex index where each ring starts
+#   polygon_offsets  int64[n_polygons + 1]     ring index where each polygon starts
+#   geom_offsets     int64[n_geoms + 1]        polygon index where each feature starts
+#   point_coords     float64[2 * n_points]     lon, lat interleaved
+#   anchors          float64[2 * n_geoms]      label lon, lat per feature (NaN: none)
+#   lod_tolerances   float64[n_tolerances]     tolerances the LOD levels were built for
+#   lod_levels       float64[n_levels]         tolerance of each stored (simplified) level
+#   lod_sizes        int64[n_levels]           vertices in each level
+#   per level:
+#     coords         float64[2 * size]
+#     ring_offsets   int64[n_rings + 1]        (polygon/geom offsets are the source's)
+#   point_props      utf-8 JSON                [[site, sectorId, freq, power], ...]
+#
+# The geometry sections are exactly the buffers of a GeometryStore, so a
+# cache hit maps them straight into the store without copying; the same
+# goes for every simplified LOD level.
+#
+# A cache file is valid only for the exact source it was compiled from:
+# the file name is derived from the resolved source path and the header
+# records the source mtime and size.
+
+MAGIC = b"CNSGEOC\x00"
+VERSION = 4
+# magic, version, mtime_ns, size, n_vertices, n_rings, n_polygons, n_geoms, n_points,
+# n_tolerances, n_levels, props_len
+_HEADER = struct.Struct("<8sH6xqqqqqqqqqq")
+
+# (tolerances asked for, [(tolerance, simplified store), ...]) as LodPyramid keeps them
+LodLevels = Tuple[Tuple[float, ...], List[Tuple[float, GeometryStore]]]
+
+# memoryview.cast() uses native byte order
+_CACHE_SUPPORTED = sys.byteorder == "little"
+
+
+def cache_file_for(src: Path) -> Path:
+    src = Path(src).resolve()
+    digest = hashlib.sha1(os.fsencode(src)).hexdigest()[:16]
+    return cache_path("geo", f"{src.stem}-{digest}.geoc")
+
+
+# -------- Write --------
+def write_cache(src: Path, store: GeometryStore, points: List[PointFeature],
+                anchors: Optional[Dict[int, LngLat]] = None,
+                lod: Optional[LodLevels] = None) -> Optional[Path]:
+    """Compile `store`/`points`/`anchors`/`lod` for `src` into its cache file; returns None if it can't be written."""
+    if not _CACHE_SUPPORTED:
+        return None
+    src = Path(src)
+    try:
+        st = src.stat()
+        pcoords = array("d")
+        props = []
+        for lon, lat, site, sector_id, freq, power in points:
+            pcoords.append(lon)
+            pcoords.append(lat)
+            props.append([site, sector_id, freq, power])
+        blob = json.dumps(props, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        acoords = array("d", [math.nan]) * (2 * store.n_geoms)
+        for g, (lon, lat) in (anchors or {}).items():
+            acoords[2 * g] = lon
+            acoords[2 * g + 1] = lat
+        tolerances, levels = lod if lod is not None else ((), [])
+
+        header = _HEADER.pack(
+            MAGIC, VERSION, st.st_mtime_ns, st.st_size,
+            store.n_vertices, len(store), store.n_polygons, store.n_geoms,
+            len(pcoords) // 2, len(tolerances), len(levels), len(blob),
+        )
+        dst = cache_file_for(src)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            f.write(header)
+            f.write(store.coords)
+            f.write(store.ring_offsets)
+            f.write(store.polygon_offsets)
+            f.write(store.geom_offsets)
+            f.write(pcoords.tobytes())
+            f.write(acoords.tobytes())
+            f.write(array("d", tolerances).tobytes())
+            f.write(array("d", [tol for tol, _s in levels]).tobytes())
+            f.write(array("q", [level.n_vertices for _t, level in levels]).tobytes())
+            for _tol, level in levels:
+                f.write(level.coords)
+                f.write(level.ring_offsets)
+            f.write(blob)
+        os.replace(tmp, dst)  # atomic: readers never see a half-written file
+        return dst
+    except OSError:
+        return None
+
+
+# -------- Read --------
+def read_cache(src: Path
+               ) -> Optional[Tuple[GeometryStore, List[PointFeature], Dict[int, LngLat], Optional[LodLevels]]]:
+    """
+    Return the cached store/points/anchors/LOD levels for `src`, or None if missing/stale/corrupt.
+    The stores' buffers are views into the mapped file; the mapping lives as long as they do.
+    """
+    if not _CACHE_SUPPORTED:
+        return None
+    src = Path(src)
+    try:
+        st = src.stat()
+        dst = cache_file_for(src)
+        with dst.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        result = _decode(mm, st.st_mtime_ns, st.st_size)
+        if result is None:
+            mm.close()
+        return result
+    except (OSError, ValueError):
+        return None
+
+
+def _decode(mm: mmap.mmap, mtime_ns: int, size: int
+            ) -> Optional[Tuple[GeometryStore, List[PointFeature], Dict[int, LngLat], Optional[LodLevels]]]:
+    if len(mm) < _HEADER.size:
+        return None
+    (magic, version, c_mtime, c_size, n_vertices, n_rings, n_polygons, n_geoms, n_points,
+     n_tolerances, n_levels, props_len) = _HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION or c_mtime != mtime_ns or c_size != size:
+        return None
+
+    buf = memoryview(mm)
+    pos = _HEADER.size
+
+    def section(fmt: str, count: int) -> memoryview:
+        nonlocal pos
+        if pos + 8 * count > len(mm):
+            raise ValueError("truncated geocache")
+        view = buf[pos:pos + 8 * count].cast(fmt)
+        pos += 8 * count
+        return view
+
+    coords, ring_offsets = section("d", 2 * n_vertices), section("q", n_rings + 1)
+    polygon_offsets, geom_offsets = section("q", n_polygons + 1), section("q", n_geoms + 1)
+    pcoords, acoords = section("d", 2 * n_points), section("d", 2 * n_geoms)
+    tolerances, level_tols, level_sizes = section("d", n_tolerances), section("d", n_levels), section("q", n_levels)
+    level_buffers = [(section("d", 2 * level_sizes[k]), section("q", n_rings + 1)) for k in range(n_levels)]
+    if len(mm) != pos + props_len:
+        return None
+
+    store = GeometryStore(coords, ring_offsets, polygon_offsets, geom_offsets)
+    lod: Optional[LodLevels] = None
+    if n_tolerances:
+        lod = (tuple(tolerances), [
+            (level_tols[k], GeometryStore(c, o, polygon_offsets, geom_offsets))
+            for k, (c, o) in enumerate(level_buffers)
+        ])
+
+    props = json.loads(bytes(buf[pos:]).decode("utf-8"))
+    points: List[PointFeature] = []
+    for i, (site, sector_id, freq, power) in enumerate(props):
+        points.append((pcoords[2 * i], pcoords[2 * i + 1], site, sector_id, freq, power))
+    anchors: Dict[int, LngLat] = {}
+    for g in range(n_geoms):
+        lon, lat = acoords[2 * g], acoords[2 * g + 1]
+        if lon == lon:  # NaN: feature has no anchor
+            anchors[g] = (lon, lat)
+    return store, points, anchors, lod
@@ -0,0 +1,201 @@
+from __future__ import annotations
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+from . import config as C
+from .clip import clip_polygon
+from .geo import load_layer
+from .labels import sector_labels
+from .models import Bounds, GeometryStore, Layer
+from .projection import Viewport, ProjectedStore, project_points
+from .raster import TileStyle, basemap_style, draw_rings
+
+# Pillow (optional): PNG output needs it, SVG doesn't
+try:
+    from PIL import Image, ImageDraw, ImageFont  # type: ignore
+    _PIL_AVAILABLE = True
+except Exception:
+    _PIL_AVAILABLE = False
+
+# Whether "png" output works here ("svg" always does)
+PNG_AVAILABLE = _PIL_AVAILABLE
+
+# Display-free rendering of the same views the canvas shows (projection,
+# LOD, colours and labels all come from config), for reports and batch export.
+
+FORMATS = ("png", "svg")
+
+
+@dataclass(frozen=True)
+class ViewSpec:
+    """One map view to render: a layer file seen either as the main map or as a sector's detail."""
+    name: str
+    path: Path
+    sector: Optional[int] = None   # detail view of this sector (None: main map)
+    bounds: Optional[Bounds] = None  # default: the layer's own bounds
+
+
+@dataclass
+class _Frame:
+    """What is drawn, in screen space, shared by the PNG and SVG writers."""
+    width: int
+    height: int
+    style: TileStyle
+    store: GeometryStore   # LOD level picked for this view
+    vp: Viewport
+    rings: List[int]
+    labels: List[Tuple[float, float, str]]
+    points: List[Tuple[float, float, str]]
+
+
+def _frame(layer: Layer, spec: ViewSpec, width: int, height: int) -> _Frame:
+    in_detail = spec.sector is not None
+    detail_fill = None
+    if in_detail and hasattr(C, "SECTOR_COLORS"):
+        detail_fill = C.SECTOR_COLORS[spec.sector % len(C.SECTOR_COLORS)]
+    bounds = spec.bounds or layer.bounds
+    if bounds is None:
+        raise ValueError(f"{spec.path} has no polygon coordinates")
+    vp = Viewport(bounds, width, height, C.PADDING)
+    store = layer.lod.for_view(bounds, width, height, C.PADDING) if layer.lod is not None else layer.rings
+
+    labels: List[Tuple[float, float, str]] = []
+    if not in_detail:
+        labels = [(*vp.project(*ll), text) for _idx, ll, text in sector_labels(store.n_geoms, layer.anchors)]
+
+    points: List[Tuple[float, float, str]] = []
+    if in_detail:
+        for (x, y), p in zip(project_points(layer.points, vp), layer.points):
+            points.append((x, y, p[2]))
+
+    return _Frame(width, height, basemap_style(in_detail, detail_fill), store, vp,
+                  list(range(len(store))), labels, points)
+
+
+# -------- PNG --------
+_FONT_FILES = {
+    False: ("arial.ttf", "Arial.ttf", "DejaVuSans.ttf"),
+    True: ("arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf"),
+}
+
+def _pil_font(tk_font: Sequence) -> "ImageFont.ImageFont":
+    """Closest Pillow font to a Tk font tuple such as ("Arial", 24, "bold")."""
+    size = int(tk_font[1]) if len(tk_font) > 1 else 12
+    bold = "bold" in tk_font[2:]
+    for name in _FONT_FILES[bold]:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow < 10.1: fixed-size bitmap font
+        return ImageFont.load_default()
+
+def render_png(fr: _Frame) -> "Image.Image":
+    if not _PIL_AVAILABLE:
+        raise RuntimeError("PNG export needs Pillow")
+    img = Image.new("RGB", (fr.width, fr.height), fr.style.background)
+    draw = ImageDraw.Draw(img)
+    draw_rings(draw, fr.store, fr.rings, fr.vp, fr.style)
+
+    font = _pil_font(getattr(C, "SECTOR_LABEL_FONT", ("Arial", 24, "bold")))
+    for x, y, text in fr.labels:
+        draw.text((x, y), text, fill=getattr(C, "SECTOR_LABEL_COLOR", "#222"), font=font, anchor="mm")
+
+    r = C.POINT_RADIUS
+    font = _pil_font(C.POINT_FONT)
+    for x, y, site in fr.points:
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=C.POINT_FILL, outline=C.POINT_OUTLINE, width=2)
+        draw.text((x + 8, y - 8), site, fill=C.POINT_LABEL_COLOR, font=font, anchor="ld")
+    return img
+
+
+# -------- SVG --------
+def _svg_font(tk_font: Sequence) -> str:
+    size = int(tk_font[1]) if len(tk_font) > 1 else 12
+    weight = "bold" if "bold" in tk_font[2:] else "normal"
+    return f'font-family="{escape(str(tk_font[0]))}" font-size="{size}" font-weight="{weight}"'
+
+def render_svg(fr: _Frame) -> str:
+    st = fr.style
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{fr.width}" height="{fr.height}" '
+        f'viewBox="0 0 {fr.width} {fr.height}">',
+        f'<rect width="100%" height="100%" fill="{st.background}"/>',
+    ]
+    store = fr.store
+    projected = ProjectedStore(store, fr.vp)
+    m = C.VIEW_MARGIN_PX
+    for r in fr.rings:
+        pts = clip_polygon(projected.ring(r), -m, -m, fr.width + m, fr.height + m)
+        if len(pts) < 6:
+            continue
+        fill = st.background if store.is_hole(r) else st.fills[store.geom_of_ring(r) % len(st.fills)]
+        d = " ".join(f"{pts[i]:.1f},{pts[i + 1]:.1f}" for i in range(0, len(pts), 2))
+        out.append(f'<polygon points="{d}" fill="{fill}" stroke="{st.outline}" '
+                   f'stroke-width="{st.width}" stroke-linejoin="round"/>')
+
+    font = _svg_font(getattr(C, "SECTOR_LABEL_FONT", ("Arial", 24, "bold")))
+    color = getattr(C, "SECTOR_LABEL_COLOR", "#222")
+    for x, y, text in fr.labels:
+        out.append(f'<text x="{x:.1f}" y="{y:.1f}" {font} fill="{color}" text-anchor="middle" '
+                   f'dominant-baseline="central">{escape(text)}</text>')
+
+    font = _svg_font(C.POINT_FONT)
+    for x, y, site in fr.points:
+        out.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{C.POINT_RADIUS}" fill="{C.POINT_FILL}" '
+                   f'stroke="{C.POINT_OUTLINE}" stroke-width="2"/>')
+        out.append(f'<text x="{x + 8:.1f}" y="{y - 8:.1f}" {font} fill="{C.POINT_LABEL_COLOR}">{escape(site)}</text>')
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+# -------- Batch export --------
+def default_views() -> List[ViewSpec]:
+    """The main map plus every sector that has a detail file."""
+    views = [ViewSpec("main", Path(C.GEOJSON_PATH))]
+    for idx, path in sorted(C.DETAIL_JSON_FOR_RING.items()):
+        label = getattr(C, "SECTOR_LABELS", {}).get(idx, "")
+        slug = re.sub(r"[^a-z0-9]+", "-", label.lower()).strip("-")
+        views.append(ViewSpec(f"sector-{idx}-{slug}" if slug else f"sector-{idx}", Path(path), sector=idx))
+    return views
+
+def export_view(spec: ViewSpec, out_dir: Path, formats: Sequence[str] = FORMATS,
+                width: int = C.WINDOW_WIDTH, height: int = C.WINDOW_HEIGHT) -> List[Path]:
+    """Render one view in every requested format; returns the files written."""
+    fr = _frame(load_layer(spec.path), spec, width, height)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written: List[Path] = []
+    for fmt in formats:
+        dst = out_dir / f"{spec.name}.{fmt}"
+        tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+        if fmt == "png":
+            render_png(fr).save(tmp, format="PNG")
+        elif fmt == "svg":
+            tmp.write_text(render_svg(fr), encoding="utf-8")
+        else:
+            raise ValueError(f"unknown format: {fmt}")
+        os.replace(tmp, dst)
+        written.append(dst)
+    return written
+
+def export_views(views: Iterable[ViewSpec], out_dir: Path, formats: Sequence[str] = FORMATS,
+                 width: int = C.WINDOW_WIDTH, height: int = C.WINDOW_HEIGHT,
+                 workers: Optional[int] = None) -> Dict[str, List[Path]]:
+    """
+    Render `views` on a process pool (one view per task, so parsing and
+    rasterizing run in parallel). Returns view name -> files written;
+    the first failing view re-raises its exception.
+    """
+    views = list(views)
+    if workers == 1 or len(views) <= 1:
+        return {v.name: export_view(v, out_dir, formats, width, height) for v in views}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {v.name: pool.submit(export_view, v, out_dir, tuple(formats), width, height) for v in views}
+        return {name: fut.result() for name, fut in futures.items()}
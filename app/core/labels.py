@@ -0,0 +1,183 @@
+from __future__ import annotations
+import heapq
+import math
+from typing import Dict, List, Mapping, Sequence, Tuple
+from . import config as C
+from .models import GeometryStore, LngLat
+from .simplify import simplify_ring
+
+# NumPy (optional) for the distance-to-outline evaluations
+try:
+    import numpy as np  # type: ignore
+    _NP_AVAILABLE = True
+except Exception:
+    _NP_AVAILABLE = False
+
+# Labels go at the pole of inaccessibility (the interior point farthest from
+# the outline), found with the polylabel grid search. Unlike a centroid it is
+# always inside the polygon, even for concave or ring-shaped sectors.
+
+# search precision, as a fraction of the polygon's larger bbox side
+PRECISION_RATIO = 1e-3
+
+_SQRT2 = math.sqrt(2.0)
+
+
+# -------- Signed distance to a polygon --------
+class _Outline:
+    """Edges of a polygon (shell plus holes); dist() is positive inside, negative outside."""
+
+    def __init__(self, rings: Sequence[Sequence[float]]) -> None:
+        ax: List[float] = []
+        ay: List[float] = []
+        bx: List[float] = []
+        by: List[float] = []
+        for flat in rings:
+            xs, ys = list(flat[0::2]), list(flat[1::2])
+            n = len(xs)
+            for i in range(n):
+                j = i - 1 if i else n - 1
+                ax.append(xs[j])
+                ay.append(ys[j])
+                bx.append(xs[i])
+                by.append(ys[i])
+        if _NP_AVAILABLE:
+            self._edges = tuple(np.asarray(v, dtype=np.float64) for v in (ax, ay, bx, by))
+        else:
+            self._edges = (ax, ay, bx, by)
+
+    def dist(self, x: float, y: float) -> float:
+        return self._dist_np(x, y) if _NP_AVAILABLE else self._dist_py(x, y)
+
+    def _dist_np(self, x: float, y: float) -> float:
+        ax, ay, bx, by = self._edges
+        if not len(ax):
+            return -math.inf
+        crosses = (ay > y) != (by > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xi = (bx - ax) * (y - ay) / (by - ay) + ax
+        inside = bool(np.count_nonzero(crosses & (x < xi)) & 1)
+        dx, dy = bx - ax, by - ay
+        seg2 = dx * dx + dy * dy
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(seg2 > 0, ((x - ax) * dx + (y - ay) * dy) / seg2, 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        px, py = ax + t * dx - x, ay + t * dy - y
+        d = math.sqrt(float((px * px + py * py).min()))
+        return d if inside else -d
+
+    def _dist_py(self, x: float, y: float) -> float:
+        inside = False
+        best = math.inf
+        for ax, ay, bx, by in zip(*self._edges):
+            if (ay > y) != (by > y) and x < (bx - ax) * (y - ay) / (by - ay) + ax:
+                inside = not inside
+            dx, dy = bx - ax, by - ay
+            seg2 = dx * dx + dy * dy
+            t = 0.0 if seg2 == 0.0 else max(0.0, min(1.0, ((x - ax) * dx + (y - ay) * dy) / seg2))
+            px, py = ax + t * dx - x, ay + t * dy - y
+            d = px * px + py * py
+            if d < best:
+                best = d
+        d = math.sqrt(best)
+        return d if inside else -d
+
+
+# -------- Pole of inaccessibility --------
+def polylabel(rings: Sequence[Sequence[float]], precision: float) -> Tuple[LngLat, float]:
+    """
+    Point inside the polygon (`rings`: flat lon/lat shell, then holes) farthest
+    from its outline, to within `precision`; returns it with that distance.
+    """
+    shell = rings[0]
+    xs, ys = shell[0::2], shell[1::2]
+    min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+    size = min(max_x - min_x, max_y - min_y)
+    if size <= 0.0:
+        return (min_x, min_y), 0.0
+    outline = _Outline(rings)
+    counter = 0
+    heap: List[Tuple[float, int, float, float, float, float]] = []
+
+    def push(x: float, y: float, h: float) -> Tuple[float, float, float]:
+        nonlocal counter
+        d = outline.dist(x, y)
+        # no point in this cell can be farther from the outline than d + half-diagonal
+        heapq.heappush(heap, (-(d + h * _SQRT2), counter, x, y, h, d))
+        counter += 1
+        return x, y, d
+
+    h = size / 2.0
+    x = min_x
+    while x < max_x:
+        y = min_y
+        while y < max_y:
+            push(x + h, y + h, h)
+            y += size
+        x += size
+
+    # seed with the bbox centre so thin shapes still get a sensible answer
+    cx, cy = (min_x + max_x) / 2.0, (min_y + max_y) / 2.0
+    best = (cx, cy, outline.dist(cx, cy))
+    while heap:
+        neg_max, _c, x, y, h, d = heapq.heappop(heap)
+        if d > best[2]:
+            best = (x, y, d)
+        if -neg_max - best[2] <= precision:
+            break  # the most promising cell left can't improve by more than `precision`
+        h /= 2.0
+        for ox, oy in ((-h, -h), (h, -h), (-h, h), (h, h)):
+            push(x + ox, y + oy, h)
+    return (best[0], best[1]), best[2]
+
+
+def pole_anchors(store: GeometryStore, precision_ratio: float = PRECISION_RATIO) -> Dict[int, LngLat]:
+    """Label position per feature: the pole of inaccessibility of its largest polygon."""
+    from .geo import ring_area  # geo imports this module at load time
+    out: Dict[int, LngLat] = {}
+    for g in range(store.n_geoms):
+        best_area, best_rings = 0.0, None
+        p0, p1 = store.geom_offsets[g], store.geom_offsets[g + 1]
+        for p in range(p0, p1):
+            r0, r1 = store.polygon_offsets[p], store.polygon_offsets[p + 1]
+            shell = store.ring_coords(r0).tolist()
+            if len(shell) < 6:
+                continue
+            area = abs(ring_area(store[r0]))
+            if best_rings is None or area > best_area:
+                best_area, best_rings = area, (shell, range(r0 + 1, r1))
+        if best_rings is None:
+            continue
+        shell, holes = best_rings
+        xs, ys = shell[0::2], shell[1::2]
+        precision = precision_ratio * max(max(xs) - min(xs), max(ys) - min(ys))
+        # the outline only needs to be as exact as the answer
+        rings = [simplify_ring(shell, precision / 2.0)]
+        rings.extend(simplify_ring(store.ring_coords(r).tolist(), precision / 2.0) for r in holes)
+        out[g] = polylabel(rings, precision)[0]
+    return out
+
+
+# -------- Sector labels --------
+def sector_labels(n_geoms: int, anchors: Mapping[int, LngLat]) -> List[Tuple[int, LngLat, str]]:
+    """
+    (feature, lon/lat, text) of each sector label on the main map: at its
+    SECTOR_LABEL_POS override if configured, else at its anchor. Features
+    without a position or a SECTOR_LABELS entry get no label.
+    """
+    names = getattr(C, "SECTOR_LABELS", {})
+    fixed_pos = getattr(C, "SECTOR_LABEL_POS", {})
+    out: List[Tuple[int, LngLat, str]] = []
+    for idx in range(n_geoms):
+        text = names.get(idx)
+        if not text:
+            continue
+        fixed = fixed_pos.get(idx)
+        if isinstance(fixed, (list, tuple)) and len(fixed) == 2:
+            ll = (float(fixed[0]), float(fixed[1]))
+        elif idx in anchors:
+            ll = anchors[idx]
+        else:
+            continue
+        out.append((idx, ll, text))
+    return out
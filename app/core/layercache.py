@@ -0,0 +1,76 @@
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+from .models import Layer
+
+
+class LayerCache:
+    """
+    LRU of loaded layers bounded by an approximate byte budget.
+    An entry is dropped as soon as its source file's mtime no longer matches.
+    Thread-safe: worker threads insert, the Tk thread reads.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[Path, Layer]" = OrderedDict()
+        self._sizes: dict[Path, int] = {}
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, path: Path) -> Optional[Layer]:
+        path = Path(path)
+        with self._lock:
+            layer = self._entries.get(path)
+            if layer is None:
+                return None
+            try:
+                fresh = path.stat().st_mtime_ns == layer.mtime_ns
+            except OSError:
+                fresh = False
+            if not fresh:
+                self._drop(path)
+                return None
+            self._entries.move_to_end(path)
+            return layer
+
+    def put(self, layer: Layer) -> None:
+        size = layer.nbytes
+        with self._lock:
+            if layer.path in self._entries:
+                self._drop(layer.path)
+            if size > self.max_bytes:
+                return  # would evict everything and still not fit
+            self._entries[layer.path] = layer
+            self._sizes[layer.path] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def invalidate(self, path: Path) -> None:
+        with self._lock:
+            if Path(path) in self._entries:
+                self._drop(Path(path))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, (str, Path)) and Path(path) in self._entries
+
+    def _drop(self, path: Path) -> None:
+        self._entries.pop(path, None)
+        self._bytes -= self._sizes.pop(path, 0)
@@ -1,6 +1,14 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Tuple
+from array import array
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+import sys
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .simplify import LodPyramid
+    from .spatial import SiteIndex
 
 # Lightweight, focused shared types
 LngLat = Tuple[float, float]
@@ -23,3 +31,183 @@ class Bounds:
             min_lat=self.min_lat + (other.min_lat - self.min_lat) * t,
             max_lat=self.max_lat + (other.max_lat - self.max_lat) * t,
         )
+
+
+class RingView(Sequence[LngLat]):
+    """Read-only (lon, lat) view over one ring of a GeometryStore; no per-vertex objects are stored."""
+
+    __slots__ = ("flat",)
+
+    def __init__(self, flat: memoryview) -> None:
+        self.flat = flat  # lon, lat interleaved (format "d")
+
+    def __len__(self) -> int:
+        return len(self.flat) // 2
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return list(self)[i]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("ring index out of range")
+        return self.flat[2 * i], self.flat[2 * i + 1]
+
+    def __iter__(self) -> Iterator[LngLat]:
+        it = iter(self.flat.tolist())
+        return zip(it, it)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (RingView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+class GeometryStore(Sequence[RingView]):
+    """
+    Polygon geometry as structure-of-arrays, laid out like GeoArrow MultiPolygon:
+      coords           float64  lon, lat interleaved
+      ring_offsets     int64    vertex index where each ring starts   (n_rings + 1)
+      polygon_offsets  int64    ring index where each polygon starts  (n_polygons + 1)
+      geom_offsets     int64    polygon index where each feature starts (n_geoms + 1)
+    The first ring of a polygon is its shell; the rest are holes.
+    As a Sequence it yields every ring in file order, so List[Ring] callers keep working.
+    """
+
+    def __init__(
+        self,
+        coords: memoryview,
+        ring_offsets: memoryview,
+        polygon_offsets: memoryview,
+        geom_offsets: memoryview,
+    ) -> None:
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.polygon_offsets = polygon_offsets
+        self.geom_offsets = geom_offsets
+
+        # ring -> feature lookup and hole flags, O(n_polygons) to build
+        n_rings = len(ring_offsets) - 1
+        self._ring_geom = array("q", bytes(8 * n_rings))
+        self._hole = bytearray(n_rings)
+        for g in range(len(geom_offsets) - 1):
+            for p in range(geom_offsets[g], geom_offsets[g + 1]):
+                r0, r1 = polygon_offsets[p], polygon_offsets[p + 1]
+                for r in range(r0, r1):
+                    self._ring_geom[r] = g
+                    self._hole[r] = r != r0
+
+    @classmethod
+    def from_rings(cls, rings: Iterable[Ring]) -> "GeometryStore":
+        """Pack plain rings, each as its own single-ring feature."""
+        b = GeometryBuilder()
+        for ring in rings:
+            b.add_polygons([[list(ring)]])
+        return b.build()
+
+    # ---- sizes ----
+    def __len__(self) -> int:
+        return len(self.ring_offsets) - 1
+
+    @property
+    def n_vertices(self) -> int:
+        return len(self.coords) // 2
+
+    @property
+    def n_polygons(self) -> int:
+        return len(self.polygon_offsets) - 1
+
+    @property
+    def n_geoms(self) -> int:
+        return len(self.geom_offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return (self.coords.nbytes + self.ring_offsets.nbytes + self.polygon_offsets.nbytes
+                + self.geom_offsets.nbytes + len(self._ring_geom) * 8 + len(self._hole))
+
+    # ---- access ----
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return RingView(self.ring_coords(i))
+
+    def ring_coords(self, i: int) -> memoryview:
+        """Zero-copy lon/lat-interleaved slice of ring `i`."""
+        if i < 0:
+            i += len(self)
+        return self.coords[2 * self.ring_offsets[i]:2 * self.ring_offsets[i + 1]]
+
+    def is_hole(self, ring: int) -> bool:
+        return bool(self._hole[ring])
+
+    def geom_of_ring(self, ring: int) -> int:
+        return self._ring_geom[ring]
+
+    def geom_rings(self, geom: int) -> range:
+        """Ring indices (shells and holes) belonging to feature `geom`."""
+        p0, p1 = self.geom_offsets[geom], self.geom_offsets[geom + 1]
+        return range(self.polygon_offsets[p0], self.polygon_offsets[p1])
+
+    def geom_shells(self, geom: int) -> List[int]:
+        p0, p1 = self.geom_offsets[geom], self.geom_offsets[geom + 1]
+        return [self.polygon_offsets[p] for p in range(p0, p1)]
+
+
+class GeometryBuilder:
+    """Accumulates polygons into the flat arrays of a GeometryStore."""
+
+    def __init__(self) -> None:
+        self.coords = array("d")
+        self.ring_offsets = array("q", [0])
+        self.polygon_offsets = array("q", [0])
+        self.geom_offsets = array("q", [0])
+
+    def add_polygons(self, polygons: List[List[list]]) -> None:
+        """Append one feature made of `polygons` (each a list of [lon, lat] rings, shell first)."""
+        for rings in polygons:
+            for ring in rings:
+                self.coords.extend(chain.from_iterable((pt[0], pt[1]) for pt in ring))
+                self.ring_offsets.append(len(self.coords) // 2)
+            self.polygon_offsets.append(len(self.ring_offsets) - 1)
+        self.geom_offsets.append(len(self.polygon_offsets) - 1)
+
+    def build(self) -> GeometryStore:
+        return GeometryStore(
+            memoryview(self.coords),
+            memoryview(self.ring_offsets),
+            memoryview(self.polygon_offsets),
+            memoryview(self.geom_offsets),
+        )
+
+
+@dataclass
+class Layer:
+    """One loaded GeoJSON file plus what is derived from it."""
+    path: Path
+    rings: GeometryStore
+    points: List[PointFeature] = field(default_factory=list)
+    bounds: Bounds | None = None
+    mtime_ns: int = 0
+    # feature index -> (lon, lat) where its label goes (pole of inaccessibility, see labels.py)
+    anchors: Dict[int, LngLat] = field(default_factory=dict)
+    # pre-simplified geometry picked by zoom level
+    lod: Optional["LodPyramid"] = None
+    # nearest/radius/bbox lookups over `points`
+    sites: Optional["SiteIndex"] = None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by this layer (for cache budgeting)."""
+        size = self.rings.nbytes + 64 * len(self.anchors)
+        if self.lod is not None:
+            size += self.lod.nbytes
+        if self.sites is not None:
+            size += 160 * len(self.sites)
+        for p in self.points:
+            size += sys.getsizeof(p) + sum(sys.getsizeof(v) for v in p)
+            for d in (p[4], p[5]):
+                if isinstance(d, dict):
+                    size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in d.items())
+        return size
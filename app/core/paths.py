@@ -30,11 +30,19 @@ def drawings_root() -> Path:
     # Folder name has a space — keep it exact
     return runtime_root() / "CNS drawings"
 
+def cache_root() -> Path:
+    # Must survive restarts: onefile's _MEIPASS is wiped on exit, so frozen
+    # builds keep their cache next to the exe instead of under runtime_root()
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).resolve().parent / "cache"
+    return _project_root_dev() / "cache"
+
 # Convenience joiners
 def app_path(*parts: str) -> Path:      return app_root().joinpath(*parts)
 def config_path(*parts: str) -> Path:   return config_root().joinpath(*parts)
 def assets_path(*parts: str) -> Path:   return assets_root().joinpath(*parts)
 def drawings_path(*parts: str) -> Path: return drawings_root().joinpath(*parts)
+def cache_path(*parts: str) -> Path:    return cache_root().joinpath(*parts)
 
 # Tiny helpers if you read JSON configs
 def load_config(name: str):
@@ -0,0 +1,58 @@
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Optional
+from .models import Layer
+from .geo import load_layer
+from .layercache import LayerCache
+
+
+class LayerPrefetcher:
+    """
+    Loads layers on a small thread pool so the Tk thread never parses GeoJSON.
+    Finished layers go into the LayerCache; while a load is in flight every
+    request for that path gets the same future.
+    """
+
+    def __init__(self, max_workers: int = 2, cache: Optional[LayerCache] = None) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="layer-prefetch")
+        self.cache = cache if cache is not None else LayerCache(max_bytes=0)
+        self._futures: Dict[Path, Future] = {}
+        self._lock = Lock()
+
+    def prefetch(self, paths: Iterable[Path]) -> None:
+        for p in paths:
+            self.submit(p)
+
+    def submit(self, path: Path) -> "Future[Layer]":
+        """Future for `path`'s layer; already resolved when the cache holds a fresh copy."""
+        path = Path(path)
+        cached = self.cache.get(path)
+        if cached is not None:
+            done: "Future[Layer]" = Future()
+            done.set_result(cached)
+            return done
+        with self._lock:
+            fut = self._futures.get(path)
+            if fut is not None:
+                return fut
+            fut = self._pool.submit(self._load, path)
+            self._futures[path] = fut
+        # forget finished futures so the cache alone decides what stays in memory;
+        # registered outside the lock because an already-done future runs it inline
+        fut.add_done_callback(lambda f, p=path: self._forget(p, f))
+        return fut
+
+    def _load(self, path: Path) -> Layer:
+        layer = load_layer(path)
+        self.cache.put(layer)
+        return layer
+
+    def _forget(self, path: Path, fut: Future) -> None:
+        with self._lock:
+            if self._futures.get(path) is fut:
+                del self._futures[path]
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
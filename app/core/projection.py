@@ -0,0 +1,118 @@
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from weakref import WeakKeyDictionary
+from .models import Bounds, GeometryStore, LngLat, PointFeature
+
+# NumPy (optional) projects a whole store in one pass
+try:
+    import numpy as np  # type: ignore
+    _NP_AVAILABLE = True
+except Exception:
+    _NP_AVAILABLE = False
+
+
+# -------- View transform --------
+@dataclass(frozen=True)
+class Viewport:
+    """Linear lon/lat -> screen transform for `bounds` fitted into a w x h canvas with padding."""
+    bounds: Bounds
+    width: int
+    height: int
+    padding: float
+
+    @property
+    def scale(self) -> Tuple[float, float]:
+        b = self.bounds
+        sx = (self.width - 2 * self.padding) / (b.max_lon - b.min_lon)
+        sy = (self.height - 2 * self.padding) / (b.max_lat - b.min_lat)
+        return sx, sy
+
+    def project(self, lon: float, lat: float) -> Tuple[float, float]:
+        sx, sy = self.scale
+        return self.padding + (lon - self.bounds.min_lon) * sx, self.padding + (self.bounds.max_lat - lat) * sy
+
+    def inv_project(self, x: float, y: float, clamp: bool = True) -> Tuple[float, float]:
+        """Inverse of project(); with `clamp` the point is first moved into the padded drawing area."""
+        p = self.padding
+        if clamp:
+            x = max(p, min(self.width - p, x))
+            y = max(p, min(self.height - p, y))
+        sx, sy = self.scale
+        return self.bounds.min_lon + (x - p) / sx, self.bounds.max_lat - (y - p) / sy
+
+
+# -------- Batch projection --------
+def project_flat(flat: Sequence[float], vp: Viewport) -> List[float]:
+    """Project a lon/lat-interleaved buffer to a flat [x0, y0, x1, y1, ...] list."""
+    sx, sy = vp.scale
+    ox = vp.padding - vp.bounds.min_lon * sx
+    oy = vp.padding + vp.bounds.max_lat * sy
+    if _NP_AVAILABLE and len(flat) > 64:
+        xy = np.asarray(flat, dtype=np.float64).reshape(-1, 2) * (sx, -sy) + (ox, oy)
+        return xy.ravel().tolist()
+    out = list(flat)
+    out[0::2] = [ox + lon * sx for lon in out[0::2]]
+    out[1::2] = [oy - lat * sy for lat in out[1::2]]
+    return out
+
+def project_points(points: Sequence[Union[PointFeature, LngLat]], vp: Viewport) -> List[Tuple[float, float]]:
+    """Screen position of every point feature (or bare lon/lat), in order."""
+    flat = array("d")
+    for p in points:
+        flat.append(p[0])
+        flat.append(p[1])
+    it = iter(project_flat(flat, vp))
+    return list(zip(it, it))
+
+
+class ProjectedStore:
+    """
+    One GeometryStore projected through one Viewport.
+    With NumPy every vertex is transformed in a single call up front; without
+    it rings are projected on first use. Either way each ring is converted to
+    a list once and then shared by every draw at this view.
+    """
+
+    def __init__(self, store: GeometryStore, vp: Viewport) -> None:
+        self.store = store
+        self.viewport = vp
+        self._xy = None
+        if _NP_AVAILABLE and store.n_vertices:
+            sx, sy = vp.scale
+            xy = np.frombuffer(store.coords, dtype=np.float64).reshape(-1, 2) * (sx, -sy)
+            xy += (vp.padding - vp.bounds.min_lon * sx, vp.padding + vp.bounds.max_lat * sy)
+            self._xy = xy.ravel()
+        self._rings: Dict[int, List[float]] = {}
+
+    def ring(self, i: int) -> List[float]:
+        pts = self._rings.get(i)
+        if pts is None:
+            if self._xy is not None:
+                a, b = self.store.ring_offsets[i], self.store.ring_offsets[i + 1]
+                pts = self._xy[2 * a:2 * b].tolist()
+            else:
+                pts = project_flat(self.store.ring_coords(i), self.viewport)
+            self._rings[i] = pts
+        return pts
+
+
+class ProjectionCache:
+    """
+    Last projection of each store, keyed by the view it was made for.
+    A redraw at an unchanged view reuses it; any pan, zoom or resize replaces it.
+    """
+
+    def __init__(self) -> None:
+        self._last: "WeakKeyDictionary[GeometryStore, ProjectedStore]" = WeakKeyDictionary()
+
+    def get(self, store: GeometryStore, vp: Viewport) -> ProjectedStore:
+        proj: Optional[ProjectedStore] = self._last.get(store)
+        if proj is None or proj.viewport != vp:
+            proj = ProjectedStore(store, vp)
+            self._last[store] = proj
+        return proj
+
+    def clear(self) -> None:
+        self._last.clear()
@@ -0,0 +1,348 @@
+from __future__ import annotations
+import hashlib
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple
+from weakref import WeakKeyDictionary
+from .models import Bounds, GeometryStore, Layer
+from . import config as C
+from .clip import clip_polygon
+from .diskcache import PngDiskCache
+from .geo import ring_bounds_all
+from .projection import Viewport, ProjectedStore
+from app.core.paths import cache_path
+
+# Pillow (optional): without it the renderer keeps drawing vector polygons
+try:
+    from PIL import Image, ImageDraw  # type: ignore
+    _PIL_AVAILABLE = True
+except Exception:
+    _PIL_AVAILABLE = False
+
+# Whether basemap tiles can be rendered here
+AVAILABLE = _PIL_AVAILABLE
+
+# Pre-rendered basemap tiles.
+#
+# Zoom level z has 2**z pixels per degree, independently along lon (zx) and
+# lat (zy) since the map is stretched to fit the canvas. Tile (tx, ty) of a
+# level covers pixels [tx*T, (tx+1)*T) x [ty*T, (ty+1)*T) measured from
+# (ORIGIN_LON, ORIGIN_LAT) rightwards and downwards. A view is drawn from the
+# next finer level, so tiles are only ever scaled down (by less than 2x).
+#
+# Rendered tiles are written as PNGs under cache/tiles/<layer>-<digest>/,
+# where the digest covers the source path and mtime, the style and the tile
+# size; anything else changing simply lands in another directory. Old
+# directories age out: beyond RASTER_DISK_MAX_BYTES the least recently used
+# tiles are deleted.
+#
+# A frame never renders or reads a tile on the caller's (Tk) thread: it is
+# composed from tiles already in memory, at the nearest level that has them,
+# and the missing tiles of the wanted level are rendered on a worker thread.
+# The caller draws the view again once they have landed. Only a pyramid
+# without a worker pool renders its tiles inline.
+
+ORIGIN_LON = -180.0
+ORIGIN_LAT = 90.0
+# bump when tile rendering changes, so old PNGs aren't reused
+RASTER_VERSION = 1
+
+
+class TileStyle(NamedTuple):
+    fills: Tuple[str, ...]   # feature i is filled with fills[i % len(fills)]
+    outline: str
+    width: int
+    background: str          # canvas colour; also paints holes
+
+
+def basemap_style(in_detail: bool, detail_fill_override: Optional[str] = None) -> TileStyle:
+    """Sector fills/outlines as configured: per-sector colours, or one colour in a detail view."""
+    background = getattr(C, "BACKGROUND", "white")
+    if in_detail and detail_fill_override:
+        fills: Tuple[str, ...] = (detail_fill_override,)
+    else:
+        # no palette: outlines only, like an unfilled canvas polygon
+        fills = tuple(getattr(C, "SECTOR_COLORS", ())) or (background,)
+    return TileStyle(fills, C.OUTLINE_COLOR, C.POLY_WIDTH, background)
+
+
+def draw_rings(draw: "ImageDraw.ImageDraw", store: GeometryStore, rings: List[int],
+               vp: Viewport, style: TileStyle) -> None:
+    """Paint `rings` of `store` (shells in their fill, holes in the background) in order."""
+    projected = ProjectedStore(store, vp)
+    # clipped edges run outside the image, so they never show
+    m = style.width + 2
+    for r in rings:
+        pts = clip_polygon(projected.ring(r), -m, -m, vp.width + m, vp.height + m)
+        if len(pts) < 6:
+            continue
+        fill = style.background if store.is_hole(r) else style.fills[store.geom_of_ring(r) % len(style.fills)]
+        draw.polygon(pts, fill=fill)
+        if style.width > 0:
+            draw.line(pts + pts[:2], fill=style.outline, width=style.width, joint="curve")
+
+
+class TileCache:
+    """Decoded tiles shared by every pyramid, LRU by tile count (None marks an empty tile; thread-safe)."""
+
+    def __init__(self, max_tiles: int) -> None:
+        self.max_tiles = max(1, max_tiles)
+        self._tiles: "OrderedDict[Hashable, Optional[Image.Image]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Optional["Image.Image"]]:
+        with self._lock:
+            if key not in self._tiles:
+                return False, None
+            self._tiles.move_to_end(key)
+            return True, self._tiles[key]
+
+    def put(self, key: Hashable, tile: Optional["Image.Image"]) -> None:
+        with self._lock:
+            self._tiles[key] = tile
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+
+
+_disk_cache: Optional[PngDiskCache] = None
+_disk_cache_lock = Lock()
+
+def tile_disk_cache() -> PngDiskCache:
+    """The process-wide tile store under cache/tiles/."""
+    global _disk_cache
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            _disk_cache = PngDiskCache(C.RASTER_DISK_MAX_BYTES, cache_path("tiles"))
+        return _disk_cache
+
+
+class TilePyramid:
+    """Basemap tiles (fills and outlines) for one layer in one style."""
+
+    def __init__(self, layer: Layer, style: TileStyle, tile_px: int, cache: TileCache,
+                 pool: Optional[ThreadPoolExecutor] = None) -> None:
+        self.layer = layer
+        self.style = style
+        self.tile_px = tile_px
+        self.cache = cache
+        self.pool = pool
+        # tiles being rendered in the background, by cache key
+        self._pending: Dict[Hashable, Future] = {}
+        self._pending_lock = Lock()
+        src = Path(layer.path).resolve()
+        digest = hashlib.sha1(repr(
+            (os.fsencode(src), layer.mtime_ns, tuple(style), tile_px, RASTER_VERSION)
+        ).encode("utf-8")).hexdigest()[:16]
+        self.key = f"{src.stem}-{digest}"
+        self._bboxes: "WeakKeyDictionary[GeometryStore, List[Bounds]]" = WeakKeyDictionary()
+
+    # ---- levels ----
+    @staticmethod
+    def zoom_for(px_per_deg: float) -> int:
+        """Finest-needed level: the first with at least `px_per_deg` pixels per degree."""
+        return math.ceil(math.log2(max(px_per_deg, 1e-9)))
+
+    def _store_for(self, zx: int, zy: int) -> GeometryStore:
+        if self.layer.lod is None:
+            return self.layer.rings
+        return self.layer.lod.for_scale(max(2.0 ** zx, 2.0 ** zy))
+
+    def _ring_bboxes(self, store: GeometryStore) -> List[Bounds]:
+        bboxes = self._bboxes.get(store)
+        if bboxes is None:
+            bboxes = ring_bounds_all(store)
+            self._bboxes[store] = bboxes
+        return bboxes
+
+    # ---- tiles ----
+    def tile(self, zx: int, zy: int, tx: int, ty: int) -> Optional["Image.Image"]:
+        """The tile image, or None when no geometry touches it."""
+        key = (self.key, zx, zy, tx, ty)
+        hit, img = self.cache.get(key)
+        if hit:
+            return img
+        with self._pending_lock:
+            fut = self._pending.get(key)
+        if fut is not None and not fut.cancel():
+            # already being rendered: wait for it rather than render it twice
+            try:
+                return fut.result()
+            except CancelledError:
+                pass
+        img = self._load_or_render(zx, zy, tx, ty)
+        self.cache.put(key, img)
+        return img
+
+    def request(self, zx: int, zy: int, tiles: List[Tuple[int, int]]) -> None:
+        """Render `tiles` of level (zx, zy) in the background; queued tiles not among them are dropped."""
+        if self.pool is None:
+            return
+        wanted = {(self.key, zx, zy, tx, ty) for tx, ty in tiles}
+        submitted: List[Tuple[Hashable, Future]] = []
+        with self._pending_lock:
+            for key in [k for k in self._pending if k not in wanted]:
+                if self._pending[key].cancel():
+                    del self._pending[key]
+            for key in wanted:
+                if key in self._pending or self.cache.get(key)[0]:
+                    continue
+                fut = self.pool.submit(self._load_or_render, *key[1:])
+                self._pending[key] = fut
+                submitted.append((key, fut))
+        # registered outside the lock because an already-done future runs it inline
+        for key, fut in submitted:
+            fut.add_done_callback(lambda f, k=key: self._landed(k, f))
+
+    def _landed(self, key: Hashable, fut: Future) -> None:
+        # worker thread: cache the tile first, so it is never missing from both
+        if not fut.cancelled() and fut.exception() is None:
+            self.cache.put(key, fut.result())
+        with self._pending_lock:
+            if self._pending.get(key) is fut:
+                del self._pending[key]
+
+    @property
+    def pending(self) -> bool:
+        """True while background tiles are still being rendered."""
+        with self._pending_lock:
+            return bool(self._pending)
+
+    def _tile_viewport(self, zx: int, zy: int, tx: int, ty: int) -> Viewport:
+        t = self.tile_px
+        kx, ky = 2.0 ** zx, 2.0 ** zy
+        min_lon = ORIGIN_LON + tx * t / kx
+        max_lat = ORIGIN_LAT - ty * t / ky
+        return Viewport(Bounds(min_lon, min_lon + t / kx, max_lat - t / ky, max_lat), t, t, 0)
+
+    def _load_or_render(self, zx: int, zy: int, tx: int, ty: int) -> Optional["Image.Image"]:
+        vp = self._tile_viewport(zx, zy, tx, ty)
+        store = self._store_for(zx, zy)
+        # outlines reach `width` pixels past a ring's bbox
+        sx, sy = vp.scale
+        mx, my = self.style.width / sx, self.style.width / sy
+        b = vp.bounds
+        hits = [
+            r for r, rb in enumerate(self._ring_bboxes(store))
+            if rb.max_lon >= b.min_lon - mx and rb.min_lon <= b.max_lon + mx
+            and rb.max_lat >= b.min_lat - my and rb.min_lat <= b.max_lat + my
+        ]
+        if not hits:
+            return None
+
+        disk = tile_disk_cache()
+        name = f"{self.key}/{zx}_{zy}/{tx}_{ty}"
+        img = disk.get(name)
+        if img is not None:
+            return img
+        img = self._render(store, hits, vp)
+        disk.put(name, img)
+        return img
+
+    def _render(self, store: GeometryStore, rings: List[int], vp: Viewport) -> "Image.Image":
+        img = Image.new("RGB", (self.tile_px, self.tile_px), self.style.background)
+        draw_rings(ImageDraw.Draw(img), store, rings, vp, self.style)
+        return img
+
+    # ---- views ----
+    def render_view(self, vp: Viewport, fast: bool = False) -> Tuple["Image.Image", bool]:
+        """
+        The basemap for a whole canvas (vp.width x vp.height) at this view,
+        and whether it is final. With a pool only tiles already in memory are
+        used (see the top of this module): the wanted level's missing tiles
+        are requested, and until they land the view is not final. `fast`
+        trades resampling quality for speed while animating.
+        """
+        sx, sy = vp.scale
+        zx, zy = self.zoom_for(sx), self.zoom_for(sy)
+        if self.pool is None:
+            return self._compose(vp, zx, zy, fast), True
+        missing = [(tx, ty) for tx, ty in self._tiles_for(vp, zx, zy)
+                   if not self.cache.get((self.key, zx, zy, tx, ty))[0]]
+        self.request(zx, zy, missing)
+        if missing:
+            zx, zy = self._cached_level(vp, zx, zy)
+        return self._compose(vp, zx, zy, fast, cached_only=True), not missing
+
+    def _view_box(self, vp: Viewport, zx: int, zy: int) -> Tuple[float, float, float, float]:
+        # canvas rectangle in level pixels (the padding is part of the canvas)
+        sx, sy = vp.scale
+        kx, ky = 2.0 ** zx, 2.0 ** zy
+        lon_left = vp.bounds.min_lon - vp.padding / sx
+        lat_top = vp.bounds.max_lat + vp.padding / sy
+        x0 = (lon_left - ORIGIN_LON) * kx
+        y0 = (ORIGIN_LAT - lat_top) * ky
+        return x0, y0, x0 + vp.width * kx / sx, y0 + vp.height * ky / sy
+
+    def _tile_range(self, vp: Viewport, zx: int, zy: int) -> Tuple[int, int, int, int]:
+        x0, y0, x1, y1 = self._view_box(vp, zx, zy)
+        t = self.tile_px
+        return math.floor(x0 / t), math.ceil(x1 / t) - 1, math.floor(y0 / t), math.ceil(y1 / t) - 1
+
+    def _tiles_for(self, vp: Viewport, zx: int, zy: int) -> Iterator[Tuple[int, int]]:
+        tx0, tx1, ty0, ty1 = self._tile_range(vp, zx, zy)
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                yield tx, ty
+
+    def _cached_level(self, vp: Viewport, zx: int, zy: int) -> Tuple[int, int]:
+        """The level nearest (zx, zy) with the most of this view in memory (coarser first on ties)."""
+        best, best_share = (zx, zy), -1.0
+        for d in (0, -1, 1, -2, 2, -3, -4):
+            tiles = list(self._tiles_for(vp, zx + d, zy + d))
+            if len(tiles) > 64:
+                continue  # a much finer level: more tiles than one frame should look at
+            have = sum(1 for tx, ty in tiles if self.cache.get((self.key, zx + d, zy + d, tx, ty))[0])
+            share = have / max(1, len(tiles))
+            if share > best_share:
+                best, best_share = (zx + d, zy + d), share
+            if share == 1.0:
+                break
+        return best
+
+    def _compose(self, vp: Viewport, zx: int, zy: int, fast: bool, cached_only: bool = False) -> "Image.Image":
+        t = self.tile_px
+        x0, y0, x1, y1 = self._view_box(vp, zx, zy)
+        tx0, tx1, ty0, ty1 = self._tile_range(vp, zx, zy)
+        mosaic = Image.new("RGB", ((tx1 - tx0 + 1) * t, (ty1 - ty0 + 1) * t), self.style.background)
+        for tx, ty in self._tiles_for(vp, zx, zy):
+            if cached_only:
+                tile = self.cache.get((self.key, zx, zy, tx, ty))[1]
+            else:
+                tile = self.tile(zx, zy, tx, ty)
+            if tile is not None:
+                mosaic.paste(tile, ((tx - tx0) * t, (ty - ty0) * t))
+        box = (x0 - tx0 * t, y0 - ty0 * t, x1 - tx0 * t, y1 - ty0 * t)
+        # filtering dominates the cost; while animating nobody sees the aliasing
+        resample = Image.NEAREST if fast else Image.LANCZOS
+        return mosaic.resize((max(1, vp.width), max(1, vp.height)), resample, box=box)
+
+
+class Basemap:
+    """Tile pyramids for the layers shown so far, sharing one TileCache."""
+
+    def __init__(self, tile_px: int, max_tiles: int, workers: int = 1) -> None:
+        self.tile_px = tile_px
+        self.cache = TileCache(max_tiles)
+        self._pyramids: Dict[Tuple[Path, int, TileStyle], TilePyramid] = {}
+        # renders the tiles frames are missing
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="tiles")
+
+    def pyramid(self, layer: Layer, style: TileStyle) -> TilePyramid:
+        key = (Path(layer.path), layer.mtime_ns, style)
+        pyr = self._pyramids.get(key)
+        if pyr is None or pyr.layer is not layer:
+            pyr = TilePyramid(layer, style, self.tile_px, self.cache, self.pool)
+            self._pyramids[key] = pyr
+        return pyr
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,212 @@
+from __future__ import annotations
+import heapq
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Sequence, Tuple
+from .models import PointFeature
+
+# Type-ahead search over the sites of every detail layer.
+#
+# Each site contributes a few weighted fields (its name, its sector ID, and
+# the control-unit names and frequencies of its `freq` dict). Field tokens
+# are indexed by their trigrams, padded at the front so that a short prefix
+# ("h", "ha") still forms a gram. A query is scored per field by the share of
+# its grams found there, so typos and partial words still rank sensibly.
+#
+# Grams every site shares (the guard frequency, a sector ID prefix) would make
+# each keystroke score thousands of fields, so their postings aren't walked;
+# the fields holding only such grams are taken from a sorted word index in
+# name order, as far as the result list needs them (see COMMON_POSTINGS).
+
+FIELD_SITE = 3.0
+FIELD_SECTOR = 2.0
+FIELD_FREQ = 1.0
+
+# a result needs at least this share of the query's grams in one field
+MIN_SIMILARITY = 0.4
+
+# Grams found in more fields than this (of one weight) are "common": their
+# postings are not walked. Fields matching only common grams are found
+# through the word index when they extend every query word, and are skipped
+# otherwise unless they could still reach the results.
+COMMON_POSTINGS = 64
+
+# words as normalize() splits them, but with decimals kept whole ("121.500")
+_TOKEN = re.compile(r"\d+(?:\.\d+)?|[^\W_]+")
+
+
+def tokens(s: str) -> List[str]:
+    """Search tokens of `s`: lower-case words and numbers, trailing decimal zeros dropped."""
+    out = []
+    for t in _TOKEN.findall(str(s).lower()):
+        if "." in t:
+            t = t.rstrip("0").rstrip(".")
+        out.append(t)
+    return out
+
+def _grams(token: str) -> List[str]:
+    padded = "  " + token
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class SiteHit(NamedTuple):
+    ring: int        # main-map feature whose detail layer holds the site
+    index: int       # position in that layer's points
+    site: str
+    sector_id: str
+    lon: float
+    lat: float
+    score: float
+
+
+class SiteSearch:
+    """
+    Trigram index over site names, sector IDs and frequency strings. Equal
+    scores rank by site number; build() numbers the sites by name.
+    """
+
+    def __init__(self) -> None:
+        self._sites: List[Tuple[int, int, str, str, float, float]] = []
+        self._fields: List[Tuple[int, float, Tuple[str, ...]]] = []  # (site, weight, tokens)
+        # per field weight: gram -> field numbers, and word -> field numbers
+        self._postings: Dict[float, Dict[str, List[int]]] = {}
+        self._words: Dict[float, Dict[str, List[int]]] = {}
+        self._sorted_words: Dict[float, List[str]] = {}  # keys of _words, sorted on first use
+
+    @classmethod
+    def build(cls, layers: Mapping[int, Sequence[PointFeature]]) -> "SiteSearch":
+        """Index the points of each detail layer, keyed by its main-map feature index."""
+        index = cls()
+        entries = [(ring, i, p) for ring, points in layers.items() for i, p in enumerate(points)]
+        entries.sort(key=lambda e: (str(e[2][2] or "").lower(), e[0], e[1]))
+        for ring, i, p in entries:
+            index.add(ring, i, p)
+        return index
+
+    def add(self, ring: int, index: int, p: PointFeature) -> None:
+        lon, lat, site, sector_id, freq, _power = p
+        s = len(self._sites)
+        self._sites.append((ring, index, str(site or ""), str(sector_id or ""), lon, lat))
+        fields: List[Tuple[float, Iterable[str]]] = [(FIELD_SITE, [site]), (FIELD_SECTOR, [sector_id])]
+        if isinstance(freq, dict):
+            fields.extend((FIELD_FREQ, [k, v]) for k, v in freq.items())
+        for weight, texts in fields:
+            toks = tuple(t for text in texts if text for t in tokens(text))
+            if not toks:
+                continue
+            f = len(self._fields)
+            self._fields.append((s, weight, toks))
+            postings = self._postings.setdefault(weight, {})
+            for g in {g for t in toks for g in _grams(t)}:
+                postings.setdefault(g, []).append(f)
+            words = self._words.setdefault(weight, {})
+            for t in set(toks):
+                words.setdefault(t, []).append(f)
+        self._sorted_words.clear()
+
+    def __len__(self) -> int:
+        return len(self._sites)
+
+    def query(self, text: str, limit: int = 10) -> List[SiteHit]:
+        """Best-matching sites for `text`, highest score first (ties by name)."""
+        q = [(t, _grams(t)) for t in tokens(text)]
+        if not q or limit <= 0:
+            return []
+        part: Dict[str, float] = {}  # each distinct gram's share of the query
+        for _t, grams in q:
+            for g in grams:
+                part[g] = part.get(g, 0.0) + 1.0 / (len(grams) * len(q))
+
+        best: Dict[int, float] = {}
+        skipped: List[Tuple[float, float]] = []  # (weight, bound) of fields left unscored
+        for weight in sorted(self._postings, reverse=True):
+            # a field scores at most 2 * weight: leave lighter fields once they can't reach the results
+            if len(best) >= limit and heapq.nlargest(limit, best.values())[-1] > 2.0 * weight:
+                break
+            bound = self._score(weight, q, part, best, limit, exhaustive=False)
+            if bound:
+                skipped.append((weight, bound))
+        if skipped:
+            kth = heapq.nlargest(limit, best.values())[-1] if len(best) >= limit else 0.0
+            for weight, bound in skipped:
+                if bound >= kth:
+                    self._score(weight, q, part, best, limit, exhaustive=True)
+
+        ranked = heapq.nsmallest(limit, best.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [SiteHit(*self._sites[s], score) for s, score in ranked]
+
+    def _score(self, weight: float, q: List[Tuple[str, List[str]]], part: Dict[str, float],
+               best: Dict[int, float], limit: int, exhaustive: bool) -> float:
+        """
+        Raise best[site] to the score of its matching fields of this weight.
+        Unless `exhaustive`, common grams' postings are skipped; returns the
+        most any field left unscored could have scored (0.0 if none).
+        """
+        postings = self._postings[weight]
+        share: Dict[int, float] = {}
+        common: List[str] = []
+        for g, p in part.items():
+            fields = postings.get(g, ())
+            if not exhaustive and len(fields) > COMMON_POSTINGS:
+                common.append(g)
+                continue
+            for f in fields:
+                share[f] = share.get(f, 0.0) + p
+        common_share = sum(part[g] for g in common)
+        bound = weight * common_share if common_share >= MIN_SIMILARITY else 0.0
+
+        if common and len(common) == len(part):
+            # Only common grams: the fields extending every query word hold them
+            # all and score 2 * weight, the most this weight can. Equal scores
+            # rank by site number, so the first `limit` sites reached are enough.
+            score = round(weight * common_share, 9) + weight
+            taken = 0
+            for f in self._extending(weight, [t for t, _g in q]):
+                s = self._fields[f][0]
+                if best.get(s, 0.0) >= score:
+                    continue
+                best[s] = score
+                taken += 1
+                if taken == limit:
+                    break
+            return bound
+
+        for f, sim in share.items():
+            if sim + common_share < MIN_SIMILARITY:
+                continue
+            for g in common:
+                fields = postings[g]
+                i = bisect_left(fields, f)
+                if i < len(fields) and fields[i] == f:
+                    sim += part[g]
+            if sim < MIN_SIMILARITY:
+                continue
+            s, _weight, toks = self._fields[f]
+            score = round(weight * sim, 9)  # equal shares summed in another order still tie
+            # whole-word prefixes beat scattered grams ("hai" -> "Hail" over "Shaybah")
+            if all(any(ft.startswith(t) for ft in toks) for t, _g in q):
+                score += weight
+            if score > best.get(s, 0.0):
+                best[s] = score
+        return bound
+
+    def _extending(self, weight: float, words: List[str]) -> Iterator[int]:
+        """Fields of this weight with, for each of `words`, a token starting with it; in field order."""
+        index = self._words[weight]
+        keys = self._sorted_words.get(weight)
+        if keys is None:
+            keys = self._sorted_words[weight] = sorted(index)
+        first, *rest = sorted(set(words), key=len, reverse=True)  # the longest is the rarest
+        lists = []
+        i = bisect_left(keys, first)
+        while i < len(keys) and keys[i].startswith(first):
+            lists.append(index[keys[i]])
+            i += 1
+        last = -1
+        for f in heapq.merge(*lists):
+            if f == last:
+                continue  # under two of the words
+            last = f
+            toks = self._fields[f][2]
+            if all(any(t.startswith(w) for t in toks) for w in rest):
+                yield f
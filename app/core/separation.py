@@ -0,0 +1,188 @@
+from __future__ import annotations
+import bisect
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from . import config as C
+from .sites import Site, SiteRegistry, to_khz
+from .spatial import EARTH_RADIUS_KM, haversine_km
+
+# NumPy (optional) for the distance matrix and the pair search
+try:
+    import numpy as np  # type: ignore
+    _NP_AVAILABLE = True
+except Exception:
+    _NP_AVAILABLE = False
+
+# Frequency-reuse check: two different sites on the same frequency
+# (co-channel), or on frequencies at most one channel apart (adjacent
+# channel), must be at least the configured distance apart. Guard
+# frequencies that every site carries (121.5 / 243.0 MHz) are exempt.
+#
+# With NumPy the great-circle distances between all sites are kept as one
+# matrix, and candidate pairs come from a single sort of every (site, kHz)
+# assignment: each assignment is paired with the ones after it that lie
+# within one channel, so the work grows with the pairs actually close in
+# frequency, not with all n^2 site pairs. Moving or retuning one site only
+# recomputes its row of the matrix and its own pairs.
+
+CO_CHANNEL = "co-channel"
+ADJACENT = "adjacent"
+
+
+class Conflict(NamedTuple):
+    a: int            # site ids, a < b
+    b: int
+    khz_a: int
+    khz_b: int
+    distance_km: float
+    kind: str         # CO_CHANNEL | ADJACENT
+    required_km: float
+
+
+def distance_matrix(lon: Sequence[float], lat: Sequence[float]) -> "np.ndarray":
+    """n x n great-circle distances in km (float32)."""
+    lam = np.radians(np.asarray(lon, dtype=np.float64))
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    return _haversine_rows(lam, phi, lam, phi)
+
+def _haversine_rows(lam_a, phi_a, lam_b, phi_b) -> "np.ndarray":
+    # rows: points a, columns: points b
+    dphi = phi_b[None, :] - phi_a[:, None]
+    dlam = lam_b[None, :] - lam_a[:, None]
+    h = np.sin(dphi / 2) ** 2 + np.cos(phi_a)[:, None] * np.cos(phi_b)[None, :] * np.sin(dlam / 2) ** 2
+    return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))).astype(np.float32)
+
+
+class SeparationAnalyzer:
+    """Co-/adjacent-channel pairs closer than the thresholds, kept current as sites change."""
+
+    def __init__(self, sites: Sequence[Site],
+                 co_channel_km: float = C.SEPARATION_CO_CHANNEL_KM,
+                 adjacent_km: float = C.SEPARATION_ADJACENT_KM,
+                 channel_khz: int = C.SEPARATION_CHANNEL_KHZ,
+                 exempt_mhz: Iterable[float] = C.SEPARATION_EXEMPT_MHZ) -> None:
+        self.co_channel_km = co_channel_km
+        self.adjacent_km = adjacent_km
+        self.channel_khz = channel_khz
+        self.exempt = {to_khz(f) for f in exempt_mhz}
+        self.lon = [s.lon for s in sites]
+        self.lat = [s.lat for s in sites]
+        self.khz: List[Tuple[int, ...]] = [self._checked(s.khz) for s in sites]
+        self._dist = distance_matrix(self.lon, self.lat) if _NP_AVAILABLE and sites else None
+        self._sorted: Optional[Tuple[List[int], List[int]]] = None
+        self._pairs: Dict[Tuple[int, int, int, int], Conflict] = {}
+        for c in self._all_conflicts():
+            self._pairs[c[:4]] = c
+
+    @classmethod
+    def from_registry(cls, registry: SiteRegistry, **thresholds) -> "SeparationAnalyzer":
+        return cls(registry.sites, **thresholds)
+
+    def _checked(self, khz: Iterable[int]) -> Tuple[int, ...]:
+        return tuple(sorted({k for k in khz if k not in self.exempt}))
+
+    # ---- results ----
+    def conflicts(self) -> List[Conflict]:
+        """Every violation, worst first (largest shortfall against its threshold)."""
+        return sorted(self._pairs.values(), key=lambda c: (c.distance_km - c.required_km, c.a, c.b, c.khz_a))
+
+    def conflicts_for(self, site: int) -> List[Conflict]:
+        mine = [c for k, c in self._pairs.items() if site in (k[0], k[1])]
+        return sorted(mine, key=lambda c: (c.distance_km - c.required_km, c.a, c.b, c.khz_a))
+
+    def distance_km(self, a: int, b: int) -> float:
+        if self._dist is not None:
+            return float(self._dist[a, b])
+        return haversine_km(self.lon[a], self.lat[a], self.lon[b], self.lat[b])
+
+    # ---- incremental update ----
+    def update_site(self, site: int, lon: Optional[float] = None, lat: Optional[float] = None,
+                    khz: Optional[Iterable[int]] = None) -> List[Conflict]:
+        """Move and/or retune one site; returns its conflicts afterwards."""
+        if lon is not None:
+            self.lon[site] = lon
+        if lat is not None:
+            self.lat[site] = lat
+        if khz is not None:
+            self.khz[site] = self._checked(khz)
+            self._sorted = None
+        if self._dist is not None and (lon is not None or lat is not None):
+            lam, phi = np.radians(np.asarray(self.lon)), np.radians(np.asarray(self.lat))
+            row = _haversine_rows(lam[site:site + 1], phi[site:site + 1], lam, phi)[0]
+            self._dist[site, :] = row
+            self._dist[:, site] = row
+        for key in [k for k in self._pairs if site in (k[0], k[1])]:
+            del self._pairs[key]
+        for c in self._site_conflicts(site):
+            self._pairs[c[:4]] = c
+        return self.conflicts_for(site)
+
+    # ---- pair search ----
+    def _assignments(self) -> Tuple[List[int], List[int]]:
+        """kHz and site of every checked frequency, sorted by kHz (kept until a site is retuned)."""
+        if self._sorted is None:
+            pairs = sorted((k, s) for s, ks in enumerate(self.khz) for k in ks)
+            self._sorted = [k for k, _s in pairs], [s for _k, s in pairs]
+        return self._sorted
+
+    def _conflict(self, a: int, fa: int, b: int, fb: int, d: float) -> Optional[Conflict]:
+        required = self.co_channel_km if fa == fb else self.adjacent_km
+        if d >= required:
+            return None
+        if a > b:
+            a, b, fa, fb = b, a, fb, fa
+        return Conflict(a, b, fa, fb, d, CO_CHANNEL if fa == fb else ADJACENT, required)
+
+    def _all_conflicts(self) -> List[Conflict]:
+        f, s = self._assignments()
+        if not f:
+            return []
+        if self._dist is None:
+            out = []
+            for i in range(len(f)):
+                j = i + 1
+                while j < len(f) and f[j] - f[i] <= self.channel_khz:
+                    if s[i] != s[j]:
+                        c = self._conflict(s[i], f[i], s[j], f[j], self.distance_km(s[i], s[j]))
+                        if c is not None:
+                            out.append(c)
+                    j += 1
+            return out
+
+        fa, sa = np.asarray(f, dtype=np.int64), np.asarray(s, dtype=np.int64)
+        # pair every assignment with the later ones at most one channel above it
+        hi = np.searchsorted(fa, fa + self.channel_khz, side="right")
+        counts = hi - np.arange(len(fa)) - 1
+        ii = np.repeat(np.arange(len(fa)), counts)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        jj = ii + 1 + (np.arange(len(ii)) - starts)
+        other = sa[ii] != sa[jj]
+        ii, jj = ii[other], jj[other]
+        d = self._dist[sa[ii], sa[jj]]
+        co = fa[ii] == fa[jj]
+        bad = d < np.where(co, self.co_channel_km, self.adjacent_km)
+        out = []
+        for i, j, dist in zip(ii[bad].tolist(), jj[bad].tolist(), d[bad].tolist()):
+            c = self._conflict(s[i], f[i], s[j], f[j], dist)
+            if c is not None:
+                out.append(c)
+        return out
+
+    def _site_conflicts(self, site: int) -> List[Conflict]:
+        f, s = self._assignments()
+        out = []
+        for k in self.khz[site]:
+            lo = bisect.bisect_left(f, k - self.channel_khz)
+            hi = bisect.bisect_right(f, k + self.channel_khz)
+            others = [(f[i], s[i]) for i in range(lo, hi) if s[i] != site]
+            if not others:
+                continue
+            if self._dist is not None:
+                ids = np.fromiter((o for _f, o in others), dtype=np.int64, count=len(others))
+                dists = self._dist[site, ids].tolist()
+            else:
+                dists = [self.distance_km(site, o) for _f, o in others]
+            for (fo, o), d in zip(others, dists):
+                c = self._conflict(site, k, o, fo, d)
+                if c is not None:
+                    out.append(c)
+        return out
@@ -0,0 +1,184 @@
+from __future__ import annotations
+import heapq
+import math
+from array import array
+from typing import List, Sequence, Tuple
+from .models import Bounds, GeometryStore
+
+# NumPy (optional) for the farthest-point search inside each DP segment
+try:
+    import numpy as np  # type: ignore
+    _NP_AVAILABLE = True
+except Exception:
+    _NP_AVAILABLE = False
+
+# Rings are closed (first == last), so 4 vertices is the smallest ring that still encloses area
+MIN_RING_POINTS = 4
+
+
+# -------- Douglas–Peucker --------
+def _farthest_py(xs: Sequence[float], ys: Sequence[float], i0: int, i1: int) -> Tuple[float, int]:
+    ax, ay, bx, by = xs[i0], ys[i0], xs[i1], ys[i1]
+    dx, dy = bx - ax, by - ay
+    seg2 = dx * dx + dy * dy
+    best_d, best_i = -1.0, -1
+    for i in range(i0 + 1, i1):
+        px, py = xs[i] - ax, ys[i] - ay
+        if seg2 > 0.0:
+            t = max(0.0, min(1.0, (px * dx + py * dy) / seg2))
+            px -= t * dx
+            py -= t * dy
+        d = px * px + py * py
+        if d > best_d:
+            best_d, best_i = d, i
+    return math.sqrt(best_d), best_i
+
+def _farthest_np(xs, ys, i0: int, i1: int) -> Tuple[float, int]:
+    ax, ay, bx, by = xs[i0], ys[i0], xs[i1], ys[i1]
+    dx, dy = bx - ax, by - ay
+    seg2 = dx * dx + dy * dy
+    px, py = xs[i0 + 1:i1] - ax, ys[i0 + 1:i1] - ay
+    if seg2 > 0.0:
+        t = np.clip((px * dx + py * dy) / seg2, 0.0, 1.0)
+        px = px - t * dx
+        py = py - t * dy
+    d = px * px + py * py
+    k = int(d.argmax())
+    return float(math.sqrt(d[k])), i0 + 1 + k
+
+# segments shorter than this are cheaper to scan in plain Python than to slice into NumPy
+_NP_MIN_SEGMENT = 256
+
+def dp_significance(flat: Sequence[float]) -> Tuple[List[int], List[float]]:
+    """
+    Run Douglas–Peucker to completion over a lon/lat-interleaved ring.
+    Returns the interior vertices in the order DP would add them and the
+    tolerance each survives up to (non-increasing), so any tolerance is a prefix.
+    """
+    n = len(flat) // 2
+    seq = list(flat)
+    xs, ys = seq[0::2], seq[1::2]
+    if _NP_AVAILABLE and n > _NP_MIN_SEGMENT:
+        xy = np.asarray(seq, dtype=np.float64)
+        nxs, nys = xy[0::2], xy[1::2]
+    else:
+        nxs = nys = None
+
+    order: List[int] = []
+    sigs: List[float] = []
+    heap: List[Tuple[float, int, int, int]] = []
+
+    def push(i0: int, i1: int, cap: float) -> None:
+        if i1 - i0 > 1:
+            if nxs is not None and i1 - i0 > _NP_MIN_SEGMENT:
+                d, i = _farthest_np(nxs, nys, i0, i1)
+            else:
+                d, i = _farthest_py(xs, ys, i0, i1)
+            # capping at the parent's value keeps the pop order monotone
+            heapq.heappush(heap, (-min(d, cap), i0, i1, i))
+
+    push(0, n - 1, math.inf)
+    while heap:
+        neg_d, i0, i1, i = heapq.heappop(heap)
+        order.append(i)
+        sigs.append(-neg_d)
+        push(i0, i, -neg_d)
+        push(i, i1, -neg_d)
+    return order, sigs
+
+def _select(flat: Sequence[float], order: List[int], sigs: List[float], tolerance: float,
+            min_points: int) -> array:
+    n = len(flat) // 2
+    k = 0
+    while k < len(sigs) and sigs[k] > tolerance:
+        k += 1
+    k = min(len(order), max(k, min_points - 2))
+    kept = sorted([0, n - 1, *order[:k]])
+    out = array("d")
+    for i in kept:
+        out.append(flat[2 * i])
+        out.append(flat[2 * i + 1])
+    return out
+
+def simplify_ring(flat: Sequence[float], tolerance: float, min_points: int = MIN_RING_POINTS) -> array:
+    """
+    Douglas–Peucker over a lon/lat-interleaved ring; returns the kept vertices, flat.
+    Rings never collapse below `min_points` vertices.
+    """
+    if len(flat) // 2 <= min_points or tolerance <= 0.0:
+        return array("d", flat)
+    order, sigs = dp_significance(flat)
+    return _select(flat, order, sigs, tolerance, min_points)
+
+def simplify_store_levels(store: GeometryStore, tolerances: Sequence[float],
+                          min_points: int = MIN_RING_POINTS) -> List[GeometryStore]:
+    """
+    One simplified store per tolerance, from a single DP pass per ring.
+    Ring/polygon/feature structure (and thus every index) is unchanged.
+    """
+    coords = [array("d") for _ in tolerances]
+    offsets = [array("q", [0]) for _ in tolerances]
+    for r in range(len(store)):
+        flat = store.ring_coords(r).tolist()
+        if len(flat) // 2 > min_points:
+            order, sigs = dp_significance(flat)
+        for k, tol in enumerate(tolerances):
+            if len(flat) // 2 <= min_points or tol <= 0.0:
+                coords[k].extend(flat)
+            else:
+                coords[k].extend(_select(flat, order, sigs, tol, min_points))
+            offsets[k].append(len(coords[k]) // 2)
+    return [
+        GeometryStore(memoryview(c), memoryview(o), store.polygon_offsets, store.geom_offsets)
+        for c, o in zip(coords, offsets)
+    ]
+
+def simplify_store(store: GeometryStore, tolerance: float) -> GeometryStore:
+    """Simplify every ring; ring/polygon/feature structure (and thus indices) is unchanged."""
+    return simplify_store_levels(store, [tolerance])[0]
+
+
+# -------- Level-of-detail pyramid --------
+class LodPyramid:
+    """
+    Pre-simplified copies of one GeometryStore, finest first.
+    Level 0 is the source geometry (tolerance 0); each level is used once
+    its tolerance shrinks below `max_error_px` on screen.
+    """
+
+    def __init__(self, store: GeometryStore, tolerances: Sequence[float], max_error_px: float = 0.75) -> None:
+        self.max_error_px = max_error_px
+        # what the pyramid was asked for (levels that dropped nothing are left out below)
+        self.tolerances: Tuple[float, ...] = tuple(sorted(t for t in tolerances if t > 0.0))
+        self.levels: List[Tuple[float, GeometryStore]] = [(0.0, store)]
+        for tol, level in zip(self.tolerances, simplify_store_levels(store, self.tolerances)):
+            # a level that drops nothing would only cost memory
+            if level.n_vertices < self.levels[-1][1].n_vertices:
+                self.levels.append((tol, level))
+
+    @classmethod
+    def from_levels(cls, store: GeometryStore, tolerances: Sequence[float],
+                    levels: Sequence[Tuple[float, GeometryStore]], max_error_px: float = 0.75) -> "LodPyramid":
+        """A pyramid over levels simplified earlier (e.g. read back from the geocache)."""
+        lod = cls.__new__(cls)
+        lod.max_error_px = max_error_px
+        lod.tolerances = tuple(sorted(t for t in tolerances if t > 0.0))
+        lod.levels = [(0.0, store), *levels]
+        return lod
+
+    @property
+    def nbytes(self) -> int:
+        return sum(s.nbytes for _t, s in self.levels[1:])
+
+    def for_scale(self, px_per_deg: float, error_scale: float = 1.0) -> GeometryStore:
+        """Coarsest level whose tolerance stays under max_error_px (x error_scale) at this scale."""
+        chosen = self.levels[0][1]
+        for tol, level in self.levels[1:]:
+            if tol * px_per_deg <= self.max_error_px * error_scale:
+                chosen = level
+        return chosen
+
+    def for_view(self, bounds: Bounds, w: int, h: int, padding: int, error_scale: float = 1.0) -> GeometryStore:
+        sx = (w - 2 * padding) / max(1e-12, bounds.max_lon - bounds.min_lon)
+        sy = (h - 2 * padding) / max(1e-12, bounds.max_lat - bounds.min_lat)
+        return self.for_scale(max(sx, sy, 0.0), error_scale)
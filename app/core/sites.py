@@ -0,0 +1,211 @@
+from __future__ import annotations
+import bisect
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from . import config as C
+from .geo import load_layer
+from .models import PointFeature
+from .text import normalize
+
+# Every site of every detail layer, loaded once, with the free-form `freq`
+# and `power` dicts parsed into values that can be indexed:
+#
+#   freq  {"Jeddah Control": "Main/Standby 128.100 MHz, 134.000 MHz"}
+#         -> control unit "jeddah control" on 128100 and 134000 kHz
+#   power {"Back-up": "Sans Generator, SANS UPS"}
+#         -> role "backup", sources "sans generator" and "sans ups"
+#
+# Frequencies are kept as integer kHz so equality is exact. Units, roles
+# and sources are compared normalized (see text.normalize), so the data's
+# spelling variants ("Back-up"/"Backup", "SANS UPS"/"Sans UPS") meet.
+# freq keys are indexed under the control units they name: a second entry
+# for a unit carries a "(2)" suffix, and one entry can serve several units
+# ("Jeddah/Riyadh Control").
+
+_MHZ = re.compile(r"(\d+(?:\.\d+)?)\s*MHz", re.IGNORECASE)
+_UNIT_COUNTER = re.compile(r"\s*\(\d+\)\s*$")
+
+# power dict keys that name the same role
+_ROLE_ALIASES = {"back up": "backup"}
+
+
+def parse_frequencies(text: str) -> List[int]:
+    """Frequencies mentioned in `text`, in kHz: "Main/Standby 121.500 MHz; 243.000 MHz" -> [121500, 243000]."""
+    return [round(float(m) * 1000) for m in _MHZ.findall(str(text or ""))]
+
+def to_khz(freq: float | str) -> int:
+    """kHz for a frequency in MHz (121.5, "121.500" or "121.500 MHz")."""
+    if isinstance(freq, str):
+        parsed = parse_frequencies(freq if "mhz" in freq.lower() else f"{freq} MHz")
+        if not parsed:
+            raise ValueError(f"not a frequency: {freq!r}")
+        return parsed[0]
+    return round(float(freq) * 1000)
+
+def control_units(key: str) -> List[str]:
+    """Units a freq key names: "Jeddah Control (2)" -> ["Jeddah Control"], "Jeddah/Riyadh Control" -> both."""
+    parts = [p.strip() for p in _UNIT_COUNTER.sub("", str(key)).split("/")]
+    parts = [p for p in parts if p]
+    if not parts:
+        return []
+    # the bare names before the last part share its unit type ("Control", "APP", ...)
+    kind = parts[-1].split(None, 1)[1:]
+    return [f"{p} {kind[0]}" if kind and " " not in p else p for p in parts]
+
+def power_role(key: str) -> str:
+    role = normalize(key)
+    return _ROLE_ALIASES.get(role, role)
+
+def power_sources(text: str) -> List[str]:
+    """"Sans Generator, SANS UPS" -> ["sans generator", "sans ups"]."""
+    return [s for s in (normalize(part) for part in re.split(r"[,;/]", str(text or ""))) if s]
+
+
+@dataclass(frozen=True)
+class Site:
+    id: int          # position in SiteRegistry.sites
+    ring: int        # main-map feature whose detail layer holds it
+    index: int       # position in that layer's points
+    name: str
+    sector_id: str
+    lon: float
+    lat: float
+    # (freq key as written, kHz) for every frequency it lists
+    frequencies: Tuple[Tuple[str, int], ...]
+    # (role, source), both normalized
+    power: Tuple[Tuple[str, str], ...]
+    freq: dict
+    power_raw: dict
+
+    @property
+    def khz(self) -> Tuple[int, ...]:
+        """Distinct frequencies, ascending."""
+        return tuple(sorted({k for _u, k in self.frequencies}))
+
+
+class SiteRegistry:
+    """
+    All sites with hash indexes by sector ID, control unit, frequency and
+    power source (optionally by role), plus a sorted frequency index for
+    range queries. Query results are in site order.
+    """
+
+    def __init__(self, sites: Sequence[Site], version: str = "") -> None:
+        self.sites: List[Site] = list(sites)
+        self.version = version
+        self._by_sector: Dict[str, List[int]] = {}
+        self._by_unit: Dict[str, List[int]] = {}
+        self._by_khz: Dict[int, List[int]] = {}
+        self._by_power: Dict[str, List[int]] = {}
+        self._by_power_role: Dict[Tuple[str, str], List[int]] = {}
+        for s in self.sites:
+            _add(self._by_sector, normalize(s.sector_id), s.id)
+            for key, khz in s.frequencies:
+                for unit in control_units(key):
+                    _add(self._by_unit, normalize(unit), s.id)
+                _add(self._by_khz, khz, s.id)
+            for role, source in s.power:
+                _add(self._by_power, source, s.id)
+                _add(self._by_power_role, (role, source), s.id)
+        # (kHz, site id) ascending, for range queries
+        self._freq_sorted: List[Tuple[int, int]] = sorted(
+            (khz, sid) for khz, ids in self._by_khz.items() for sid in ids
+        )
+
+    # ---- building ----
+    @classmethod
+    def from_points(cls, layers: Mapping[int, Sequence[PointFeature]], version: str = "") -> "SiteRegistry":
+        """Registry over the points of each detail layer, keyed by its main-map feature index."""
+        sites: List[Site] = []
+        for ring, points in sorted(layers.items()):
+            for i, (lon, lat, name, sector_id, freq, power) in enumerate(points):
+                freqs: List[Tuple[str, int]] = []
+                if isinstance(freq, dict):
+                    for unit, text in freq.items():
+                        freqs.extend((str(unit), khz) for khz in parse_frequencies(text))
+                supply: List[Tuple[str, str]] = []
+                if isinstance(power, dict):
+                    for role, text in power.items():
+                        supply.extend((power_role(role), src) for src in power_sources(text))
+                sites.append(Site(
+                    len(sites), ring, i, str(name or ""), str(sector_id or ""), float(lon), float(lat),
+                    tuple(freqs), tuple(supply),
+                    freq if isinstance(freq, dict) else {}, power if isinstance(power, dict) else {},
+                ))
+        return cls(sites, version)
+
+    @classmethod
+    def load(cls, paths: Optional[Mapping[int, Path]] = None) -> "SiteRegistry":
+        """Every site of the detail layers (DETAIL_JSON_FOR_RING by default) that exist."""
+        paths = {i: Path(p) for i, p in (paths if paths is not None else C.DETAIL_JSON_FOR_RING).items()
+                 if Path(p).exists()}
+        return cls.from_points({i: load_layer(p).points for i, p in paths.items()}, dataset_version(paths.values()))
+
+    # ---- queries ----
+    def __len__(self) -> int:
+        return len(self.sites)
+
+    def _sites(self, ids: Iterable[int]) -> List[Site]:
+        return [self.sites[i] for i in sorted(set(ids))]
+
+    def by_name(self, name: str) -> List[Site]:
+        key = normalize(name)
+        return [s for s in self.sites if normalize(s.name) == key]
+
+    def by_sector(self, sector_id: str) -> List[Site]:
+        return self._sites(self._by_sector.get(normalize(sector_id), ()))
+
+    def by_unit(self, unit: str) -> List[Site]:
+        """Sites with a frequency for this control unit ("Jeddah Control", "Hail APP", ...)."""
+        return self._sites(sid for u in control_units(unit) for sid in self._by_unit.get(normalize(u), ()))
+
+    def on_frequency(self, freq: float | str) -> List[Site]:
+        """Sites listing exactly this frequency (MHz: 121.5, "121.500", "121.500 MHz")."""
+        return self._sites(self._by_khz.get(to_khz(freq), ()))
+
+    def in_band(self, lo: float | str, hi: float | str) -> List[Site]:
+        """Sites listing any frequency in [lo, hi] MHz."""
+        a = bisect.bisect_left(self._freq_sorted, (to_khz(lo), -1))
+        b = bisect.bisect_right(self._freq_sorted, (to_khz(hi), len(self.sites)))
+        return self._sites(sid for _k, sid in self._freq_sorted[a:b])
+
+    def by_power(self, source: str, role: Optional[str] = None) -> List[Site]:
+        """Sites fed by `source` ("SANS UPS"), or only where it fills `role` ("backup", "primary", ...)."""
+        src = normalize(source)
+        if role is None:
+            return self._sites(self._by_power.get(src, ()))
+        return self._sites(self._by_power_role.get((power_role(role), src), ()))
+
+    def sectors(self) -> List[str]:
+        return sorted({s.sector_id for s in self.sites if s.sector_id})
+
+    def units(self) -> List[str]:
+        return sorted({u for s in self.sites for key, _k in s.frequencies for u in control_units(key)})
+
+    def frequencies(self) -> List[int]:
+        """Every listed frequency in kHz, ascending."""
+        return sorted(self._by_khz)
+
+    def power_sources(self) -> List[str]:
+        return sorted(self._by_power)
+
+
+def _add(index: Dict, key, site_id: int) -> None:
+    ids = index.setdefault(key, [])
+    if not ids or ids[-1] != site_id:
+        ids.append(site_id)
+
+def dataset_version(paths: Iterable[Path]) -> str:
+    """Digest of the files' paths, sizes and mtimes: changes whenever any of them does."""
+    h = hashlib.sha1()
+    for p in sorted(Path(p) for p in paths):
+        try:
+            st = p.stat()
+            h.update(repr((os.fsencode(p.resolve()), st.st_size, st.st_mtime_ns)).encode("utf-8"))
+        except OSError:
+            h.update(os.fsencode(p))
+    return h.hexdigest()[:16]
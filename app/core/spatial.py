@@ -0,0 +1,146 @@
+from __future__ import annotations
+import heapq
+import math
+from typing import List, Optional, Sequence, Tuple
+from .models import Bounds, PointFeature
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """Great-circle distance between two lon/lat points, in km."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def _unit(lon: float, lat: float) -> Tuple[float, float, float]:
+    la, lo = math.radians(lat), math.radians(lon)
+    c = math.cos(la)
+    return c * math.cos(lo), c * math.sin(lo), math.sin(la)
+
+def _chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+def _km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class SiteIndex:
+    """
+    KD-tree over site points, built on 3-D unit vectors: straight-line (chord)
+    distance there is monotonic in great-circle distance, so nearest/radius
+    answers are exact on the sphere. Each node also keeps its subtree's
+    lon/lat box for bbox queries. Results are indices into `points`.
+    """
+
+    def __init__(self, points: Sequence[PointFeature]) -> None:
+        self.points = points
+        self._xyz = [_unit(p[0], p[1]) for p in points]
+        n = len(points)
+        # implicit tree: node i stores one point, its split axis, children and subtree box
+        self._pt: List[int] = []
+        self._axis: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._box: List[Tuple[float, float, float, float]] = []
+        self._root = self._build(list(range(n)))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    # ---- build ----
+    def _build(self, idxs: List[int]) -> int:
+        if not idxs:
+            return -1
+        xyz = self._xyz
+        spreads = [max(xyz[i][a] for i in idxs) - min(xyz[i][a] for i in idxs) for a in range(3)]
+        axis = spreads.index(max(spreads))
+        idxs.sort(key=lambda i: xyz[i][axis])
+        mid = len(idxs) // 2
+        node = len(self._pt)
+        self._pt.append(idxs[mid])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+        lons = [self.points[i][0] for i in idxs]
+        lats = [self.points[i][1] for i in idxs]
+        self._box.append((min(lons), max(lons), min(lats), max(lats)))
+        self._left[node] = self._build(idxs[:mid])
+        self._right[node] = self._build(idxs[mid + 1:])
+        return node
+
+    # ---- queries ----
+    def nearest(self, lon: float, lat: float, k: int = 1,
+                max_km: Optional[float] = None) -> List[Tuple[float, int]]:
+        """Up to `k` nearest sites as (distance_km, index), closest first."""
+        if k <= 0 or self._root < 0:
+            return []
+        q = _unit(lon, lat)
+        limit = _km_to_chord(max_km) if max_km is not None else math.inf
+        heap: List[Tuple[float, int]] = []  # max-heap of (-chord, idx)
+
+        def worst() -> float:
+            return -heap[0][0] if len(heap) == k else limit
+
+        def visit(node: int) -> None:
+            if node < 0:
+                return
+            i = self._pt[node]
+            d = math.dist(q, self._xyz[i])
+            if d <= worst():
+                heapq.heappush(heap, (-d, i))
+                if len(heap) > k:
+                    heapq.heappop(heap)
+            diff = q[self._axis[node]] - self._xyz[i][self._axis[node]]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            visit(near)
+            if abs(diff) <= worst():
+                visit(far)
+
+        visit(self._root)
+        return sorted((_chord_to_km(-c), i) for c, i in heap)
+
+    def within_radius(self, lon: float, lat: float, radius_km: float) -> List[Tuple[float, int]]:
+        """All sites within `radius_km` as (distance_km, index), closest first."""
+        if self._root < 0 or radius_km < 0:
+            return []
+        q = _unit(lon, lat)
+        r = _km_to_chord(radius_km)
+        out: List[Tuple[float, int]] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            i = self._pt[node]
+            d = math.dist(q, self._xyz[i])
+            if d <= r:
+                out.append((_chord_to_km(d), i))
+            diff = q[self._axis[node]] - self._xyz[i][self._axis[node]]
+            stack.append(self._left[node] if diff < 0 else self._right[node])
+            if abs(diff) <= r:
+                stack.append(self._right[node] if diff < 0 else self._left[node])
+        out.sort()
+        return out
+
+    def within_bbox(self, b: Bounds) -> List[int]:
+        """Indices of sites inside the lon/lat box, in index order."""
+        out: List[int] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            mn_lon, mx_lon, mn_lat, mx_lat = self._box[node]
+            if mx_lon < b.min_lon or mn_lon > b.max_lon or mx_lat < b.min_lat or mn_lat > b.max_lat:
+                continue
+            i = self._pt[node]
+            lon, lat = self.points[i][0], self.points[i][1]
+            if b.min_lon <= lon <= b.max_lon and b.min_lat <= lat <= b.max_lat:
+                out.append(i)
+            stack.append(self._left[node])
+            stack.append(self._right[node])
+        out.sort()
+        return out
@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+# -------- Filename / site-name matching --------
+def normalize(s: str) -> str:
+    """Lower-case, punctuation to spaces, whitespace collapsed: "Al-Jouf_Rack (2).pdf" -> "al jouf rack 2 pdf"."""
+    s = s.lower()
+    out = [(ch if (ch.isalnum() or ch.isspace()) else " ") for ch in s]
+    return " ".join("".join(out).split())
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import hashlib
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+from . import config as C
+from .diskcache import PngDiskCache
+from app.core.paths import cache_path
+
+# Pillow (optional): without it the popup falls back to Tk's own PNG/GIF loader
+try:
+    from PIL import Image  # type: ignore
+    _PIL_AVAILABLE = True
+except Exception:
+    _PIL_AVAILABLE = False
+
+
+def decode_thumbnail(path: str, max_w: int, max_h: int) -> "Image.Image":
+    """The image at `path` scaled down to fit max_w x max_h, fully decoded (safe off the Tk thread)."""
+    with Image.open(path) as img:
+        # JPEGs are decoded straight at 1/2, 1/4 or 1/8 size (still at least max_w x max_h),
+        # so a large scan never gets decompressed at full resolution
+        img.draft(None, (max_w, max_h))
+        img.thumbnail((max_w, max_h))
+        if img.mode not in ("L", "RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info or "A" in img.getbands() else "RGB")
+        img.load()
+        return img
+
+
+# -------- On-disk cache --------
+# Thumbnails are stored as small PNGs under cache/thumbs/, named by a digest
+# of (source path, mtime, size, target box, variant): an edited source maps to
+# a new name, and stale files just age out of the LRU (see diskcache).
+
+# bump when thumbnails are made differently, so old files aren't reused
+THUMB_VERSION = 1
+
+
+class ThumbnailCache(PngDiskCache):
+    """Pre-scaled images under cache/thumbs/, LRU within `max_bytes` (thread-safe)."""
+
+    def __init__(self, max_bytes: int, directory: Optional[Path] = None) -> None:
+        super().__init__(max_bytes, directory if directory is not None else cache_path("thumbs"))
+
+    @staticmethod
+    def key(path: str, max_w: int, max_h: int, variant: str = "") -> Optional[str]:
+        """Cache key for `path` as it is now, or None if it can't be stat'ed."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        ident = (os.fsencode(os.path.abspath(path)), st.st_mtime_ns, st.st_size, max_w, max_h, variant, THUMB_VERSION)
+        return hashlib.sha1(repr(ident).encode("utf-8")).hexdigest()
+
+    def fetch(self, path: str, max_w: int, max_h: int, variant: str = "",
+              make: Optional[Callable[[str, int, int], "Image.Image"]] = None) -> "Image.Image":
+        """The cached image for `path`, else make(path, max_w, max_h) (decode_thumbnail by default), stored."""
+        key = self.key(path, max_w, max_h, variant)
+        if key is not None:
+            img = self.get(key)
+            if img is not None:
+                return img
+        img = (make or decode_thumbnail)(path, max_w, max_h)
+        if key is not None:
+            self.put(key, img)
+        return img
+
+
+_cache: Optional[ThumbnailCache] = None
+_cache_lock = Lock()
+
+def thumbnail_cache() -> ThumbnailCache:
+    """The process-wide cache under cache/thumbs/."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache(C.THUMB_CACHE_MAX_BYTES)
+        return _cache
+
+
+# -------- Background decoding --------
+class ThumbnailLoader:
+    """
+    Decodes thumbnails on a small thread pool (Pillow releases the GIL while
+    decoding). Requests for a thumbnail already being decoded share its future.
+    """
+
+    def __init__(self, max_workers: int = 2) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="thumbs")
+        self._futures: Dict[Tuple[str, int, int], Future] = {}
+        self._lock = Lock()
+
+    def submit(self, path: str, max_w: int, max_h: int) -> "Future[Image.Image]":
+        key = (path, max_w, max_h)
+        with self._lock:
+            fut = self._futures.get(key)
+            if fut is not None:
+                return fut
+            fut = self._pool.submit(thumbnail_cache().fetch, path, max_w, max_h)
+            self._futures[key] = fut
+        fut.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return fut
+
+    @staticmethod
+    def cached(path: str, max_w: int, max_h: int) -> Optional["Image.Image"]:
+        """The thumbnail if the disk cache has it (cheap enough for the Tk thread), else None."""
+        key = ThumbnailCache.key(path, max_w, max_h)
+        return thumbnail_cache().get(key) if key is not None else None
+
+    def _forget(self, key: Tuple[str, int, int], fut: Future) -> None:
+        with self._lock:
+            if self._futures.get(key) is fut:
+                del self._futures[key]
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_loader: Optional[ThumbnailLoader] = None
+_loader_lock = Lock()
+
+def thumbnail_loader() -> ThumbnailLoader:
+    """The process-wide loader, created on first use."""
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = ThumbnailLoader(C.THUMB_WORKERS)
+        return _loader
+
+def shutdown_thumbnail_loader() -> None:
+    """Stop the loader's workers, if it was started (the app calls this on exit)."""
+    global _loader
+    with _loader_lock:
+        if _loader is not None:
+            _loader.shutdown()
+            _loader = None
@@ -0,0 +1,267 @@
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from . import config as C
+from .drawings import DrawingsIndex, drawings_index
+
+# Keeps the drawings index current while the app runs.
+#
+# On Linux every indexed directory gets an inotify watch (through ctypes, no
+# extra dependency) and each create/delete/move event becomes one
+# add_entry()/remove_entry() call on the index; a rename is a removal from
+# the old directory plus an addition to the new one. Elsewhere, when inotify
+# can't be set up (e.g. the per-user watch limit is reached), or when the
+# tree lives on a network filesystem (where files copied in from other
+# machines raise no events), the directory mtimes are polled instead and
+# only directories that changed are listed again.
+
+# <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then `len` bytes of NUL-padded name
+
+_REMOTE_FS = {"cifs", "smb3", "smbfs", "nfs", "nfs4", "afs", "ceph", "glusterfs", "9p", "fuse.sshfs"}
+
+
+class _Inotify:
+    """Minimal inotify(7) binding: add/remove watches and read decoded events."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+
+    def add(self, path: str) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def remove(self, wd: int) -> None:
+        self._rm_watch(self.fd, wd)  # fails harmlessly if the kernel already dropped it
+
+    def read(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """(wd, mask, name) for each pending event, waiting up to `timeout` seconds for the first."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        out: List[Tuple[int, int, str]] = []
+        pos = 0
+        while pos + _EVENT.size <= len(buf):
+            wd, mask, _cookie, n = _EVENT.unpack_from(buf, pos)
+            pos += _EVENT.size
+            name = os.fsdecode(buf[pos:pos + n].split(b"\0", 1)[0])
+            pos += n
+            out.append((wd, mask, name))
+        return out
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _on_remote_fs(path: str) -> bool:
+    """True if `path` is on a network filesystem (per /proc/self/mounts)."""
+    try:
+        with open("/proc/self/mounts", encoding="utf-8", errors="replace") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    path = os.path.realpath(path)
+    best, fstype = "", ""
+    for mnt, typ in mounts:
+        mnt = mnt.replace("\\040", " ")
+        if (path == mnt or path.startswith(mnt.rstrip("/") + "/")) and len(mnt) >= len(best):
+            best, fstype = mnt, typ
+    return fstype in _REMOTE_FS
+
+
+class DrawingsWatcher:
+    """
+    Applies changes under the drawings root to a DrawingsIndex from a daemon
+    thread. The index (by default the shared one, loaded on that thread) is
+    marked live while this runs, so lookups no longer re-validate it.
+    """
+
+    def __init__(self, index: Optional[DrawingsIndex] = None,
+                 poll_s: float = C.DRAWINGS_POLL_S, save_delay_s: float = C.DRAWINGS_SAVE_DELAY_S) -> None:
+        self.index = index
+        self.poll_s = poll_s
+        self.save_delay_s = save_delay_s
+        self.mode: Optional[str] = None  # "inotify" | "poll" once running
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._unsaved_since: Optional[float] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="drawings-watch", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ---- thread ----
+    def _run(self) -> None:
+        if self.index is None:
+            self.index = drawings_index()
+        index = self.index
+        index.live = True
+        try:
+            # (a missing root has nothing to watch; polling notices when it appears)
+            if (sys.platform.startswith("linux") and index.directories()
+                    and not _on_remote_fs(os.fspath(index.root))):
+                try:
+                    ino = _Inotify()
+                except (OSError, AttributeError):
+                    ino = None
+                if ino is not None:
+                    try:
+                        self.mode = "inotify"
+                        self._run_inotify(ino)
+                        return
+                    except OSError:
+                        pass  # e.g. ENOSPC: more directories than fs.inotify.max_user_watches
+                    finally:
+                        ino.close()
+            self.mode = "poll"
+            self._run_polling()
+        finally:
+            index.live = False
+            if self._unsaved_since is not None:
+                index.save()
+
+    def _changed(self) -> None:
+        if self._unsaved_since is None:
+            self._unsaved_since = time.monotonic()
+
+    def _maybe_save(self) -> None:
+        if self._unsaved_since is not None and time.monotonic() - self._unsaved_since >= self.save_delay_s:
+            self._unsaved_since = None
+            self.index.save()
+
+    def _run_polling(self) -> None:
+        index = self.index
+        while not self._stop.wait(self.poll_s):
+            if index.stale() and index.refresh():
+                self._changed()
+            self._maybe_save()
+
+    def _run_inotify(self, ino: _Inotify) -> None:
+        index = self.index
+        base = os.fspath(index.root)
+        wds: Dict[int, str] = {}
+        by_rel: Dict[str, int] = {}
+
+        def watch(rels: Iterable[str]) -> None:
+            for rel in rels:
+                if rel not in by_rel:
+                    try:
+                        wd = ino.add(os.path.join(base, rel) if rel else base)
+                    except (FileNotFoundError, NotADirectoryError):
+                        continue  # already gone again; its parent's event will say so
+                    wds[wd] = rel
+                    by_rel[rel] = wd
+
+        def unwatch(rels: Iterable[str]) -> None:
+            for rel in rels:
+                wd = by_rel.pop(rel, None)
+                if wd is not None:
+                    wds.pop(wd, None)
+                    ino.remove(wd)
+
+        def resync() -> None:
+            if index.refresh():
+                self._changed()
+            dirs = index.directories()
+            keep = set(dirs)
+            unwatch([rel for rel in by_rel if rel not in keep])
+            watch(dirs)
+
+        def watch_new(rels: List[str]) -> None:
+            # entries created before their directory's watch was in place raised no
+            # event: list those directories again once they are watched
+            while rels:
+                watch(rels)
+                rels = [rel for rel in index.revalidate(rels) if rel not in by_rel]
+
+        watch(index.directories())
+        resync()  # catch up with anything that changed while the watches were added
+        while not self._stop.is_set():
+            need_resync = False
+            for wd, mask, name in ino.read(0.5):
+                if mask & IN_Q_OVERFLOW:
+                    need_resync = True
+                    continue
+                rel = wds.get(wd)
+                if rel is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # watch gone (directory deleted or unmounted)
+                    del wds[wd]
+                    if by_rel.get(rel) == wd:
+                        del by_rel[rel]
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    # the parent's event normally covers this; only the root has no parent
+                    need_resync = need_resync or rel == ""
+                    continue
+                is_dir = bool(mask & IN_ISDIR)
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    watch_new(index.add_entry(rel, name, is_dir))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    unwatch(index.remove_entry(rel, name, is_dir))
+                self._changed()
+            if need_resync:
+                resync()
+            self._maybe_save()
+
+
+# -------- Shared watcher --------
+_watcher: Optional[DrawingsWatcher] = None
+_watcher_lock = threading.Lock()
+
+def watch_drawings() -> DrawingsWatcher:
+    """Start (once per process) keeping the shared drawings index current."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = DrawingsWatcher()
+            _watcher.start()
+        return _watcher
+
+def stop_watching() -> None:
+    global _watcher
+    with _watcher_lock:
+        if _watcher is not None:
+            _watcher.stop()
+            _watcher = None
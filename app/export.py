@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .core import config as C
+from .core.headless import FORMATS, PNG_AVAILABLE, default_views, export_views
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Render the main map and every sector view to files, without a display."""
+    parser = argparse.ArgumentParser(prog="python -m app.export", description=main.__doc__)
+    parser.add_argument("out_dir", type=Path, help="directory to write the images to")
+    parser.add_argument("--format", dest="formats", action="append", choices=FORMATS,
+                        help="output format (repeatable; default: png and svg)")
+    parser.add_argument("--width", type=int, default=C.WINDOW_WIDTH)
+    parser.add_argument("--height", type=int, default=C.WINDOW_HEIGHT)
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: one per CPU)")
+    parser.add_argument("--only", action="append", metavar="NAME",
+                        help="render only this view (main, sector-1-central, ...; repeatable)")
+    args = parser.parse_args(argv)
+
+    formats = args.formats or FORMATS
+    if "png" in formats and not PNG_AVAILABLE:
+        print("PNG export needs Pillow (pip install pillow); use --format svg.", file=sys.stderr)
+        return 2
+
+    views = [v for v in default_views() if v.path.exists()]
+    if args.only:
+        views = [v for v in views if v.name in args.only]
+    if not views:
+        print("No views to render.", file=sys.stderr)
+        return 1
+
+    written = export_views(
+        views, args.out_dir, formats=formats,
+        width=args.width, height=args.height, workers=args.workers,
+    )
+    for name, paths in written.items():
+        print(f"{name}: {', '.join(str(p) for p in paths)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
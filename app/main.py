@@ -4,7 +4,7 @@ from pathlib import Path
 from tkinter import Tk, messagebox
 
 from .core import config as C
-from .core.geo import load_geo_from_json
+from .core.geo import load_layer
 from .ui.app import MapApp
 
 
@@ -26,12 +26,15 @@ def main() -> None:
         return
 
     try:
-        rings, _ = load_geo_from_json(geo_path)
+        layer = load_layer(geo_path)
     except Exception as e:
         _error_box("Failed to load map", f"Could not read\n{geo_path}\n\n{e}")
         return
+    if layer.bounds is None:
+        _error_box("Failed to load map", f"No polygon coordinates found in\n{geo_path}")
+        return
 
-    MapApp(rings).run()
+    MapApp(layer).run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Optional
+
+from .core.separation import SeparationAnalyzer
+from .core.sites import Site, SiteRegistry
+
+
+def _khz(k: int) -> str:
+    return f"{k / 1000:.3f}"
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """List the sites of every sector file matching all the given filters."""
+    parser = argparse.ArgumentParser(prog="python -m app.sites", description=main.__doc__)
+    parser.add_argument("--freq", metavar="MHZ", help="sites on this frequency (121.5, 121.500)")
+    parser.add_argument("--band", nargs=2, metavar=("LO", "HI"), help="sites with a frequency in [LO, HI] MHz")
+    parser.add_argument("--sector", help="sector ID (CPS, EPS, ...)")
+    parser.add_argument("--unit", help="control unit (\"Jeddah Control\", \"Hail APP\", ...)")
+    parser.add_argument("--power", metavar="SOURCE", help="power source (\"SANS UPS\", SECO, ...)")
+    parser.add_argument("--role", help="with --power: only where the source is this role (primary, backup, ups, ...)")
+    parser.add_argument("--conflicts", action="store_true",
+                        help="instead list co-/adjacent-channel pairs closer than the separation thresholds"
+                             " (involving a matching site)")
+    args = parser.parse_args(argv)
+    if args.role and not args.power:
+        parser.error("--role needs --power")
+
+    reg = SiteRegistry.load()
+    hits = set(range(len(reg)))
+    try:
+        if args.freq:
+            hits &= {s.id for s in reg.on_frequency(args.freq)}
+        if args.band:
+            hits &= {s.id for s in reg.in_band(*args.band)}
+    except ValueError as e:
+        parser.error(str(e))
+    if args.sector:
+        hits &= {s.id for s in reg.by_sector(args.sector)}
+    if args.unit:
+        hits &= {s.id for s in reg.by_unit(args.unit)}
+    if args.power:
+        hits &= {s.id for s in reg.by_power(args.power, args.role)}
+
+    if args.conflicts:
+        return _conflicts(reg, hits)
+
+    sites: List[Site] = [reg.sites[i] for i in sorted(hits)]
+    for s in sites:
+        freqs = ", ".join(_khz(k) for k in s.khz) or "-"
+        power = ", ".join(f"{role}: {src}" for role, src in s.power) or "-"
+        print(f"{s.name:<18} {s.sector_id:<4} {s.lat:9.5f} {s.lon:9.5f}  MHz {freqs}  |  {power}")
+    print(f"{len(sites)} of {len(reg)} sites", file=sys.stderr)
+    return 0
+
+def _conflicts(reg: SiteRegistry, hits: set) -> int:
+    found = [c for c in SeparationAnalyzer.from_registry(reg).conflicts() if c.a in hits or c.b in hits]
+    for c in found:
+        a, b = reg.sites[c.a], reg.sites[c.b]
+        freqs = _khz(c.khz_a) if c.khz_a == c.khz_b else f"{_khz(c.khz_a)}/{_khz(c.khz_b)}"
+        print(f"{c.kind:<10} {freqs:>15} MHz  {a.name} ({a.sector_id}) - {b.name} ({b.sector_id})"
+              f"  {c.distance_km:.1f} km < {c.required_km:.0f} km")
+    print(f"{len(found)} conflicts among {len(reg)} sites", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
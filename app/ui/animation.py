@@ -0,0 +1,94 @@
+from __future__ import annotations
+import time
+from typing import Callable, Dict, Optional
+import tkinter as tk
+
+# -------- Easing curves (t in [0, 1] -> progress in [0, 1]) --------
+def linear(t: float) -> float:
+    return t
+
+def ease_out_cubic(t: float) -> float:
+    return 1.0 - (1.0 - t) ** 3
+
+def ease_in_out_cubic(t: float) -> float:
+    return 4.0 * t ** 3 if t < 0.5 else 1.0 - (-2.0 * t + 2.0) ** 3 / 2.0
+
+EASINGS: Dict[str, Callable[[float], float]] = {
+    "linear": linear,
+    "ease_out_cubic": ease_out_cubic,
+    "ease_in_out_cubic": ease_in_out_cubic,
+}
+
+
+class Animator:
+    """
+    Wall-clock driven animation on the Tk event loop.
+    Every tick renders the state for *now*, so a slow frame makes the next one
+    jump ahead instead of stretching the animation; when the measured render
+    cost says another intermediate frame would overrun the end, it skips
+    straight to the final frame. Total duration stays ~duration_ms whatever
+    a frame costs.
+    """
+
+    def __init__(self, widget: tk.Misc) -> None:
+        self.widget = widget
+        self._after_id: Optional[str] = None
+        self._on_done: Optional[Callable[[], None]] = None
+        self.frames_rendered = 0
+        self.frame_cost_ms = 0.0  # moving average of on_frame cost
+
+    @property
+    def running(self) -> bool:
+        return self._after_id is not None or self._on_done is not None
+
+    def start(
+        self,
+        on_frame: Callable[[float, bool], None],
+        duration_ms: int,
+        frame_ms: int = 16,
+        easing: str = "ease_in_out_cubic",
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Call on_frame(progress, moving) until progress reaches 1.0; the last call
+        has moving=False. on_done runs after it. Starting again cancels the
+        current animation without running its on_done.
+        """
+        self.cancel()
+        ease = EASINGS.get(easing, ease_in_out_cubic)
+        duration = max(1.0, float(duration_ms)) / 1000.0
+        t0 = time.perf_counter()
+        self._on_done = on_done
+        self.frames_rendered = 0
+
+        def tick() -> None:
+            self._after_id = None
+            now = time.perf_counter()
+            t = (now - t0) / duration
+            # if one more intermediate frame would land past the end, finish now
+            if t < 1.0 and now + self.frame_cost_ms / 1000.0 >= t0 + duration:
+                t = 1.0
+            if t >= 1.0:
+                self._render(on_frame, 1.0, False)
+                done, self._on_done = self._on_done, None
+                if done:
+                    done()
+                return
+            self._render(on_frame, ease(t), True)
+            spent_ms = (time.perf_counter() - now) * 1000.0
+            self._after_id = self.widget.after(max(1, int(frame_ms - spent_ms)), tick)
+
+        tick()
+
+    def cancel(self) -> None:
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = None
+        self._on_done = None
+
+    def _render(self, on_frame: Callable[[float, bool], None], progress: float, moving: bool) -> None:
+        start = time.perf_counter()
+        on_frame(progress, moving)
+        cost = (time.perf_counter() - start) * 1000.0
+        self.frame_cost_ms = cost if self.frames_rendered == 0 else 0.7 * self.frame_cost_ms + 0.3 * cost
+        self.frames_rendered += 1
@@ -1,20 +1,36 @@
 from __future__ import annotations
 
-from typing import Callable, List, Optional, Dict, Any
+import logging
+from concurrent.futures import Future
+from typing import AbstractSet, Callable, List, Optional, Dict, Any, Set, Tuple
 import tkinter as tk
+from tkinter import messagebox
 
 from ..core import config as C
-from ..core.models import Bounds, LngLat, Ring, PointFeature
-from ..core.geo import load_geo_from_json, compute_bounds, ring_bounds, pad_bounds
+from ..core.models import Bounds, LngLat, PointFeature, GeometryStore, Layer
+from ..core.geo import compute_bounds, geom_bounds, pad_bounds
+from ..core.coverage import AVAILABLE as COVERAGE_AVAILABLE, CoverageGrid, coverage_grid_async
+from ..core.layercache import LayerCache
+from ..core.prefetch import LayerPrefetcher
+from ..core.search import SiteHit, SiteSearch
+from ..core.sites import Site, SiteRegistry, dataset_version
+from ..core.thumbs import shutdown_thumbnail_loader
+from ..core.watch import stop_watching, watch_drawings
 from .renderer import CanvasRenderer
-from .popup import SectionPopup
+from .popup import SectionPopup, shutdown_lookups
+from .animation import Animator
+from .scene import ALL_LAYERS, LAYER_GEOMETRY, LAYER_HOVER
+from .scheduler import RenderScheduler
+from .search import SearchBox
 from app.core.paths import assets_path
 
+log = logging.getLogger(__name__)
+
 
 class MapApp:
     """Controller: wires events/state/animation; uses CanvasRenderer for drawing."""
 
-    def __init__(self, main_rings: List[Ring]) -> None:
+    def __init__(self, main_layer: Layer) -> None:
         # Tk root
         self.root = tk.Tk()
         self.root.title(C.TITLE)
@@ -31,6 +47,11 @@ class MapApp:
         )
         self.map_title_label.pack()
 
+        # Site search (top right of the title bar; Ctrl+F focuses it)
+        self.search_box = SearchBox(title_frame, self.jump_to_site)
+        self.search_box.entry.place(relx=1.0, rely=0.5, x=-16, anchor="e")
+        self.root.bind("<Control-f>", lambda _e: self.search_box.focus())
+
         # Map container
         map_frame = tk.Frame(self.root)
         map_frame.pack(fill="both", expand=True)
@@ -50,35 +71,83 @@ class MapApp:
         self.back_btn.place(x=10, y=10)
         self.back_btn.lower()
 
+        # Coverage toggle (main map, once the grid is ready) and the nearest-site readout
+        self.coverage_var = tk.BooleanVar(value=False)
+        self.coverage_btn = tk.Checkbutton(map_frame, text="Coverage", variable=self.coverage_var,
+                                           indicatoron=False, padx=6, command=self._toggle_coverage)
+        self.coverage_btn.place(x=10, y=10)
+        self.coverage_btn.lower()
+        self.nearest_label = tk.Label(map_frame, font=("Arial", 10), bg="white", fg="#2c3e50",
+                                      relief=tk.SOLID, bd=1, padx=6)
+
         # State
-        self.main_rings = main_rings
-        self.main_bounds = compute_bounds(main_rings)
-        self.cur_rings: List[Ring] = self.main_rings
+        self.main_layer = main_layer
+        self.main_rings = main_layer.rings
+        self.main_bounds = main_layer.bounds or compute_bounds(main_layer.rings)
+        self.cur_layer: Layer = self.main_layer
+        self.cur_rings: GeometryStore = self.main_rings
         self.cur_points: List[PointFeature] = []
         self.cur_bounds: Bounds = self.main_bounds
         self.in_detail = False
         self.detail_for_idx: Optional[int] = None
         self._markers_ll: List[LngLat] = []
         self._point_popup: Optional[tk.Toplevel] = None
+        self._hover_site: Optional[int] = None
+        self._hover_ring: Optional[int] = None
+        self._animator = Animator(self.root)
+        self._layer_cache = LayerCache(max_bytes=C.LAYER_CACHE_MAX_BYTES)
+        self._prefetcher = LayerPrefetcher(max_workers=C.PREFETCH_WORKERS, cache=self._layer_cache)
+        self._pending_detail: Optional[int] = None
+        # every site of the detail layers, once they have all been loaded
+        self.sites: Optional[SiteRegistry] = None
+        self.coverage: Optional[CoverageGrid] = None
+        self._pointer: Optional[Tuple[int, int]] = None
+        self._scheduler = RenderScheduler(self.root, self._render, min_interval_ms=C.ANIM_FRAME_MS)
+        # a frame left on screen with basemap tiles missing: redraw it once they land
+        self.renderer.on_basemap_ready = lambda: self.request_redraw(LAYER_GEOMETRY)
 
-        # Events
-        self.renderer.canvas.bind("<Configure>", self.on_resize)
-        self.renderer.canvas.tag_bind("ring", "<Enter>", self.on_ring_enter)
-        self.renderer.canvas.tag_bind("ring", "<Leave>", self.on_ring_leave)
-        self.renderer.canvas.tag_bind("ring", "<Button-1>", self.on_ring_click)
-        self.renderer.canvas.tag_bind("point", "<Button-1>", self.on_point_click)
-        self.renderer.canvas.tag_bind("point", "<Enter>", lambda e: self.renderer.canvas.config(cursor="hand2"))
-        self.renderer.canvas.tag_bind("point", "<Leave>", lambda e: self.renderer.canvas.config(cursor=""))
+        # Events ("+": the renderer keeps its own handler for the corner logo)
+        self.renderer.canvas.bind("<Configure>", self.on_resize, add="+")
+        # sectors are hit-tested by point-in-polygon (the basemap is a single image);
+        # sites by the dot or name label under the pointer, else the layer's spatial index
+        self.renderer.canvas.bind("<Motion>", self.on_motion)
+        self.renderer.canvas.bind("<Leave>", lambda _e: self._clear_hover())
+        self.renderer.canvas.bind("<Button-1>", self.on_click)
         self.root.bind("<Escape>", self._on_escape)
 
-        self._redraw()
+        self.request_redraw()
+        # start parsing detail layers once the main map is on screen
+        self.root.after_idle(self._start_prefetch)
+
+    def _start_prefetch(self) -> None:
+        futures = {idx: self._prefetcher.submit(p) for idx, p in C.DETAIL_JSON_FOR_RING.items() if p.exists()}
+        self._await_search_index(futures)
+        if C.DRAWINGS_WATCH:
+            # also loads the drawings index off the Tk thread, ahead of the first popup
+            watch_drawings()
+        # build the (hidden) site popup now so the first click only has to fill it in
+        SectionPopup.shared(self.root)
 
     # ---------- Draw ----------
-    def _redraw(self) -> None:
+    def request_redraw(self, *layers: str) -> None:
+        """Mark `layers` (default: all) dirty; they are redrawn together on the next idle pass."""
+        self._scheduler.mark_dirty(*layers)
+
+    def _render(self, dirty: Set[str]) -> None:
+        if LAYER_HOVER in dirty:
+            self._update_hover()
+            dirty.discard(LAYER_HOVER)  # _update_hover() already moved the highlight
+        if dirty:
+            self._redraw(layers=dirty)
+
+    def _redraw(self, fast: bool = False, layers: AbstractSet[str] = ALL_LAYERS) -> None:
         if self.in_detail:
             self.back_btn.lift()
+            self.coverage_btn.lower()
         else:
             self.back_btn.lower()
+            if self.coverage is not None:
+                self.coverage_btn.lift()
 
         detail_fill = None
         if self.in_detail and self.detail_for_idx is not None and hasattr(C, "SECTOR_COLORS"):
@@ -91,35 +160,35 @@ class MapApp:
             user_markers=self._markers_ll,
             in_detail=self.in_detail,
             detail_fill_override=detail_fill,
+            anchors=self.cur_layer.anchors,
+            lod=self.cur_layer.lod,
+            fast=fast,
+            layers=layers,
+            source=self.cur_layer,
         )
+        # a pending LAYER_HOVER also means the pointer hasn't been hit-tested
+        # yet, which drawing the layer doesn't do: leave it for _render()
+        self._scheduler.clean(layers - {LAYER_HOVER})
 
     # ---------- Events ----------
     def on_resize(self, _evt: tk.Event) -> None:
-        self._redraw()
-        self.renderer.reposition_logo()
-
-    def on_ring_enter(self, _event: tk.Event) -> None:
-        self.renderer.canvas.config(cursor="hand2")
+        # a drag fires dozens of these: let them coalesce into one render
+        self.request_redraw()
 
-    def on_ring_leave(self, _event: tk.Event) -> None:
-        self.renderer.canvas.config(cursor="")
+    def on_click(self, event: tk.Event) -> None:
+        if self.in_detail:
+            self.on_point_click(event)
+        else:
+            self.on_ring_click(event)
 
-    def on_ring_click(self, _event: tk.Event) -> None:
+    def on_ring_click(self, event: tk.Event) -> None:
         if self.in_detail:
             return
-        current = self.renderer.canvas.find_withtag("current")
-        if not current:
-            return
-        item = current[0]
-        tags = self.renderer.canvas.gettags(item)
-        ring_tag = next((t for t in tags if t.startswith("ring-")), None)
-        if ring_tag is None:
-            return
-        try:
-            idx = int(ring_tag.split("-")[1])
-        except (IndexError, ValueError):
+        idx = self.renderer.ring_at(event.x, event.y)
+        if idx is None or not 0 <= idx < self.main_rings.n_geoms:
             return
-        tgt = pad_bounds(ring_bounds(self.main_rings[idx]), C.TARGET_PADDING_RATIO)
+        self._clear_hover()
+        tgt = pad_bounds(geom_bounds(self.main_rings, idx), C.TARGET_PADDING_RATIO)
         self.animate_zoom_to(tgt, then=lambda: self._load_detail_and_show(idx))
 
     def _on_escape(self, _evt: tk.Event) -> None:
@@ -130,46 +199,197 @@ class MapApp:
     def _load_detail_and_show(self, idx: int) -> None:
         path = C.DETAIL_JSON_FOR_RING.get(idx)
         if path is None or not path.exists():
-            self._redraw()
+            self.request_redraw()
+            return
+        self._pending_detail = idx
+        self._await_detail(idx, self._prefetcher.submit(path))
+
+    def _await_detail(self, idx: int, fut: "Future[Layer]", focus: Optional[LngLat] = None) -> None:
+        if self._pending_detail != idx:
+            return  # superseded by Back or another click
+        if not fut.done():
+            # never block the Tk thread: poll until the worker finishes
+            self.renderer.canvas.config(cursor="watch")
+            self.root.after(C.PREFETCH_POLL_MS, lambda: self._await_detail(idx, fut, focus))
             return
-        detail_rings, detail_points = load_geo_from_json(path)
-        if not detail_rings:
-            self._redraw()
+        self._pending_detail = None
+        self.renderer.canvas.config(cursor="")
+        try:
+            layer = fut.result()
+        except Exception as e:
+            self.request_redraw()
+            messagebox.showerror("Failed to load sector",
+                                 f"Could not read\n{C.DETAIL_JSON_FOR_RING.get(idx)}\n\n{e}")
+            return
+        self._show_detail(idx, layer, focus)
+
+    def _show_detail(self, idx: int, layer: Layer, focus: Optional[LngLat] = None) -> None:
+        if not layer.rings or layer.bounds is None:
+            self.request_redraw()
             return
         self.in_detail = True
         self.detail_for_idx = idx
-        self.cur_rings = detail_rings
-        self.cur_points = detail_points
-        detail_bounds = compute_bounds(detail_rings)
-        self.animate_zoom_to(detail_bounds, then=self._redraw)
+        self.cur_layer = layer
+        self.cur_rings = layer.rings
+        self.cur_points = layer.points
+        if focus is None:
+            self.animate_zoom_to(layer.bounds)
+            return
+        # a fraction of the sector, centred on the site
+        b = layer.bounds
+        hw = (b.max_lon - b.min_lon) * C.SEARCH_ZOOM_FRACTION / 2.0
+        hh = (b.max_lat - b.min_lat) * C.SEARCH_ZOOM_FRACTION / 2.0
+        target = Bounds(focus[0] - hw, focus[0] + hw, focus[1] - hh, focus[1] + hh)
+        self.animate_zoom_to(target, then=lambda: self.renderer.highlight_point(focus))
+
+    # ---------- Site search ----------
+    def _await_search_index(self, futures: Dict[int, "Future[Layer]"]) -> None:
+        if not all(f.done() for f in futures.values()):
+            self.root.after(C.PREFETCH_POLL_MS * 4, lambda: self._await_search_index(futures))
+            return
+        points = {}
+        for idx, fut in futures.items():
+            try:
+                points[idx] = fut.result().points
+            except Exception as e:
+                log.warning("Search: skipping detail layer %s: %s", idx, e)
+        self.sites = SiteRegistry.from_points(points, dataset_version(C.DETAIL_JSON_FOR_RING[i] for i in points))
+        self.search_box.attach(SiteSearch.build(points))
+        if COVERAGE_AVAILABLE:
+            self._await_coverage(coverage_grid_async(self.sites, self.main_bounds))
+
+    # ---------- Coverage ----------
+    def _await_coverage(self, fut: "Future[CoverageGrid]") -> None:
+        if not fut.done():
+            self.root.after(C.PREFETCH_POLL_MS * 4, lambda: self._await_coverage(fut))
+            return
+        try:
+            self.coverage = fut.result()
+        except Exception as e:
+            log.warning("Coverage grid unavailable: %s", e)
+            return
+        if not self.in_detail:
+            self.coverage_btn.lift()
+
+    def _toggle_coverage(self) -> None:
+        self.renderer.set_coverage(self.coverage if self.coverage_var.get() else None)
+        self._update_nearest(None)
+        self.request_redraw(LAYER_GEOMETRY)
+
+    def nearest_site(self, lon: float, lat: float) -> Optional[Tuple[Site, float]]:
+        """The site serving (lon, lat) and its distance in km (from the coverage grid), if known."""
+        if self.coverage is None or self.sites is None:
+            return None
+        hit = self.coverage.at(lon, lat)
+        return None if hit is None else (self.sites.sites[hit[0]], hit[1])
+
+    def _update_nearest(self, pointer: Optional[Tuple[int, int]]) -> None:
+        found = None
+        if pointer is not None and not self.in_detail and self.renderer.coverage is not None:
+            w = self.renderer.canvas.winfo_width()
+            h = self.renderer.canvas.winfo_height()
+            found = self.nearest_site(*self.renderer.inv_project(pointer[0], pointer[1], w, h))
+        if found is None:
+            self.nearest_label.place_forget()
+            return
+        site, km = found
+        where = f"{site.name} ({site.sector_id})" if site.sector_id else site.name
+        self.nearest_label.configure(text=f"Nearest site: {where}, {km:.0f} km")
+        self.nearest_label.place(x=10, rely=1.0, y=-10, anchor="sw")
+
+    def jump_to_site(self, hit: SiteHit) -> None:
+        """Open the site's sector and zoom in on the site."""
+        path = C.DETAIL_JSON_FOR_RING.get(hit.ring)
+        if path is None or not path.exists():
+            return
+        self._animator.cancel()
+        self._clear_hover()
+        self._pending_detail = hit.ring
+        self._await_detail(hit.ring, self._prefetcher.submit(path), focus=(hit.lon, hit.lat))
 
     # ---------- Back ----------
     def back_to_map(self) -> None:
+        self._pending_detail = None
+        self._clear_hover()
         self.in_detail = False
         self.detail_for_idx = None
+        self.cur_layer = self.main_layer
         self.cur_rings = self.main_rings
         self.cur_points = []
-        self.animate_zoom_to(self.main_bounds, then=self._redraw)
+        self.animate_zoom_to(self.main_bounds)
 
-    # ---------- Point click -> Popup ----------
-    def on_point_click(self, event: tk.Event) -> None:
+    # ---------- Site hover / click -> Popup ----------
+    def _site_at(self, x: float, y: float) -> Optional[int]:
+        """Index of the site whose dot or name label is under the pointer, else _snap_site(x, y)."""
         if not self.in_detail:
-            return
+            return None
         current = self.renderer.canvas.find_withtag("current")
-        if not current:
+        feature = self.renderer.feature_at(current[0]) if current else None
+        if feature is not None and feature[0] == "point" and 0 <= feature[1] < len(self.cur_points):
+            return feature[1]
+        return self._snap_site(x, y)
+
+    def _snap_site(self, x: float, y: float) -> Optional[int]:
+        """Index of the site nearest (x, y) if it is within SNAP_RADIUS_PX on screen."""
+        index = self.cur_layer.sites
+        if not self.in_detail or index is None or not len(index) or self.renderer.cur_bounds is None:
+            return None
+        vp = self.renderer.viewport(self.renderer.canvas.winfo_width(), self.renderer.canvas.winfo_height())
+        # lon and lat are scaled differently on screen, so the geo-nearest site isn't
+        # necessarily the closest on screen: take every site in the box the snap
+        # circle covers and compare them in pixels
+        lon, lat = vp.inv_project(x, y, clamp=False)
+        sx, sy = vp.scale
+        r = C.SNAP_RADIUS_PX
+        box = Bounds(lon - r / sx, lon + r / sx, lat - r / sy, lat + r / sy)
+        best: Optional[int] = None
+        best_d2 = float(r * r)
+        for pidx in index.within_bbox(box):
+            px, py = vp.project(self.cur_points[pidx][0], self.cur_points[pidx][1])
+            d2 = (px - x) ** 2 + (py - y) ** 2
+            if d2 <= best_d2:
+                best, best_d2 = pidx, d2
+        return best
+
+    def on_motion(self, event: tk.Event) -> None:
+        # only the latest pointer position matters: hit-test once per render pass
+        self._pointer = (event.x, event.y)
+        self.request_redraw(LAYER_HOVER)
+
+    def _update_hover(self) -> None:
+        if self._pointer is None:
             return
-        tags = self.renderer.canvas.gettags(current[0])
-        ptag = next((t for t in tags if t.startswith("point-")), None)
-        if ptag is None:
+        x, y = self._pointer
+        self._update_nearest(self._pointer)
+        ring = self.renderer.ring_at(x, y)
+        pidx = self._site_at(x, y)
+        if ring == self._hover_ring and pidx == self._hover_site:
             return
-        try:
-            pidx = int(ptag.split("-")[1])
-        except (IndexError, ValueError):
+        self._hover_ring = ring
+        self._hover_site = pidx
+        clickable = pidx is not None if self.in_detail else ring is not None
+        self.renderer.canvas.config(cursor="hand2" if clickable else "")
+        self.renderer.highlight_geom(ring)
+        self.renderer.highlight_point(
+            None if pidx is None else (self.cur_points[pidx][0], self.cur_points[pidx][1])
+        )
+
+    def _clear_hover(self) -> None:
+        self._hover_site = None
+        self._hover_ring = None
+        self._pointer = None
+        self._update_nearest(None)
+        self.renderer.canvas.config(cursor="")
+        self.renderer.highlight_geom(None)
+        self.renderer.highlight_point(None)
+
+    def on_point_click(self, event: tk.Event) -> None:
+        if not self.in_detail:
             return
-        try:
-            lon, lat, site, sector_id, freq, power = self.cur_points[pidx]
-        except IndexError:
+        pidx = self._site_at(event.x, event.y)
+        if pidx is None:
             return
+        lon, lat, site, sector_id, freq, power = self.cur_points[pidx]
         section_info = {
             "site": site,
             "lon": lon,
@@ -178,30 +398,34 @@ class MapApp:
             "freq": freq,
             "power": power,
         }
-        SectionPopup(self.root, site or "Details", section_info)
+        # settle any pending hover first, so the clicked site is ringed before the popup covers the map
+        self._scheduler.flush()
+        # one popup per window, reused: only its contents change per site
+        SectionPopup.shared(self.root).show(site or "Details", section_info)
 
     # ---------- Zoom animation ----------
     def animate_zoom_to(self, target: Bounds, then: Optional[Callable[[], None]] = None) -> None:
         start = self.cur_bounds
-        steps = max(1, C.ANIM_STEPS)
-        delay = max(1, C.ANIM_TOTAL_MS // steps)
-        frame = {"i": 0}
-
-        def step() -> None:
-            i = frame["i"]
-            t = (i + 1) / steps
-            self.cur_bounds = start.lerp(target, t)
-            self._redraw()
-            frame["i"] += 1
-            if frame["i"] < steps:
-                self.renderer.canvas.after(delay, step)
-            else:
-                self.cur_bounds = target
-                if then:
-                    then()
-
-        step()
+
+        def frame(t: float, moving: bool) -> None:
+            self.cur_bounds = target if t >= 1.0 else start.lerp(target, t)
+            self._redraw(fast=moving and C.ANIM_FAST_RENDER)
+
+        self._animator.start(
+            frame,
+            duration_ms=C.ANIM_TOTAL_MS,
+            frame_ms=C.ANIM_FRAME_MS,
+            easing=C.ANIM_EASING,
+            on_done=then,
+        )
 
     # ---------- Run ----------
     def run(self) -> None:
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self._prefetcher.shutdown()
+            self.renderer.shutdown()
+            shutdown_thumbnail_loader()
+            shutdown_lookups()
+            stop_watching()
@@ -3,7 +3,9 @@ from __future__ import annotations
 import os
 import platform
 import subprocess
-from typing import List, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import tkinter as tk
 from tkinter import messagebox
@@ -15,34 +17,140 @@ except Exception:
     _PIL_AVAILABLE = False
 
 # Use runtime-aware base for packaged data
+from app.core import config as C
 from app.core.paths import drawings_path
+from app.core.drawings import drawings_index
+from app.core.text import normalize
+from app.core.thumbs import thumbnail_cache, thumbnail_loader
+
+# The popup's widget tree is built once per parent window and then reused:
+# closing only withdraws it, and show() rebinds the header, the card rows
+# and the file sections for the next site. The drawing/image/video lookups
+# run on a worker thread and fill in after the window is up; the bottom row
+# of cards is filled once the top row has been drawn. A drawing clicked
+# before its lookup is done shows "Searching…" and opens when it lands.
+
+_lookup_pool: Optional[ThreadPoolExecutor] = None
+_lookup_lock = Lock()
+
+def _lookups() -> ThreadPoolExecutor:
+    global _lookup_pool
+    with _lookup_lock:
+        if _lookup_pool is None:
+            _lookup_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="popup-lookup")
+        return _lookup_pool
+
+def shutdown_lookups() -> None:
+    """Stop the lookup worker, if one was started (the app calls this on exit)."""
+    global _lookup_pool
+    with _lookup_lock:
+        if _lookup_pool is not None:
+            _lookup_pool.shutdown(wait=False, cancel_futures=True)
+            _lookup_pool = None
+
+
+class _Card:
+    """One info card: coloured title bar, scrollable key/value rows, then any file sections."""
+
+    def __init__(self, parent, title: str, color: str, row: int, col: int) -> None:
+        self.title = title
+        card = tk.Frame(parent, bg="white", relief=tk.RAISED, bd=2)
+        card.grid(row=row, column=col, sticky="nsew", padx=3, pady=3)
+        card.rowconfigure(1, weight=1)
+        card.columnconfigure(0, weight=1)
+
+        header = tk.Frame(card, bg=color, height=28)
+        header.grid(row=0, column=0, sticky="ew")
+        header.grid_propagate(False)
+        tk.Label(header, text=title, font=("Arial", 12, "bold"), fg="white", bg=color).pack(expand=True)
+
+        content_frame = tk.Frame(card, bg="white")
+        content_frame.grid(row=1, column=0, sticky="nsew", padx=8, pady=5)
+
+        self.canvas = canvas = tk.Canvas(content_frame, bg="white", highlightthickness=0)
+        scrollbar = tk.Scrollbar(content_frame, orient="vertical", command=canvas.yview)
+        self.content = content = tk.Frame(canvas, bg="white")
+        content.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        canvas.create_window((0, 0), window=content, anchor="nw")
+        canvas.configure(yscrollcommand=scrollbar.set)
+
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        # rows first, file sections after them
+        self.rows = tk.Frame(content, bg="white")
+        self.rows.pack(fill="x")
+        self._shape: Optional[Tuple] = None
+        self._values: List[tk.Label] = []
+
+    def set_rows(self, data: dict) -> None:
+        """Show `data` as key/value rows; when only the values changed the labels are reused."""
+        items = [(k, v) for k, v in data.items() if v]
+        shape = tuple((k, len(v) if isinstance(v, list) else None) for k, v in items)
+        texts = [str(x) for _k, v in items for x in (v if isinstance(v, list) else [v])]
+        if shape == self._shape:
+            for lbl, text in zip(self._values, texts):
+                lbl.configure(text=text)
+            return
+        for w in self.rows.winfo_children():
+            w.destroy()
+        self._values = []
+        # key/value rendering
+        for key, value in items:
+            rowf = tk.Frame(self.rows, bg="white"); rowf.pack(fill="x", pady=0)
+            tk.Label(rowf, text=f"{key}:", font=("Arial", 11, "bold"), bg="white", fg="#2c3e50",
+                     width=12, anchor="w").pack(side="left")
+            if isinstance(value, list):
+                bullets = tk.Frame(rowf, bg="white"); bullets.pack(side="left", padx=(3,0), fill="x", expand=True)
+                for item in value:
+                    line = tk.Frame(bullets, bg="white"); line.pack(anchor="w")
+                    tk.Label(line, text="•", font=("Arial", 10, "bold"), bg="white", fg="#34495e").pack(side="left", padx=(0,4))
+                    lbl = tk.Label(line, text=str(item), font=("Arial", 10), bg="white", fg="#34495e",
+                                   anchor="w", wraplength=160)
+                    lbl.pack(side="left")
+                    self._values.append(lbl)
+            else:
+                lbl = tk.Label(rowf, text=str(value), font=("Arial", 10), bg="white", fg="#34495e",
+                               anchor="w", wraplength=160)
+                lbl.pack(side="left", padx=(3,0), fill="x", expand=True)
+                self._values.append(lbl)
+        self._shape = shape
 
 
 class SectionPopup:
     """Modal popup that shows 4 info cards + file/image shortcuts."""
 
-    def __init__(self, parent, section_name: str, section_info: dict):
+    _pool: Dict[str, "SectionPopup"] = {}
+
+    @classmethod
+    def shared(cls, parent) -> "SectionPopup":
+        """The pooled popup for `parent`, built on first use (or again if its window was destroyed)."""
+        key = str(parent)
+        inst = cls._pool.get(key)
+        if inst is None or not inst.popup.winfo_exists():
+            inst = cls._pool[key] = cls(parent)
+        return inst
+
+    def __init__(self, parent, section_name: Optional[str] = None, section_info: Optional[dict] = None):
+        self.parent = parent
         self.popup = tk.Toplevel(parent)
-        self.popup.title(f"Site Equipment - {section_name}")
+        self.popup.withdraw()
 
-        self._site_id = section_info.get("site")
+        self._site_id = None
         self._img_cache: List[tk.PhotoImage] = []  # keep references
+        self._placeholders: Dict[Tuple[int, int], tk.PhotoImage] = {}
+        self._generation = 0  # bumped per show()/close(): late callbacks for an older site are dropped
+        self._files: Dict[str, Any] = {}  # lookup results for the current site
+        self._pdf_hints: Dict[str, tk.Label] = {}
+        self._pdf_openers: Dict[str, Callable[[], None]] = {}
+        self._open_when_found: Optional[str] = None  # drawing clicked while its lookup was pending
 
-        # --- size/position ---
-        parent.update_idletasks()
-        win_width = parent.winfo_width()
-        win_height = parent.winfo_height()
-        W, H = 700, 600
-        x = parent.winfo_x() + (win_width // 2) - (W // 2)
-        y = parent.winfo_y() + (win_height // 2) - (H // 2)
-        self.popup.geometry(f"{W}x{H}+{x}+{y}")
         self.popup.resizable(True, True)
         self.popup.configure(bg="#f0f0f0")
         self.popup.transient(parent)
-        self.popup.grab_set()
 
         # --- scroll container ---
-        canvas = tk.Canvas(self.popup, bg="#f0f0f0", highlightthickness=0)
+        self._canvas = canvas = tk.Canvas(self.popup, bg="#f0f0f0", highlightthickness=0)
         scrollbar = tk.Scrollbar(self.popup, orient="vertical", command=canvas.yview)
         holder = tk.Frame(canvas, bg="#f0f0f0")
         holder.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
@@ -52,10 +160,8 @@ class SectionPopup:
         # header
         header = tk.Frame(holder, bg="#2c3e50", pady=8)
         header.pack(fill="x", padx=5, pady=(5, 3))
-        tk.Label(header, text=f"📡 {section_name}", font=("Arial", 16, "bold"), fg="white", bg="#2c3e50").pack()
-
-        # data to render
-        data = self.parse_display_data(section_info)
+        self._title = tk.Label(header, text="", font=("Arial", 16, "bold"), fg="white", bg="#2c3e50")
+        self._title.pack()
 
         # grid
         grid = tk.Frame(holder, bg="#f0f0f0")
@@ -65,10 +171,18 @@ class SectionPopup:
         for c in (0, 1):
             grid.columnconfigure(c, weight=1)
 
-        self.create_info_card(grid, "🏢 Site Information", data.get("site", {}), "#3498db", 0, 0)
-        self.create_info_card(grid, "⚙️ Equipment Details", data.get("equipment", {}), "#e74c3c", 0, 1)
-        self.create_info_card(grid, "📍 Location", data.get("location", {}), "#27ae60", 1, 0)
-        self.create_info_card(grid, "🔧 Technical Specs", data.get("technical", {}), "#f39c12", 1, 1)
+        self._cards = {
+            "site": self.create_info_card(grid, "🏢 Site Information", "#3498db", 0, 0),
+            "equipment": self.create_info_card(grid, "⚙️ Equipment Details", "#e74c3c", 0, 1),
+            "location": self.create_info_card(grid, "📍 Location", "#27ae60", 1, 0),
+            "technical": self.create_info_card(grid, "🔧 Technical Specs", "#f39c12", 1, 1),
+        }
+
+        # attach sections
+        self._add_pdf_button(self._cards["site"].content, "Site Drawing", "site_drawing", icon="📄")
+        self._add_pdf_button(self._cards["equipment"].content, "Equipment Drawing", "equipment_drawing", icon="🔌")
+        self._gallery = self._add_frequency_gallery(self._cards["location"].content)
+        self._videos = self._add_rack_videos(self._cards["location"].content)
 
         # close button
         footer = tk.Frame(holder, bg="#f0f0f0", pady=5)
@@ -90,82 +204,118 @@ class SectionPopup:
         scrollbar.pack(side="right", fill="y", pady=10, padx=(0, 10))
 
         self.popup.bind("<Escape>", lambda e: self.close())
-        self.popup.focus_set()
+        # the window manager's close button only hides it too
+        self.popup.protocol("WM_DELETE_WINDOW", self.close)
 
-    # ---- card ----
-    def create_info_card(self, parent, title: str, data: dict, color: str, row: int, col: int) -> None:
-        card = tk.Frame(parent, bg="white", relief=tk.RAISED, bd=2)
-        card.grid(row=row, column=col, sticky="nsew", padx=3, pady=3)
-        card.rowconfigure(1, weight=1)
-        card.columnconfigure(0, weight=1)
+        if section_info is not None:
+            self.show(section_name or "Details", section_info)
 
-        header = tk.Frame(card, bg=color, height=28)
-        header.grid(row=0, column=0, sticky="ew")
-        header.grid_propagate(False)
-        tk.Label(header, text=title, font=("Arial", 12, "bold"), fg="white", bg=color).pack(expand=True)
+    def show(self, section_name: str, section_info: dict) -> None:
+        """Rebind the popup to one site and bring it up."""
+        self._generation += 1
+        gen = self._generation
+        self._site_id = section_info.get("site")
+        self._files = {}
+        self._open_when_found = None
+        self._set_pdf_hints("Click to view")
+        self._img_cache = []
+        self.popup.title(f"Site Equipment - {section_name}")
+        self._title.configure(text=f"📡 {section_name}")
 
-        content_frame = tk.Frame(card, bg="white")
-        content_frame.grid(row=1, column=0, sticky="nsew", padx=8, pady=5)
+        # data to render
+        data = self.parse_display_data(section_info)
+        self._cards["site"].set_rows(data.get("site", {}))
+        self._cards["equipment"].set_rows(data.get("equipment", {}))
+        self._fill_frequency_gallery([], searching=True)
+        self._fill_rack_videos(None, searching=True)
+        for w in [self._canvas] + [card.canvas for card in self._cards.values()]:
+            w.yview_moveto(0.0)
 
-        canvas = tk.Canvas(content_frame, bg="white", highlightthickness=0)
-        scrollbar = tk.Scrollbar(content_frame, orient="vertical", command=canvas.yview)
-        content = tk.Frame(canvas, bg="white")
-        content.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        canvas.create_window((0, 0), window=content, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        # --- size/position ---
+        parent = self.parent
+        parent.update_idletasks()
+        win_width = parent.winfo_width()
+        win_height = parent.winfo_height()
+        W, H = 700, 600
+        x = parent.winfo_x() + (win_width // 2) - (W // 2)
+        y = parent.winfo_y() + (win_height // 2) - (H // 2)
+        self.popup.geometry(f"{W}x{H}+{x}+{y}")
+        self.popup.deiconify()
+        self.popup.lift()
+        self.popup.grab_set()
+        self.popup.focus_set()
 
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # below the fold: filled once the top half is on screen
+        self.popup.after_idle(lambda: self._fill_lower_cards(gen, data))
+        site_id = self._site_id or "Unknown"
+        self._await_files(gen, _lookups().submit(self._lookup_files, site_id))
 
-        # key/value rendering
-        for key, value in data.items():
-            if not value:
-                continue
-            rowf = tk.Frame(content, bg="white"); rowf.pack(fill="x", pady=0)
-            tk.Label(rowf, text=f"{key}:", font=("Arial", 11, "bold"), bg="white", fg="#2c3e50",
-                     width=12, anchor="w").pack(side="left")
-            if isinstance(value, list):
-                bullets = tk.Frame(rowf, bg="white"); bullets.pack(side="left", padx=(3,0), fill="x", expand=True)
-                for item in value:
-                    line = tk.Frame(bullets, bg="white"); line.pack(anchor="w")
-                    tk.Label(line, text="•", font=("Arial", 10, "bold"), bg="white", fg="#34495e").pack(side="left", padx=(0,4))
-                    tk.Label(line, text=str(item), font=("Arial", 10), bg="white", fg="#34495e",
-                             anchor="w", wraplength=160).pack(side="left")
-            else:
-                tk.Label(rowf, text=str(value), font=("Arial", 10), bg="white", fg="#34495e",
-                         anchor="w", wraplength=160).pack(side="left", padx=(3,0), fill="x", expand=True)
+    def _fill_lower_cards(self, gen: int, data: dict) -> None:
+        if gen != self._generation:
+            return
+        self._cards["location"].set_rows(data.get("location", {}))
+        self._cards["technical"].set_rows(data.get("technical", {}))
 
-        # attach sections
-        if title == "🏢 Site Information":
-            self._add_pdf_button(content, "Site Drawing",
-                                 self.get_site_drawing_path(data.get("Site ID", "Unknown")), icon="📄")
-        if title == "⚙️ Equipment Details":
-            sid = (getattr(self, "_site_id", None)
-                   or data.get("Site ID") or data.get("Site") or data.get("site") or "Unknown")
-            self._add_pdf_button(content, "Equipment Drawing",
-                                 self.get_equipment_drawing_path(sid), icon="🔌")
-        if title == "📍 Location":
-            site_id = (
-                getattr(self, "_site_id", None)
-                or data.get("Site")
-                or data.get("site")
-                or "Unknown"
-            )
-            self._add_frequency_gallery(content, site_id)
-            self._add_rack_videos(content, site_id)
+    # ---- card ----
+    def create_info_card(self, parent, title: str, color: str, row: int, col: int) -> _Card:
+        return _Card(parent, title, color, row, col)
+
+    # ---- file lookups (worker thread) ----
+    def _lookup_files(self, site_id: str) -> Dict[str, Any]:
+        return {
+            "site_drawing": self.get_site_drawing_path(site_id),
+            "equipment_drawing": self.get_equipment_drawing_path(site_id),
+            "frequency_images": self.find_frequency_images(site_id),
+            "rack_video": self.find_rack_video(site_id),
+        }
+
+    def _await_files(self, gen: int, fut: "Future[Dict[str, Any]]") -> None:
+        if gen != self._generation:
+            return  # closed, or showing another site by now
+        if not fut.done():
+            self.popup.after(C.POPUP_POLL_MS, lambda: self._await_files(gen, fut))
+            return
+        pending, self._open_when_found = self._open_when_found, None
+        self._set_pdf_hints("Click to view")
+        try:
+            self._files = fut.result()
+        except Exception as e:
+            unknown = os.fspath(drawings_path("unknown.pdf"))
+            self._files = {"site_drawing": unknown, "equipment_drawing": unknown,
+                           "frequency_images": [], "rack_video": None}
+            self._fill_frequency_gallery([])
+            self._fill_rack_videos(None)
+            messagebox.showerror("Error", f"Could not look up the drawings for {self._site_id}:\n{e}")
+            return
+        self._fill_frequency_gallery(self._files["frequency_images"])
+        self._fill_rack_videos(self._files["rack_video"])
+        if pending is not None:
+            self._pdf_openers[pending]()
 
+    def _set_pdf_hints(self, text: str) -> None:
+        for hint in self._pdf_hints.values():
+            hint.configure(text=text)
 
     # ---- helpers: buttons & files ----
-    def _add_pdf_button(self, parent, label: str, path: str, icon: str = "📄") -> None:
+    def _add_pdf_button(self, parent, label: str, key: str, icon: str = "📄") -> None:
         sep = tk.Frame(parent, bg="#ecf0f1", height=1); sep.pack(fill="x", pady=(10,5))
         card = tk.Frame(parent, bg="#f8f9fa", relief=tk.RAISED, bd=2, cursor="hand2"); card.pack(anchor="w", padx=10, pady=2)
         thumb = tk.Frame(card, bg="white", width=30, height=30, relief=tk.SUNKEN, bd=1); thumb.pack(side="left", padx=8, pady=8); thumb.pack_propagate(False)
         tk.Label(thumb, text=icon, font=("Arial", 18), bg="white", fg="#3498db", cursor="hand2").pack(expand=True)
         box = tk.Frame(card, bg="#f8f9fa"); box.pack(side="left", padx=8, pady=8, fill="x")
         tk.Label(box, text=label, font=("Arial", 10, "bold"), bg="#f8f9fa", fg="#2c3e50", anchor="w", cursor="hand2").pack(anchor="w")
-        tk.Label(box, text="Click to view", font=("Arial", 9), bg="#f8f9fa", fg="#7f8c8d", anchor="w", cursor="hand2").pack(anchor="w")
-
-        def open_external(_evt=None, p=path):
+        hint = tk.Label(box, text="Click to view", font=("Arial", 9), bg="#f8f9fa", fg="#7f8c8d", anchor="w", cursor="hand2")
+        hint.pack(anchor="w")
+        self._pdf_hints[key] = hint
+
+        def open_external(_evt=None):
+            if key not in self._files:
+                # still being looked up: _await_files opens it once the result lands
+                self._open_when_found = key
+                self._set_pdf_hints("Click to view")
+                hint.configure(text="Searching…")
+                return
+            p = self._files[key]
             abs_path = os.path.abspath(p) if p else ""
             if not abs_path or not os.path.exists(abs_path):
                 messagebox.showerror("File not found", f"File not found:\n{p}"); return
@@ -179,31 +329,52 @@ class SectionPopup:
 
         for w in (card, thumb, box):
             w.bind("<Button-1>", open_external)
+        self._pdf_openers[key] = open_external
 
         def on_enter(_e): card.configure(bg="#e9ecef")
         def on_leave(_e): card.configure(bg="#f8f9fa")
         card.bind("<Enter>", on_enter)
         card.bind("<Leave>", on_leave)
 
-    def _add_frequency_gallery(self, parent, site_id: str) -> None:
+    def _add_frequency_gallery(self, parent) -> tk.Frame:
         sep = tk.Frame(parent, bg="#ecf0f1", height=1); sep.pack(fill="x", pady=(10,5))
         wrap = tk.Frame(parent, bg="#f8f9fa", relief=tk.RAISED, bd=2); wrap.pack(anchor="w", fill="x", padx=10, pady=2)
         head = tk.Frame(wrap, bg="#f8f9fa"); head.pack(fill="x", padx=8, pady=(8,0))
         tk.Label(head, text="📶 Frequency Images", font=("Arial", 10, "bold"), bg="#f8f9fa", fg="#2c3e50").pack(side="left")
         gal = tk.Frame(wrap, bg="#f8f9fa"); gal.pack(fill="x", padx=8, pady=8)
-
-        paths = self.find_frequency_images(site_id)
+        return gal
+
+    def _fill_frequency_gallery(self, paths: List[str], searching: bool = False) -> None:
+        gal = self._gallery
+        for w in gal.winfo_children():
+            w.destroy()
+        if searching:
+            tk.Label(gal, text="Searching…", font=("Arial", 9), bg="#f8f9fa", fg="#7f8c8d").pack(anchor="w")
+            return
         if not paths:
             tk.Label(gal, text="No images found", font=("Arial", 9), bg="#f8f9fa", fg="#7f8c8d").pack(anchor="w")
             return
 
         max_w, max_h, cols = 140, 100, 3
         for idx, p in enumerate(paths[:6]):
-            thumb = self._load_thumbnail(p, max_w, max_h)
-            self._img_cache.append(thumb)  # keep ref
+            pending = None
+            if _PIL_AVAILABLE:
+                cached = thumbnail_loader().cached(p, max_w, max_h)
+                if cached is not None:
+                    thumb = ImageTk.PhotoImage(cached)
+                    self._img_cache.append(thumb)  # keep ref
+                else:
+                    # decoded on a worker; a placeholder holds the spot until then
+                    thumb = self._placeholder(max_w, max_h)
+                    pending = thumbnail_loader().submit(p, max_w, max_h)
+            else:
+                thumb = self._load_thumbnail(p, max_w, max_h)
+                self._img_cache.append(thumb)  # keep ref
             cell = tk.Frame(gal, bg="#ffffff", relief=tk.SOLID, bd=1, cursor="hand2")
             r, c = divmod(idx, cols); cell.grid(row=r, column=c, padx=6, pady=6, sticky="w")
             lbl = tk.Label(cell, image=thumb, bg="#ffffff", cursor="hand2"); lbl.pack()
+            if pending is not None:
+                self._await_thumbnail(lbl, pending)
             cap = tk.Label(cell, text=os.path.basename(p), font=("Arial", 8), bg="#ffffff", fg="#7f8c8d", wraplength=max_w); cap.pack(padx=2, pady=(2,4))
 
             def _open(_evt=None, path=p):
@@ -221,7 +392,7 @@ class SectionPopup:
                 w.bind("<Button-1>", _open)
 
 
-    def _add_rack_videos(self, parent, site_id: str) -> None:
+    def _add_rack_videos(self, parent) -> tk.Frame:
         # Section separator
         sep = tk.Frame(parent, bg="#ecf0f1", height=1)
         sep.pack(fill="x", pady=(10, 5))
@@ -241,8 +412,22 @@ class SectionPopup:
 
         gal = tk.Frame(wrap, bg="#f8f9fa")
         gal.pack(fill="x", padx=8, pady=8)
+        return gal
 
-        video_path = self.find_rack_video(site_id)
+    def _fill_rack_videos(self, video_path: Optional[str], searching: bool = False) -> None:
+        gal = self._videos
+        for w in gal.winfo_children():
+            w.destroy()
+
+        if searching:
+            tk.Label(
+                gal,
+                text="Searching…",
+                font=("Arial", 9),
+                bg="#f8f9fa",
+                fg="#7f8c8d",
+            ).pack(anchor="w")
+            return
 
         if not video_path:
             tk.Label(
@@ -293,41 +478,20 @@ class SectionPopup:
         btn.bind("<Button-1>", _open)
 
 
-    # ---- search helpers ----
+    # ---- search helpers (in-memory lookups, see core/drawings.py) ----
     def _normalize(self, s: str) -> str:
-        s = s.lower()
-        out = [(ch if (ch.isalnum() or ch.isspace()) else " ") for ch in s]
-        return " ".join("".join(out).split())
+        return normalize(s)
+
+    @staticmethod
+    def _relpath(path: str) -> str:
+        try: return os.path.relpath(path, os.path.abspath("."))
+        except Exception: return path
 
     def get_site_drawing_path(self, site_id: str) -> str:
-        base_dir = os.fspath(drawings_path())
-        if not site_id or site_id == "Unknown" or not os.path.isdir(base_dir):
+        if not site_id or site_id == "Unknown" or not os.path.isdir(drawings_path()):
             return os.fspath(drawings_path("unknown.pdf"))
-        site_tokens = [t for t in self._normalize(str(site_id)).split() if t not in {"al", "el"}] or [site_id]
-        room_kw = ["equipment room", "rack room", "room layout", "shelter layout", "layout"]
-        exclude_kw = ["radio", "radios", "front", "back", "r&s", "rack front", "elevation"]
-        best, best_score = None, -1.0
-        for root, _dirs, files in os.walk(base_dir):
-            for fn in files:
-                if not fn.lower().endswith(".pdf"): continue
-                norm = self._normalize(fn)
-                if any(ex in norm for ex in exclude_kw): continue
-                token_hits = sum(1 for t in site_tokens if t and t in norm)
-                if token_hits == 0: continue
-                kw_bonus = sum(2 for kw in room_kw if kw in norm)
-                score = token_hits * 3 + kw_bonus - (len(norm) / 200.0)
-                if score > best_score:
-                    best_score = score; best = os.path.join(root, fn)
-        if best:
-            try: return os.path.relpath(best, os.path.abspath("."))
-            except Exception: return best
-        for root, _dirs, files in os.walk(base_dir):
-            for fn in files:
-                if fn.lower().endswith(".pdf") and all(t in self._normalize(fn) for t in site_tokens):
-                    try: return os.path.relpath(os.path.join(root, fn), os.path.abspath("."))
-                    except Exception: return os.path.join(root, fn)
-        return os.fspath(drawings_path("unknown.pdf"))
-
+        best = drawings_index().site_drawing(site_id)
+        return self._relpath(best) if best else os.fspath(drawings_path("unknown.pdf"))
 
     def find_rack_video(self, site_id: str) -> str | None:
         """
@@ -345,90 +509,45 @@ class SectionPopup:
         """
         if not site_id:
             return None
-
-        base_dir = os.fspath(drawings_path("videos"))
-        if not os.path.isdir(base_dir):
-            return None
-
-
-        wanted_name = site_id.strip()
-        exts = (".mp4", ".mkv", ".avi", ".mov", ".webm")
-
-        for root, _dirs, files in os.walk(base_dir):
-            for fn in files:
-                name, ext = os.path.splitext(fn)
-                if ext.lower() not in exts:
-                    continue
-                # exact match, case-sensitive as you requested
-                if name == wanted_name:
-                    return os.path.join(root, fn)
-
-        return None
-
+        # exact match, case-sensitive as you requested
+        return drawings_index().rack_video(site_id)
 
     def get_equipment_drawing_path(self, site_id: str) -> str:
-        base_dir = os.fspath(drawings_path())
-        if not site_id or site_id == "Unknown" or not os.path.isdir(base_dir):
+        if not site_id or site_id == "Unknown" or not os.path.isdir(drawings_path()):
             return os.fspath(drawings_path("unknown.pdf"))
-        site_tokens = [t for t in self._normalize(str(site_id)).split() if t not in {"al", "el"}] or [site_id]
-        include_kw = ["radio", "radios", "elevation", "front", "back", "rack front", "rcag", "equipment"]
-        exclude_kw = ["room layout", "equipment room", "rack room", "shelter layout", "layout"]
-        best, best_score = None, -1.0
-        for root, _dirs, files in os.walk(base_dir):
-            for fn in files:
-                if not fn.lower().endswith(".pdf"): continue
-                norm = self._normalize(fn)
-                if any(ex in norm for ex in exclude_kw): continue
-                token_hits = sum(1 for t in site_tokens if t and t in norm)
-                if token_hits == 0: continue
-                kw_bonus = sum(2 for kw in include_kw if kw in norm)
-                score = token_hits * 3 + kw_bonus - (len(norm) / 200.0)
-                if score > best_score:
-                    best_score = score; best = os.path.join(root, fn)
-        if best:
-            try: return os.path.relpath(best, os.path.abspath("."))
-            except Exception: return best
-        for root, _dirs, files in os.walk(base_dir):
-            for fn in files:
-                if fn.lower().endswith(".pdf") and all(t in self._normalize(fn) for t in site_tokens):
-                    try: return os.path.relpath(os.path.join(root, fn), os.path.abspath("."))
-                    except Exception: return os.path.join(root, fn)
-        return os.fspath(drawings_path("unknown.pdf"))
+        best = drawings_index().equipment_drawing(site_id)
+        return self._relpath(best) if best else os.fspath(drawings_path("unknown.pdf"))
 
     def find_frequency_images(self, site_id: str) -> List[str]:
-        pref = os.fspath(drawings_path("freq"))
-        fb = os.fspath(drawings_path())
-        base_candidates = []
-        if os.path.isdir(pref): base_candidates.append(pref)
-        if os.path.isdir(fb) and fb not in base_candidates: base_candidates.append(fb)
-        if not site_id or site_id == "Unknown" or not base_candidates: return []
-        site_tokens = [t for t in self._normalize(site_id).split() if t]
-        freq_kw = [site_id]
-        scored: List[Tuple[float, str]] = []
-        seen = set()
-        for base in base_candidates:
-            for root, _dirs, files in os.walk(base):
-                for fn in files:
-                    if not fn.lower().endswith((".png", ".jpg", ".jpeg")): continue
-                    fpath = os.path.join(root, fn)
-                    if fpath in seen: continue
-                    seen.add(fpath)
-                    norm = self._normalize(fn)
-                    site_hits = sum(1 for t in site_tokens if t in norm)
-                    kw_hits = sum(1 for k in freq_kw if k in norm)
-                    score = site_hits * 3 + kw_hits * 2 - (len(norm) / 300.0)
-                    if score <= 0 and base == pref: score = 0.1
-                    scored.append((score, fpath))
-        if not scored: return []
-        scored.sort(key=lambda x: (-x[0], os.path.basename(x[1])))
-        return [p for _s, p in scored[:1]]
+        if not site_id or site_id == "Unknown": return []
+        return drawings_index().frequency_images(site_id, limit=1)
+
+    def _placeholder(self, max_w: int, max_h: int) -> tk.PhotoImage:
+        key = (max_w, max_h)
+        ph = self._placeholders.get(key)
+        if ph is None:
+            ph = tk.PhotoImage(width=max_w, height=max_h)
+            ph.put("#ecf0f1", to=(0, 0, max_w, max_h))
+            self._placeholders[key] = ph
+        return ph
+
+    def _await_thumbnail(self, label: tk.Label, fut: "Future[Image.Image]") -> None:
+        if not label.winfo_exists():
+            return  # popup closed meanwhile
+        if not fut.done():
+            self.popup.after(C.THUMB_POLL_MS, lambda: self._await_thumbnail(label, fut))
+            return
+        try:
+            thumb = ImageTk.PhotoImage(fut.result())
+        except Exception:
+            return  # unreadable: keep the placeholder
+        self._img_cache.append(thumb)  # keep ref
+        label.configure(image=thumb)
 
     def _load_thumbnail(self, path: str, max_w: int, max_h: int) -> tk.PhotoImage:
         try:
             if _PIL_AVAILABLE:
-                img = Image.open(path)
-                img.thumbnail((max_w, max_h))
-                return ImageTk.PhotoImage(img)
+                return ImageTk.PhotoImage(thumbnail_cache().fetch(path, max_w, max_h))
             else:
                 img = tk.PhotoImage(file=path)
                 w, h = img.width(), img.height()
@@ -484,5 +603,7 @@ class SectionPopup:
         }
 
     def close(self) -> None:
+        self._generation += 1
         self.popup.grab_release()
-        self.popup.destroy()
+        self.popup.withdraw()
+        self._img_cache = []
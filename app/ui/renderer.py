@@ -1,8 +1,21 @@
 from __future__ import annotations
-from typing import List, Optional, Tuple
+import os
+from typing import AbstractSet, Callable, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
 import tkinter as tk
 
-from ..core.models import Bounds, LngLat, Ring, PointFeature
+from ..core.models import Bounds, LngLat, PointFeature, GeometryStore, Layer
+from ..core.geo import ring_bounds_all, geom_at
+from ..core.labels import pole_anchors, sector_labels
+from ..core.clip import clip_polygon
+from ..core.projection import Viewport, ProjectionCache, project_points
+from ..core.simplify import LodPyramid
+from ..core.raster import AVAILABLE as RASTER_AVAILABLE, Basemap, TilePyramid, basemap_style
+from ..core.coverage import CoverageGrid
+from ..core.thumbs import thumbnail_cache
+from .scene import (
+    Scene, ALL_LAYERS, LAYER_GEOMETRY, LAYER_LABELS, LAYER_POINTS, LAYER_MARKERS, LAYER_HOVER,
+)
 from ..core import config as C
 
 # Pillow (optional) for better resizing/opacity of the corner logo
@@ -14,7 +27,11 @@ except Exception:
 
 
 class CanvasRenderer:
-    """Only renders and exposes hit-tags; keeps no application state."""
+    """
+    Only renders and exposes hit-tags; keeps no application state.
+    Canvas items are retained between frames (see scene.py) and mapped back
+    to the feature they draw via feature_at().
+    """
 
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
@@ -27,12 +44,45 @@ class CanvasRenderer:
         )
         self.canvas.pack(fill="both", expand=True)
 
-        self._poly_items: List[int] = []
-        self._marker_items: List[int] = []
-        self._fixed_point_items: List[int] = []
-        self._label_items: List[int] = []
+        # Retained scene, bottom to top
+        self.scene = Scene(self.canvas)
+        self._basemap_img = self.scene.layer("image", "scene-basemap")
+        self._polys = self.scene.layer("polygon", "scene-ring", ordered=True)
+        self._coverage_img = self.scene.layer("image", "scene-coverage")
+        self._hover_polys = self.scene.layer("polygon", "scene-ring-hover", ordered=True)
+        self._labels = self.scene.layer("text", "scene-sector-label")
+        self._dots = self.scene.layer("oval", "scene-point")
+        self._dot_labels = self.scene.layer("text", "scene-point-label")
+        self._marker_dots = self.scene.layer("oval", "scene-marker")
+        self._marker_labels = self.scene.layer("text", "scene-marker-label")
+        self._highlight_item: Optional[int] = None
+        self._highlight_ll: Optional[LngLat] = None
+        self._hover_geom: Optional[int] = None
+
+        # Static fills/outlines come from pre-rendered tiles when Pillow is available;
+        # polygons are then only drawn for the hovered sector
+        self._basemap: Optional[Basemap] = (
+            Basemap(C.RASTER_TILE_PX, C.RASTER_MEM_TILES, C.RASTER_WORKERS)
+            if RASTER_AVAILABLE and C.RASTER_BASEMAP else None
+        )
+        self._basemap_view: Optional[Tuple[TilePyramid, Viewport, bool]] = None
+        self._basemap_final = True  # False: composed while tiles were missing
+        self._raster_frame = False  # last frame drew the basemap instead of polygons
+        self._basemap_photo: Optional["ImageTk.PhotoImage"] = None
+        # called (on the Tk thread) once the background tiles a frame was missing have landed
+        self.on_basemap_ready: Optional[Callable[[], None]] = None
+        self._tile_poll = False
+        # Nearest-site overlay on the main map (one image, like the basemap)
+        self.coverage: Optional[CoverageGrid] = None
+        self._coverage_view: Optional[Tuple[CoverageGrid, Viewport, bool]] = None
+        self._coverage_photo: Optional["ImageTk.PhotoImage"] = None
+        self._hit_rings: Optional[GeometryStore] = None  # full-resolution rings of the last frame
+        self._frame_rings: Optional[GeometryStore] = None  # LOD level drawn in the last frame
 
         self.cur_bounds: Bounds | None = None
+        self._bbox_cache: "WeakKeyDictionary[GeometryStore, List[Bounds]]" = WeakKeyDictionary()
+        self._projections = ProjectionCache()
+        self._anchor_cache: "WeakKeyDictionary[GeometryStore, Dict[int, LngLat]]" = WeakKeyDictionary()
 
         # Corner logo state
         self._logo_imgtk: Optional["ImageTk.PhotoImage" | tk.PhotoImage] = None
@@ -45,147 +95,307 @@ class CanvasRenderer:
         self.canvas.bind("<Configure>", self._on_canvas_resize)
 
     # ---- projection helpers bound to current Bounds ----
-    def project(self, lon: float, lat: float, w: int, h: int) -> Tuple[float, float]:
+    def viewport(self, w: int, h: int) -> Viewport:
         assert self.cur_bounds is not None, "cur_bounds must be set before drawing"
-        b = self.cur_bounds
-        x = C.PADDING + (lon - b.min_lon) / (b.max_lon - b.min_lon) * (w - 2 * C.PADDING)
-        y = C.PADDING + (b.max_lat - lat) / (b.max_lat - b.min_lat) * (h - 2 * C.PADDING)
-        return x, y
+        return Viewport(self.cur_bounds, w, h, C.PADDING)
+
+    def project(self, lon: float, lat: float, w: int, h: int) -> Tuple[float, float]:
+        return self.viewport(w, h).project(lon, lat)
 
     def inv_project(self, x: float, y: float, w: int, h: int) -> Tuple[float, float]:
-        assert self.cur_bounds is not None, "cur_bounds must be set before drawing"
-        x = max(C.PADDING, min(w - C.PADDING, x))
-        y = max(C.PADDING, min(h - C.PADDING, y))
-        b = self.cur_bounds
-        lon = b.min_lon + ((x - C.PADDING) / (w - 2 * C.PADDING)) * (b.max_lon - b.min_lon)
-        lat = b.max_lat - ((y - C.PADDING) / (h - 2 * C.PADDING)) * (b.max_lat - b.min_lat)
-        return lon, lat
+        return self.viewport(w, h).inv_project(x, y)
 
     # ---- public draw entrypoint ----
     def draw(
         self,
         bounds: Bounds,
-        rings: List[Ring],
+        rings: GeometryStore,
         points: List[PointFeature],
         user_markers: List[LngLat],
         in_detail: bool,
         detail_fill_override: Optional[str] = None,
+        anchors: Optional[Dict[int, LngLat]] = None,
+        lod: Optional[LodPyramid] = None,
+        fast: bool = False,
+        layers: AbstractSet[str] = ALL_LAYERS,
+        source: Optional[Layer] = None,
     ) -> None:
+        """
+        Redraw `layers` (see scene.py) for the given state; the items of the
+        other layers are left as they are, so callers must pass every layer
+        affected by a change of bounds or canvas size.
+        `source` is the layer `rings` come from; it enables the raster basemap.
+        """
         self.cur_bounds = bounds
-        self._clear_canvas()
+        groups = {
+            LAYER_GEOMETRY: (self._basemap_img, self._polys, self._coverage_img),
+            LAYER_LABELS: (self._labels,),
+            LAYER_POINTS: (self._dots, self._dot_labels),
+            LAYER_MARKERS: (self._marker_dots, self._marker_labels),
+        }
+        frame = [lay for name, lays in groups.items() if name in layers for lay in lays]
+        self.scene.begin_frame(frame)
 
         w = self.canvas.winfo_width()
         h = self.canvas.winfo_height()
 
-        # Polygons
-        for idx, ring in enumerate(rings):
-            pts: List[float] = []
-            for lon, lat in ring:
-                x, y = self.project(lon, lat, w, h)
-                pts.extend((x, y))
-            if len(pts) >= 6:
+        # Same rings/indices, fewer vertices: only what is visible at this scale
+        # (coarser still while animating, when nobody can see the difference)
+        self._hit_rings = rings
+        if lod is not None:
+            error_scale = C.ANIM_LOD_ERROR_SCALE if fast else 1.0
+            rings = lod.for_view(bounds, w, h, C.PADDING, error_scale)
+        self._frame_rings = rings
+
+        # Anything further than this outside the canvas is culled or clipped away
+        m = C.VIEW_MARGIN_PX
+        view = self._view_bounds(w, h, m)
+        bboxes = self._ring_bboxes(rings)
+        vp = self.viewport(w, h)
+        # (a canvas that isn't laid out yet has no room for a basemap)
+        raster = self._basemap is not None and source is not None and min(w, h) > 2 * C.PADDING
+        if LAYER_GEOMETRY in layers:
+            self._raster_frame = raster
+        if raster and LAYER_GEOMETRY in layers:
+            style = basemap_style(in_detail, detail_fill_override)
+            self._draw_basemap(self._basemap.pyramid(source, style), vp, fast)
+        # whole level projected at once; reused as-is while the view doesn't change
+        projected = self._projections.get(rings, vp) if LAYER_GEOMETRY in layers and not raster else None
+
+        # Polygons; hit-tags use the feature index so every part of a MultiPolygon is one sector
+        for ridx in range(len(rings)) if projected is not None else ():
+            rb = bboxes[ridx]
+            if (rb.max_lon < view.min_lon or rb.min_lon > view.max_lon
+                    or rb.max_lat < view.min_lat or rb.min_lat > view.max_lat):
+                continue
+            pts = projected.ring(ridx)
+            if not (view.min_lon <= rb.min_lon and rb.max_lon <= view.max_lon
+                    and view.min_lat <= rb.min_lat and rb.max_lat <= view.max_lat):
+                # partly visible: keep Tk away from huge off-canvas coordinates
+                pts = clip_polygon(pts, -m, -m, w + m, h + m)
+            if len(pts) < 6:
+                continue
+            idx = rings.geom_of_ring(ridx)
+            if rings.is_hole(ridx):
+                # holes are painted over their shell in the background colour
+                self._polys.put(
+                    ridx, pts, None,
+                    outline=C.OUTLINE_COLOR,
+                    width=C.POLY_WIDTH,
+                    fill=getattr(C, "BACKGROUND", "white"),
+                    activefill="",
+                    tags=("hole",),
+                )
+            else:
                 fill_color = (
                     detail_fill_override if (in_detail and detail_fill_override) else
                     (C.SECTOR_COLORS[idx % len(C.SECTOR_COLORS)] if hasattr(C, "SECTOR_COLORS") else "")
                 )
-                item = self.canvas.create_polygon(
-                    *pts,
+                self._polys.put(
+                    ridx, pts, ("ring", idx),
                     outline=C.OUTLINE_COLOR,
                     width=C.POLY_WIDTH,
                     fill=fill_color,
                     activefill=C.HOVER_FILL,
                     tags=("ring", f"ring-{idx}"),
                 )
-                self._poly_items.append(item)
+
+        if LAYER_GEOMETRY in layers and not in_detail and self.coverage is not None and _PIL_AVAILABLE \
+                and min(w, h) > 2 * C.PADDING:
+            self._draw_coverage(self.coverage, vp, fast)
 
         # Labels for main view
-        if not in_detail and hasattr(C, "SECTOR_LABELS"):
-            for idx, ring in enumerate(rings):
-                fixed = getattr(C, "SECTOR_LABEL_POS", {}).get(idx) if hasattr(C, "SECTOR_LABEL_POS") else None
-                if fixed is not None and isinstance(fixed, (list, tuple)) and len(fixed) == 2:
-                    cx_lon, cy_lat = float(fixed[0]), float(fixed[1])
-                else:
-                    cx_lon, cy_lat = self._polygon_centroid_or_bbox(ring)
-                x, y = self.project(cx_lon, cy_lat, w, h)
-                label = C.SECTOR_LABELS.get(idx)
-                if not label:
+        if LAYER_LABELS in layers and not in_detail and hasattr(C, "SECTOR_LABELS"):
+            if anchors is None:
+                anchors = self._anchor_cache.get(rings)
+                if anchors is None:
+                    anchors = self._anchor_cache[rings] = pole_anchors(rings)
+            for idx, ll, label in sector_labels(rings.n_geoms, anchors):
+                x, y = vp.project(*ll)
+                if not self._on_canvas(x, y, w, h, m):
                     continue
-                txt_item = self.canvas.create_text(
-                    x, y,
+                self._labels.put(
+                    idx, (x, y), ("sector-label", idx),
                     text=label,
                     fill=getattr(C, "SECTOR_LABEL_COLOR", "#222"),
                     font=getattr(C, "SECTOR_LABEL_FONT", ("Arial", 24, "bold")),
                     state="disabled",
                     tags=("sector-label", f"sector-label-{idx}"),
                 )
-                self._label_items.append(txt_item)
 
         # Points (detail mode) or user markers (main)
-        if in_detail:
-            for idx, (lon, lat, site, _sector_id, _freq, _power) in enumerate(points):
-                x, y = self.project(lon, lat, w, h)
-                dot = self.canvas.create_oval(
-                    x - C.POINT_RADIUS, y - C.POINT_RADIUS,
-                    x + C.POINT_RADIUS, y + C.POINT_RADIUS,
+        if in_detail and LAYER_POINTS in layers:
+            for idx, (x, y) in enumerate(project_points(points, vp)):
+                site = points[idx][2]
+                if not self._on_canvas(x, y, w, h, m):
+                    continue
+                self._dots.put(
+                    idx,
+                    (x - C.POINT_RADIUS, y - C.POINT_RADIUS, x + C.POINT_RADIUS, y + C.POINT_RADIUS),
+                    ("point", idx),
                     fill=C.POINT_FILL, outline=C.POINT_OUTLINE, width=2,
                     tags=("point", f"point-{idx}"),
                 )
-                txt = self.canvas.create_text(
-                    x + 8, y - 8, text=site,
+                self._dot_labels.put(
+                    idx, (x + 8, y - 8), ("point", idx),
+                    text=site,
                     anchor="sw", fill=C.POINT_LABEL_COLOR, font=C.POINT_FONT,
                     tags=("point", f"point-{idx}"),
                 )
-                self._fixed_point_items.extend([dot, txt])
-        else:
-            for lon, lat in user_markers:
-                x, y = self.project(lon, lat, w, h)
-                dot = self.canvas.create_oval(
-                    x - C.MARKER_RADIUS, y - C.MARKER_RADIUS,
-                    x + C.MARKER_RADIUS, y + C.MARKER_RADIUS,
+        elif not in_detail and LAYER_MARKERS in layers:
+            for midx, ((lon, lat), (x, y)) in enumerate(zip(user_markers, project_points(user_markers, vp))):
+                if not self._on_canvas(x, y, w, h, m):
+                    continue
+                self._marker_dots.put(
+                    midx,
+                    (x - C.MARKER_RADIUS, y - C.MARKER_RADIUS, x + C.MARKER_RADIUS, y + C.MARKER_RADIUS),
+                    ("marker", midx),
                     fill=C.MARKER_COLOR, outline="",
                 )
-                lbl = self.canvas.create_text(
-                    x + 8, y - 8,
+                self._marker_labels.put(
+                    midx, (x + 8, y - 8), ("marker", midx),
                     text=f"{lon:.3f}, {lat:.3f}",
                     anchor="sw", fill=C.MARKER_LABEL_COLOR, font=C.MARKER_FONT,
                 )
-                self._marker_items.extend([dot, lbl])
+
+        self.scene.end_frame(frame)
+        if LAYER_HOVER in layers:
+            self._draw_hover_geom()
+            self._draw_highlight()
+        if self._highlight_item is not None:
+            self.canvas.tag_raise(self._highlight_item)
 
         if self._logo_item is not None:
             self.canvas.tag_raise(self._logo_item)
 
+    # ---- raster basemap ----
+    def _draw_basemap(self, pyramid: TilePyramid, vp: Viewport, fast: bool) -> None:
+        view = (pyramid, vp, fast)
+        if view != self._basemap_view or not self._basemap_final:
+            # one image for the whole canvas, composed from cached tiles
+            img, self._basemap_final = pyramid.render_view(vp, fast)
+            self._basemap_photo = ImageTk.PhotoImage(img)
+            self._basemap_view = view
+        self._basemap_img.put(0, (0, 0), None, image=self._basemap_photo, anchor="nw", state="disabled")
+        if not self._basemap_final and not self._tile_poll:
+            self._tile_poll = True
+            self.canvas.after(C.PREFETCH_POLL_MS, self._await_tiles)
+
+    def _await_tiles(self) -> None:
+        view = self._basemap_view
+        if view is not None and view[0].pending:
+            self.canvas.after(C.PREFETCH_POLL_MS, self._await_tiles)
+            return
+        self._tile_poll = False
+        # only if the frame on screen is still the one missing tiles
+        if not self._basemap_final and self.on_basemap_ready is not None:
+            self.on_basemap_ready()
+
+    def shutdown(self) -> None:
+        """Stop background tile rendering."""
+        if self._basemap is not None:
+            self._basemap.shutdown()
+
+    def set_coverage(self, grid: Optional[CoverageGrid]) -> None:
+        """Show `grid` over the main map from the next geometry redraw on (None hides it)."""
+        self.coverage = grid
+
+    def _draw_coverage(self, grid: CoverageGrid, vp: Viewport, fast: bool) -> None:
+        view = (grid, vp, fast)
+        if view != self._coverage_view:
+            self._coverage_photo = ImageTk.PhotoImage(grid.render_view(vp, fast))
+            self._coverage_view = view
+        self._coverage_img.put(0, (0, 0), None, image=self._coverage_photo, anchor="nw", state="disabled")
+
+    def ring_at(self, x: float, y: float) -> Optional[int]:
+        """Feature index of the sector under canvas point (x, y), by point-in-polygon."""
+        if self._hit_rings is None or self.cur_bounds is None:
+            return None
+        vp = self.viewport(self.canvas.winfo_width(), self.canvas.winfo_height())
+        lon, lat = vp.inv_project(x, y, clamp=False)
+        return geom_at(self._hit_rings, lon, lat, self._ring_bboxes(self._hit_rings))
+
+    def highlight_geom(self, idx: Optional[int]) -> None:
+        """Fill sector `idx` (or nothing) with the hover colour; only needed over the basemap."""
+        if idx == self._hover_geom:
+            return
+        self._hover_geom = idx
+        self._draw_hover_geom()
+
+    def _draw_hover_geom(self) -> None:
+        lay = self._hover_polys
+        lay.begin()
+        rings = self._frame_rings
+        if self._hover_geom is not None and rings is not None and self._raster_frame:
+            w = self.canvas.winfo_width()
+            h = self.canvas.winfo_height()
+            m = C.VIEW_MARGIN_PX
+            projected = self._projections.get(rings, self.viewport(w, h))
+            for ridx in rings.geom_rings(self._hover_geom):
+                pts = clip_polygon(projected.ring(ridx), -m, -m, w + m, h + m)
+                if len(pts) < 6:
+                    continue
+                fill = getattr(C, "BACKGROUND", "white") if rings.is_hole(ridx) else C.HOVER_FILL
+                lay.put(ridx, pts, None, outline=C.OUTLINE_COLOR, width=C.POLY_WIDTH, fill=fill, state="disabled")
+        if lay.end():
+            self.scene.restack()
+
+    # ---- hovered-site ring ----
+    def highlight_point(self, ll: Optional[LngLat]) -> None:
+        """Ring the site at `ll` (or clear with None) without a full redraw."""
+        if ll == self._highlight_ll:
+            return
+        self._highlight_ll = ll
+        self._draw_highlight()
+
+    def _draw_highlight(self) -> None:
+        if self._highlight_ll is None or self.cur_bounds is None:
+            if self._highlight_item is not None:
+                self.canvas.delete(self._highlight_item)
+                self._highlight_item = None
+            return
+        w = self.canvas.winfo_width()
+        h = self.canvas.winfo_height()
+        x, y = self.project(self._highlight_ll[0], self._highlight_ll[1], w, h)
+        r = C.POINT_RADIUS + 4
+        if self._highlight_item is None:
+            self._highlight_item = self.canvas.create_oval(
+                x - r, y - r, x + r, y + r,
+                outline=C.POINT_HIGHLIGHT_COLOR, width=3, state="disabled",
+                tags=("point-highlight",),
+            )
+        else:
+            self.canvas.coords(self._highlight_item, x - r, y - r, x + r, y + r)
+
     # ---- utils ----
-    def _clear_canvas(self) -> None:
-        logo_item = self._logo_item
-        for item in self.canvas.find_all():
-            if logo_item is not None and item == logo_item:
-                continue
-            self.canvas.delete(item)
-        self._poly_items.clear()
-        self._marker_items.clear()
-        self._fixed_point_items.clear()
-        self._label_items.clear()
-
-    def _polygon_centroid_or_bbox(self, ring: Ring) -> Tuple[float, float]:
-        if not ring:
-            return 0.0, 0.0
-        area_acc = cx_acc = cy_acc = 0.0
-        n = len(ring)
-        for i in range(n):
-            x0, y0 = ring[i]
-            x1, y1 = ring[(i + 1) % n]
-            cross = x0 * y1 - x1 * y0
-            area_acc += cross
-            cx_acc += (x0 + x1) * cross
-            cy_acc += (y0 + y1) * cross
-        area = area_acc / 2.0
-        if area == 0.0:
-            lons = [lon for lon, _lat in ring]
-            lats = [lat for _lon, lat in ring]
-            return (min(lons) + max(lons)) / 2.0, (min(lats) + max(lats)) / 2.0
-        cx = cx_acc / (6.0 * area)
-        cy = cy_acc / (6.0 * area)
-        return cx, cy
+    def _view_bounds(self, w: int, h: int, margin: float) -> Bounds:
+        """Lon/lat box covered by the canvas plus `margin` pixels on every side (no clamping)."""
+        b = self.cur_bounds
+        assert b is not None
+        sx = (b.max_lon - b.min_lon) / max(1, w - 2 * C.PADDING)
+        sy = (b.max_lat - b.min_lat) / max(1, h - 2 * C.PADDING)
+        return Bounds(
+            min_lon=b.min_lon - (C.PADDING + margin) * sx,
+            max_lon=b.max_lon + (C.PADDING + margin) * sx,
+            min_lat=b.min_lat - (C.PADDING + margin) * sy,
+            max_lat=b.max_lat + (C.PADDING + margin) * sy,
+        )
+
+    @staticmethod
+    def _on_canvas(x: float, y: float, w: int, h: int, margin: float) -> bool:
+        return -margin <= x <= w + margin and -margin <= y <= h + margin
+
+    def _ring_bboxes(self, rings: GeometryStore) -> List[Bounds]:
+        # per-store, computed once: every LOD level is its own store
+        bboxes = self._bbox_cache.get(rings)
+        if bboxes is None:
+            bboxes = ring_bounds_all(rings)
+            self._bbox_cache[rings] = bboxes
+        return bboxes
+
+    def feature_at(self, item: int) -> Optional[Tuple[str, int]]:
+        """("ring", feature_idx) / ("point", point_idx) / ... for a canvas item id, or None."""
+        return self.scene.feature_at(item)
 
     # =========================
     # Corner logo (overlay API)
@@ -211,14 +421,22 @@ class CanvasRenderer:
 
         try:
             if _PIL_AVAILABLE:
-                img = Image.open(image_path).convert("RGBA")
-                # Resize preserving aspect ratio within the bounds
-                img.thumbnail((self._logo_max_w, self._logo_max_h), Image.LANCZOS)
-                # Apply opacity by scaling alpha channel
-                if self._logo_opacity < 255:
-                    r, g, b, a = img.split()
-                    a = a.point(lambda v: int(v * (self._logo_opacity / 255.0)))
-                    img = Image.merge("RGBA", (r, g, b, a))
+                opacity = self._logo_opacity
+
+                def make(path: str, max_w: int, max_h: int) -> "Image.Image":
+                    img = Image.open(path).convert("RGBA")
+                    # Resize preserving aspect ratio within the bounds
+                    img.thumbnail((max_w, max_h), Image.LANCZOS)
+                    # Apply opacity by scaling alpha channel
+                    if opacity < 255:
+                        r, g, b, a = img.split()
+                        a = a.point(lambda v: int(v * (opacity / 255.0)))
+                        img = Image.merge("RGBA", (r, g, b, a))
+                    return img
+
+                # processed once, then read back from the thumbnail cache on later launches
+                img = thumbnail_cache().fetch(os.fspath(image_path), self._logo_max_w, self._logo_max_h,
+                                              variant=f"logo-{opacity}", make=make)
                 self._logo_imgtk = ImageTk.PhotoImage(img)
             else:
                 img = tk.PhotoImage(file=image_path)
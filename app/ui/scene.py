@@ -0,0 +1,118 @@
+from __future__ import annotations
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set
+import tkinter as tk
+
+# Render layers that can be invalidated (and redrawn) independently
+LAYER_GEOMETRY = "geometry"   # sector polygons
+LAYER_LABELS = "labels"       # sector names
+LAYER_POINTS = "points"       # sites (detail view)
+LAYER_MARKERS = "markers"     # user markers (main view)
+LAYER_HOVER = "hover"         # hovered-site highlight
+ALL_LAYERS = frozenset({LAYER_GEOMETRY, LAYER_LABELS, LAYER_POINTS, LAYER_MARKERS, LAYER_HOVER})
+
+
+class SceneLayer:
+    """
+    Retained canvas items for one kind of feature.
+    Between begin() and end() every visible feature is put() under a stable key:
+    existing items are moved with coords() and only changed options are
+    re-applied; items are created when a key first appears and deleted by
+    end() when it stops appearing. end() returns the items created since
+    begin(), so callers know when the stacking needs fixing.
+    """
+
+    def __init__(self, scene: "Scene", kind: str, tag: str, ordered: bool = False) -> None:
+        self.scene = scene
+        self.kind = kind          # "polygon" | "text" | "oval"
+        self.tag = tag            # every item of this layer carries it, for z-ordering
+        self.ordered = ordered    # keep canvas stacking in key order (e.g. holes above shells)
+        self._items: Dict[Hashable, int] = {}
+        self._opts: Dict[Hashable, Dict[str, Any]] = {}
+        self._seen: Set[Hashable] = set()
+        self._created: List[int] = []
+
+    def begin(self) -> None:
+        self._seen = set()
+        self._created = []
+
+    def put(self, key: Hashable, coords: Sequence[float], feature: Any = None, **options: Any) -> int:
+        canvas = self.scene.canvas
+        tags = (self.tag, *options.pop("tags", ()))
+        options["tags"] = tags
+        item = self._items.get(key)
+        if item is None:
+            create = getattr(canvas, f"create_{self.kind}")
+            item = create(*coords, **options)
+            self._items[key] = item
+            self._opts[key] = options
+            self._created.append(item)
+        else:
+            canvas.coords(item, *coords)
+            prev = self._opts[key]
+            changed = {k: v for k, v in options.items() if prev.get(k) != v}
+            if changed:
+                canvas.itemconfig(item, **changed)
+                prev.update(changed)
+        self.scene.features[item] = feature
+        self._seen.add(key)
+        return item
+
+    def end(self) -> List[int]:
+        canvas = self.scene.canvas
+        for key in [k for k in self._items if k not in self._seen]:
+            item = self._items.pop(key)
+            self._opts.pop(key, None)
+            self.scene.features.pop(item, None)
+            canvas.delete(item)
+        if self.ordered and self._created:
+            for key in sorted(self._items):  # type: ignore[type-var]
+                canvas.tag_raise(self._items[key])
+        return self._created
+
+    def clear(self) -> None:
+        self.begin()
+        self.end()
+
+    def items(self) -> List[int]:
+        return list(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class Scene:
+    """Stack of SceneLayers on one canvas plus a direct item-id -> feature map."""
+
+    def __init__(self, canvas: tk.Canvas) -> None:
+        self.canvas = canvas
+        self.layers: List[SceneLayer] = []
+        self.features: Dict[int, Any] = {}
+
+    def layer(self, kind: str, tag: str, ordered: bool = False) -> SceneLayer:
+        lay = SceneLayer(self, kind, tag, ordered)
+        self.layers.append(lay)
+        return lay
+
+    def begin_frame(self, layers: Optional[Iterable[SceneLayer]] = None) -> None:
+        """Start a frame for `layers` (default: all); the others keep their items untouched."""
+        for lay in self.layers if layers is None else layers:
+            lay.begin()
+
+    def end_frame(self, layers: Optional[Iterable[SceneLayer]] = None) -> bool:
+        """Drop items that weren't put this frame; returns True if the stacking changed."""
+        created = False
+        for lay in self.layers if layers is None else layers:
+            if lay.end():
+                created = True
+        if created:
+            self.restack()
+        return created
+
+    def restack(self) -> None:
+        """Raise layers in creation order so later layers stay on top."""
+        for lay in self.layers:
+            if len(lay):
+                self.canvas.tag_raise(lay.tag)
+
+    def feature_at(self, item: int) -> Optional[Any]:
+        return self.features.get(item)
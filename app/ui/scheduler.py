@@ -0,0 +1,66 @@
+from __future__ import annotations
+import time
+from typing import Callable, Iterable, Optional, Set
+import tkinter as tk
+
+from .scene import ALL_LAYERS
+
+
+class RenderScheduler:
+    """
+    Coalesces redraw requests: state changes mark layers dirty, and a single
+    after_idle pass renders the union of everything marked since the last
+    pass, no more often than once per `min_interval_ms`.
+    """
+
+    def __init__(self, widget: tk.Misc, render: Callable[[Set[str]], None], min_interval_ms: int = 16) -> None:
+        self.widget = widget
+        self._render = render
+        self.min_interval_ms = max(0, min_interval_ms)
+        self._dirty: Set[str] = set()
+        self._after_id: Optional[str] = None
+        self._last_render = 0.0
+
+    @property
+    def dirty(self) -> Set[str]:
+        return set(self._dirty)
+
+    def mark_dirty(self, *layers: str) -> None:
+        """Invalidate `layers` (all of them when called without arguments) and schedule a pass."""
+        self._dirty.update(layers or ALL_LAYERS)
+        if self._after_id is not None:
+            return
+        wait_ms = self.min_interval_ms - (time.perf_counter() - self._last_render) * 1000.0
+        if wait_ms > 0:
+            self._after_id = self.widget.after(int(wait_ms) + 1, self._idle)
+        else:
+            self._after_id = self.widget.after_idle(self._run)
+
+    def _idle(self) -> None:
+        # the frame interval has passed: render as soon as pending events are handled
+        self._after_id = self.widget.after_idle(self._run)
+
+    def clean(self, layers: Iterable[str]) -> None:
+        """Forget pending work for `layers` (they were just drawn synchronously)."""
+        self._dirty.difference_update(layers)
+        self._last_render = time.perf_counter()
+        if not self._dirty:
+            self.cancel()
+
+    def flush(self) -> None:
+        """Render pending layers now instead of waiting for idle."""
+        self.cancel()
+        self._run()
+
+    def cancel(self) -> None:
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _run(self) -> None:
+        self._after_id = None
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        self._last_render = time.perf_counter()
+        self._render(dirty)
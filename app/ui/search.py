@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import Callable, List, Optional
+import tkinter as tk
+
+from ..core import config as C
+from ..core.search import SiteHit, SiteSearch
+
+
+class SearchBox:
+    """
+    Entry with a drop-down of ranked sites. Every keystroke queries the
+    SiteSearch (once one is attached); Return or a click picks a result.
+    """
+
+    def __init__(self, parent: tk.Widget, on_pick: Callable[[SiteHit], None], width: int = 28) -> None:
+        self.on_pick = on_pick
+        self.search: Optional[SiteSearch] = None
+        self._hits: List[SiteHit] = []
+        self._query = ""
+
+        self.var = tk.StringVar()
+        self.entry = tk.Entry(parent, textvariable=self.var, width=width, font=("Arial", 11),
+                              relief=tk.SOLID, bd=1, fg="#7f8c8d")
+        self._hint = "🔍 Search sites, sectors, frequencies"
+        self._show_hint()
+        # the list floats over the map, under the entry
+        self.listbox = tk.Listbox(parent.winfo_toplevel(), font=("Arial", 10), activestyle="none",
+                                  relief=tk.SOLID, bd=1, height=C.SEARCH_MAX_RESULTS, exportselection=False)
+
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Down>", lambda _e: self._move(1))
+        self.entry.bind("<Up>", lambda _e: self._move(-1))
+        self.entry.bind("<Return>", lambda _e: self._pick())
+        self.entry.bind("<Escape>", self._on_escape)
+        self.entry.bind("<FocusIn>", self._on_focus_in)
+        self.entry.bind("<FocusOut>", self._on_focus_out)
+        self.listbox.bind("<ButtonRelease-1>", lambda _e: self._pick())
+
+    def attach(self, search: SiteSearch) -> None:
+        """Start answering queries from `search` (re-running whatever has been typed)."""
+        self.search = search
+        self._query = ""
+        self._refresh()
+
+    def focus(self) -> None:
+        self.entry.focus_set()
+        self.entry.select_range(0, tk.END)
+
+    # ---- hint text ----
+    def _show_hint(self) -> None:
+        if not self.var.get():
+            self.var.set(self._hint)
+            self.entry.configure(fg="#7f8c8d")
+
+    def _on_focus_in(self, _e: tk.Event) -> None:
+        if self.var.get() == self._hint:
+            self.var.set("")
+            self.entry.configure(fg="#2c3e50")
+
+    def _on_focus_out(self, _e: tk.Event) -> None:
+        self._show_hint()
+        # a click on the list moves focus there first; let it pick before hiding
+        self.entry.after(150, self._hide_unless_focused)
+
+    def _hide_unless_focused(self) -> None:
+        if self.entry.focus_get() is not self.entry:
+            self._hide()
+
+    # ---- results ----
+    def _on_key(self, e: tk.Event) -> None:
+        if e.keysym in ("Up", "Down", "Return", "Escape"):
+            return
+        self._refresh()
+
+    def _refresh(self) -> None:
+        text = self.var.get()
+        if text == self._hint:
+            text = ""
+        if text == self._query:
+            return
+        self._query = text
+        self._hits = self.search.query(text, C.SEARCH_MAX_RESULTS) if self.search is not None else []
+        if not self._hits:
+            self._hide()
+            return
+        labels = getattr(C, "SECTOR_LABELS", {})
+        self.listbox.delete(0, tk.END)
+        for h in self._hits:
+            where = " · ".join(x for x in (h.sector_id, labels.get(h.ring, "")) if x)
+            self.listbox.insert(tk.END, f"{h.site}  ({where})" if where else h.site)
+        self.listbox.configure(height=len(self._hits))
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(0)
+        self.listbox.place(in_=self.entry, relx=0.0, rely=1.0, y=2, relwidth=1.0, anchor="nw")
+        self.listbox.lift()
+
+    def _hide(self) -> None:
+        self.listbox.place_forget()
+
+    def _move(self, step: int) -> str:
+        if self._hits:
+            cur = self.listbox.curselection()
+            i = max(0, min(len(self._hits) - 1, (cur[0] if cur else -1) + step))
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(i)
+            self.listbox.see(i)
+        return "break"
+
+    def _pick(self) -> str:
+        cur = self.listbox.curselection()
+        if self._hits and cur:
+            hit = self._hits[cur[0]]
+            self._hide()
+            self.var.set(hit.site)
+            self._query = hit.site
+            self.entry.icursor(tk.END)
+            self.on_pick(hit)
+        return "break"
+
+    def _on_escape(self, _e: tk.Event) -> str:
+        # first Escape closes the list, the next one clears the box; never reaches the map
+        if self.listbox.winfo_ismapped():
+            self._hide()
+        else:
+            self.var.set("")
+            self._query = ""
+        return "break"
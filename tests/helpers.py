@@ -0,0 +1,161 @@
+from __future__ import annotations
+import json
+import math
+import random
+from pathlib import Path
+from typing import List, Sequence
+
+
+def star_ring(cx: float, cy: float, r: float, n: int, rng: random.Random, jitter: float = 0.3) -> List[list]:
+    """A closed, jagged, star-shaped ring around (cx, cy) as GeoJSON [lon, lat] pairs."""
+    pts = []
+    for k in range(n):
+        a = 2 * math.pi * k / n
+        rr = r * (1.0 + rng.uniform(-jitter, jitter))
+        pts.append([cx + rr * math.cos(a), cy + rr * math.sin(a)])
+    pts.append(list(pts[0]))
+    return pts
+
+def flat(ring: Sequence[Sequence[float]]) -> List[float]:
+    return [c for p in ring for c in p]
+
+def write_collection(path: Path, rings: Sequence[List[list]], points: Sequence[dict] = ()) -> Path:
+    """A FeatureCollection with one Polygon per ring, then one Point per entry of `points`."""
+    features = [{"type": "Feature", "properties": {"name": f"r{i}"},
+                 "geometry": {"type": "Polygon", "coordinates": [ring]}} for i, ring in enumerate(rings)]
+    for p in points:
+        features.append({"type": "Feature", "properties": dict(p["props"]),
+                         "geometry": {"type": "Point", "coordinates": [p["lon"], p["lat"]]}})
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}, indent=1), encoding="utf-8")
+    return path
+
+def seg_dist(px: float, py: float, ax: float, ay: float, bx: float, by: float) -> float:
+    dx, dy = bx - ax, by - ay
+    seg2 = dx * dx + dy * dy
+    t = 0.0 if seg2 == 0.0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / seg2))
+    return math.hypot(ax + t * dx - px, ay + t * dy - py)
+
+class FakeTk:
+    """
+    Enough of a Tk widget/canvas for the UI helpers, without a display.
+    after()/after_idle() callbacks only run from run_pending(), in due order
+    on a simulated clock (now_ms); canvas items are kept in `items`.
+    """
+
+    def __init__(self) -> None:
+        self.now_ms = 0.0
+        self._queue: dict = {}
+        self._seq = 0
+        self.items: dict = {}
+        self.configured: list = []  # (item, options) per itemconfig call
+        self.raised: list = []
+
+    # ---- event loop ----
+    def after(self, ms: int, fn) -> str:
+        self._seq += 1
+        after_id = f"after#{self._seq}"
+        self._queue[after_id] = (self.now_ms + ms, self._seq, fn)
+        return after_id
+
+    def after_idle(self, fn) -> str:
+        return self.after(0, fn)
+
+    def after_cancel(self, after_id: str) -> None:
+        self._queue.pop(after_id, None)
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def run_pending(self, limit: int = 10000) -> int:
+        """Run queued callbacks (and any they queue) until none are left; returns how many ran."""
+        ran = 0
+        while self._queue and ran < limit:
+            after_id = min(self._queue, key=lambda k: self._queue[k][:2])
+            due, _seq, fn = self._queue.pop(after_id)
+            self.now_ms = max(self.now_ms, due)
+            fn()
+            ran += 1
+        return ran
+
+    def clock(self) -> float:
+        """now_ms in seconds, to patch time.perf_counter with."""
+        return self.now_ms / 1000.0
+
+    # ---- canvas ----
+    def _create(self, kind: str, coords, options) -> int:
+        self._seq += 1
+        self.items[self._seq] = {"kind": kind, "coords": list(coords), "options": dict(options)}
+        return self._seq
+
+    def create_polygon(self, *coords, **options) -> int:
+        return self._create("polygon", coords, options)
+
+    def create_text(self, *coords, **options) -> int:
+        return self._create("text", coords, options)
+
+    def create_oval(self, *coords, **options) -> int:
+        return self._create("oval", coords, options)
+
+    def create_image(self, *coords, **options) -> int:
+        return self._create("image", coords, options)
+
+    def coords(self, item: int, *coords) -> None:
+        self.items[item]["coords"] = list(coords)
+
+    def itemconfig(self, item: int, **options) -> None:
+        self.items[item]["options"].update(options)
+        self.configured.append((item, options))
+
+    def delete(self, item: int) -> None:
+        self.items.pop(item, None)
+
+    def tag_raise(self, tag_or_item) -> None:
+        self.raised.append(tag_or_item)
+
+class FakeWidget(FakeTk):
+    """
+    A FakeTk that takes any other widget call (pack, bind, configure, ...) as a
+    no-op, so a whole Tk widget tree can be built on it. Children, options and
+    withdraw()/deiconify()/destroy() state are tracked.
+    """
+
+    def __init__(self, master=None, *_args, **options) -> None:
+        super().__init__()
+        self.master = master
+        self.options = dict(options)
+        self.children: list = []
+        self.withdrawn = False
+        self.destroyed = False
+        if isinstance(master, FakeWidget):
+            master.children.append(self)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *_a, **_k: None
+
+    def configure(self, **options) -> None:
+        self.options.update(options)
+
+    def winfo_children(self) -> list:
+        return list(self.children)
+
+    def winfo_exists(self) -> bool:
+        return not self.destroyed
+
+    def winfo_width(self) -> int:
+        return 0
+
+    winfo_height = winfo_x = winfo_y = winfo_width
+
+    def withdraw(self) -> None:
+        self.withdrawn = True
+
+    def deiconify(self) -> None:
+        self.withdrawn = False
+
+    def destroy(self) -> None:
+        self.destroyed = True
+        if isinstance(self.master, FakeWidget) and self in self.master.children:
+            self.master.children.remove(self)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import unittest
+from unittest import mock
+
+from app.ui.animation import EASINGS, Animator
+from tests.helpers import FakeTk
+
+
+class EasingTest(unittest.TestCase):
+    def test_endpoints_and_monotonic(self) -> None:
+        for name, ease in EASINGS.items():
+            with self.subTest(name):
+                self.assertAlmostEqual(ease(0.0), 0.0)
+                self.assertAlmostEqual(ease(1.0), 1.0)
+                values = [ease(i / 100) for i in range(101)]
+                self.assertEqual(values, sorted(values))
+
+
+class AnimatorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tk = FakeTk()
+        patcher = mock.patch("app.ui.animation.time.perf_counter", self.tk.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.animator = Animator(self.tk)  # type: ignore[arg-type]
+        self.frames = []
+        self.done = []
+
+    def _run(self, cost_ms: float, duration_ms: int = 300, frame_ms: int = 16) -> None:
+        def on_frame(progress: float, moving: bool) -> None:
+            self.frames.append((self.tk.now_ms, progress, moving))
+            self.tk.now_ms += cost_ms  # rendering takes this long
+
+        self.animator.start(on_frame, duration_ms, frame_ms, "linear", on_done=lambda: self.done.append(self.tk.now_ms))
+        self.tk.run_pending()
+
+    def test_cheap_frames(self) -> None:
+        self._run(cost_ms=2.0)
+        *moving, last = self.frames
+        self.assertEqual(last[1:], (1.0, False))
+        self.assertTrue(all(m for _t, _p, m in moving))
+        self.assertGreaterEqual(len(moving), 300 // 16 - 2)
+        progress = [p for _t, p, _m in self.frames]
+        self.assertEqual(progress, sorted(progress))
+        # one frame per ~frame_ms, and the whole thing lasts ~duration_ms
+        self.assertLessEqual(self.done[0], 300 + 16)
+        self.assertEqual(len(self.done), 1)
+        self.assertFalse(self.animator.running)
+
+    def test_slow_frames_are_dropped_not_stretched(self) -> None:
+        self._run(cost_ms=90.0)
+        # progress follows the clock: a few big steps, still done in ~duration_ms
+        self.assertLessEqual(len(self.frames), 4)
+        self.assertLessEqual(self.done[0], 300 + 90)
+        for t, p, moving in self.frames:
+            if moving:
+                self.assertAlmostEqual(p, t / 300.0)
+
+    def test_cancel_and_restart(self) -> None:
+        self.animator.start(lambda p, m: self.frames.append(p), 300, 16, "linear", on_done=lambda: self.done.append(1))
+        self.assertTrue(self.animator.running)
+        self.animator.cancel()
+        self.assertFalse(self.animator.running)
+        self.assertEqual(self.tk.pending, 0)
+        self.animator.start(lambda p, m: self.frames.append(p), 300, 16, "linear", on_done=lambda: self.done.append(2))
+        self.animator.start(lambda p, m: self.frames.append(p), 300, 16, "linear", on_done=lambda: self.done.append(3))
+        self.tk.run_pending()
+        self.assertEqual(self.done, [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
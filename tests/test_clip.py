@@ -0,0 +1,61 @@
+from __future__ import annotations
+import math
+import random
+import unittest
+
+from app.core.clip import clip_polygon
+
+
+def _area(pts) -> float:
+    n = len(pts) // 2
+    return abs(sum(pts[2 * i] * pts[2 * ((i + 1) % n) + 1] - pts[2 * ((i + 1) % n)] * pts[2 * i + 1]
+                   for i in range(n))) / 2.0
+
+
+def _bbox(pts) -> tuple:
+    xs, ys = pts[0::2], pts[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class SutherlandHodgmanTest(unittest.TestCase):
+    BOX = (0.0, 0.0, 10.0, 10.0)
+
+    def test_inside_is_unchanged(self) -> None:
+        tri = [1.0, 1.0, 9.0, 2.0, 5.0, 8.0]
+        self.assertEqual(clip_polygon(tri, *self.BOX), tri)
+
+    def test_outside_is_empty(self) -> None:
+        self.assertEqual(clip_polygon([11.0, 11.0, 20.0, 11.0, 15.0, 19.0], *self.BOX), [])
+        self.assertEqual(clip_polygon([], *self.BOX), [])
+
+    def test_overlapping_square(self) -> None:
+        out = clip_polygon([5.0, 5.0, 15.0, 5.0, 15.0, 15.0, 5.0, 15.0], *self.BOX)
+        self.assertEqual(_bbox(out), (5.0, 5.0, 10.0, 10.0))
+        self.assertAlmostEqual(_area(out), 25.0)
+
+    def test_box_inside_polygon(self) -> None:
+        out = clip_polygon([-5.0, -5.0, 15.0, -5.0, 15.0, 15.0, -5.0, 15.0], *self.BOX)
+        self.assertAlmostEqual(_area(out), 100.0)
+        self.assertEqual(_bbox(out), (0.0, 0.0, 10.0, 10.0))
+
+    def test_diamond_cuts_corners(self) -> None:
+        # diamond (area 98) reaching 2 units past each side: each tip cut off is a 4 x 2 triangle
+        out = clip_polygon([5.0, -2.0, 12.0, 5.0, 5.0, 12.0, -2.0, 5.0], *self.BOX)
+        self.assertEqual(len(out) // 2, 8)
+        self.assertAlmostEqual(_area(out), 98.0 - 4 * 4.0)
+
+    def test_random_convex_polygons_stay_in_the_box(self) -> None:
+        rng = random.Random(5)
+        for _ in range(200):
+            n = rng.randint(3, 9)
+            cx, cy, r = rng.uniform(-5, 15), rng.uniform(-5, 15), rng.uniform(0.5, 12)
+            angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(n))
+            poly = [c for a in angles for c in (cx + r * math.cos(a), cy + r * math.sin(a))]
+            out = clip_polygon(poly, *self.BOX)
+            for x, y in zip(out[0::2], out[1::2]):
+                self.assertTrue(-1e-9 <= x <= 10 + 1e-9 and -1e-9 <= y <= 10 + 1e-9)
+            self.assertLessEqual(_area(out), min(_area(poly), 100.0) + 1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
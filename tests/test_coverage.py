@@ -0,0 +1,55 @@
+from __future__ import annotations
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.core.coverage import AVAILABLE, CoverageGrid
+from app.core.models import Bounds
+from app.core.sites import SiteRegistry
+from app.core.spatial import haversine_km
+
+
+@unittest.skipUnless(AVAILABLE, "the coverage grid needs NumPy")
+class CoverageGridTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(17)
+        points = [(rng.uniform(36.0, 50.0), rng.uniform(18.0, 30.0), f"s{i}", "", {}, {}) for i in range(40)]
+        self.sites = SiteRegistry.from_points({0: points}).sites
+        self.grid = CoverageGrid.build(self.sites, Bounds(35.0, 51.0, 17.0, 31.0), 0.25)
+        self.rng = rng
+
+    def _cell_centre(self, lon: float, lat: float):
+        r, c = self.grid.cell_of(lon, lat)
+        b, step = self.grid.bounds, self.grid.cell_deg
+        return b.min_lon + (c + 0.5) * step, b.max_lat - (r + 0.5) * step
+
+    def test_at_matches_haversine(self) -> None:
+        for _ in range(500):
+            lon, lat = self.rng.uniform(35.0, 51.0), self.rng.uniform(17.0, 31.0)
+            site_id, km = self.grid.at(lon, lat)
+            clon, clat = self._cell_centre(lon, lat)
+            dists = [haversine_km(clon, clat, s.lon, s.lat) for s in self.sites]
+            best = min(dists)
+            # ties aside, the grid names the closest site to the cell centre
+            self.assertLessEqual(dists[site_id], best + 1e-3)
+            self.assertAlmostEqual(km, best, delta=max(1e-3, best * 1e-5))
+
+    def test_outside_the_grid(self) -> None:
+        self.assertIsNone(self.grid.at(34.9, 20.0))
+        self.assertIsNone(self.grid.at(40.0, 31.1))
+        self.assertIsNone(self.grid.at(60.0, 20.0))
+
+    def test_save_load(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "grid.npz"
+            self.grid.save(path)
+            loaded = CoverageGrid.load(path)
+        self.assertEqual(loaded.bounds, self.grid.bounds)
+        self.assertEqual(loaded.cell_deg, self.grid.cell_deg)
+        self.assertTrue((loaded.nearest == self.grid.nearest).all())
+        self.assertTrue((loaded.dist_km == self.grid.dist_km).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
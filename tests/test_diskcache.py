@@ -0,0 +1,43 @@
+from __future__ import annotations
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.core import diskcache
+from app.core.diskcache import PngDiskCache
+
+
+@unittest.skipUnless(diskcache._PIL_AVAILABLE, "the PNG cache needs Pillow")
+class PngDiskCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        from PIL import Image
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name) / "cache"
+        self.img = Image.new("RGB", (32, 16), (10, 200, 30))
+
+    def test_round_trip_by_name(self) -> None:
+        cache = PngDiskCache(1 << 20, self.dir)
+        self.assertIsNone(cache.get("a/b"))
+        cache.put("a/b", self.img)
+        self.assertEqual(cache.path("a/b"), self.dir / "a" / "b.png")
+        self.assertEqual(sorted(p.name for p in self.dir.rglob("*")), ["a", "b.png"])  # no temp file left
+        got = cache.get("a/b")
+        self.assertEqual((got.size, got.getpixel((0, 0))), ((32, 16), (10, 200, 30)))
+
+    def test_budget_counts_files_from_an_earlier_process(self) -> None:
+        PngDiskCache(1 << 20, self.dir).put("old/x", self.img)
+        size = (self.dir / "old" / "x.png").stat().st_size
+        os.utime(self.dir / "old" / "x.png", ns=(10**18, 10**18))
+        (self.dir / "notes.txt").write_text("not a cached image")
+        cache = PngDiskCache(size + size // 2, self.dir)
+        cache.put("new", self.img)
+        self.assertIsNone(cache.get("old/x"))
+        self.assertFalse((self.dir / "old").exists())
+        self.assertIsNotNone(cache.get("new"))
+        self.assertTrue((self.dir / "notes.txt").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.core import drawings
+from app.core.drawings import DrawingsIndex
+
+
+def _touch(root: Path, rel: str) -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x")
+
+
+class DrawingsLookupTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name) / "CNS drawings"
+        for rel in ("Riyadh/Riyadh room layout.pdf", "Riyadh/Riyadh rack front.pdf", "Riyadh/freq/Riyadh 121.5.png",
+                    "Jeddah/Jeddah shelter layout.pdf", "freq/Jeddah 128.png", "videos/east/Riyadh.mp4", "notes.txt"):
+            _touch(self.root, rel)
+        patcher = mock.patch.object(drawings, "cache_path", lambda *parts: Path(tmp.name).joinpath("cache", *parts))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _path(self, rel: str) -> str:
+        return os.path.join(self.root, rel)
+
+    def test_lookups(self) -> None:
+        index = DrawingsIndex.load(self.root)
+        self.assertEqual(index.site_drawing("Riyadh"), self._path("Riyadh/Riyadh room layout.pdf"))
+        self.assertEqual(index.equipment_drawing("Riyadh"), self._path("Riyadh/Riyadh rack front.pdf"))
+        self.assertEqual(index.site_drawing("Al Jeddah"), self._path("Jeddah/Jeddah shelter layout.pdf"))
+        self.assertIsNone(index.site_drawing("Tabuk"))
+        self.assertEqual(index.frequency_images("Riyadh"), [self._path("Riyadh/freq/Riyadh 121.5.png")])
+        # no image names the site: the best of freq/ instead
+        self.assertEqual(index.frequency_images("Tabuk"), [self._path("freq/Jeddah 128.png")])
+        self.assertEqual(index.rack_video("Riyadh"), self._path("videos/east/Riyadh.mp4"))
+        self.assertIsNone(index.rack_video("riyadh"))
+
+    def test_queries(self) -> None:
+        index = DrawingsIndex.load(self.root)
+        self.assertEqual(len(index.files()), 6)
+        pdfs = index.files("pdf")
+        self.assertEqual(sorted(f.name for f in pdfs),
+                         ["Jeddah shelter layout.pdf", "Riyadh rack front.pdf", "Riyadh room layout.pdf"])
+        # walk order: directory by directory
+        dirs = index.directories()
+        self.assertEqual([dirs.index(f.rel_dir) for f in pdfs], sorted(dirs.index(f.rel_dir) for f in pdfs))
+        self.assertEqual(sorted(f.name for f in index.containing("layout")),
+                         ["Jeddah shelter layout.pdf", "Riyadh room layout.pdf"])
+        self.assertEqual([f.name for f in index.containing("121 5", "image")], ["Riyadh 121.5.png"])
+        self.assertEqual(index.containing("nothing like it"), [])
+
+    def test_reload_lists_only_changed_directories(self) -> None:
+        DrawingsIndex.load(self.root)
+        with mock.patch.object(DrawingsIndex, "_scan_dir", side_effect=AssertionError("listed again")):
+            index = DrawingsIndex.load(self.root)
+        self.assertEqual(index.site_drawing("Riyadh"), self._path("Riyadh/Riyadh room layout.pdf"))
+        _touch(self.root, "Jeddah/Jeddah rack front.pdf")
+        st = (self.root / "Jeddah").stat()
+        os.utime(self.root / "Jeddah", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        index = DrawingsIndex.load(self.root)
+        self.assertEqual(index.equipment_drawing("Jeddah"), self._path("Jeddah/Jeddah rack front.pdf"))
+
+
+class DrawingsIndexDeltaTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name) / "CNS drawings"
+        for rel in ("Riyadh/site layout.pdf", "Riyadh/freq/Riyadh 121.5.png", "Riyadh/notes.txt",
+                    "Jeddah/Jeddah rack front.pdf", "videos/Riyadh.mp4"):
+            self._touch(rel)
+        self.index = DrawingsIndex(self.root)
+        self.index.refresh()
+
+    def _touch(self, rel: str) -> None:
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+
+    def _assert_same_as_fresh_scan(self) -> None:
+        fresh = DrawingsIndex(self.root)
+        fresh.refresh()
+        self.assertEqual(sorted(self.index.directories()), sorted(fresh.directories()))
+        for kind in (None, "pdf", "image", "video"):
+            self.assertEqual(sorted(f.path for f in self.index.files(kind)),
+                             sorted(f.path for f in fresh.files(kind)), kind)
+        for needle in ("riyadh", "rack", "121 5", "jeddah"):
+            self.assertEqual(sorted(f.path for f in self.index.containing(needle)),
+                             sorted(f.path for f in fresh.containing(needle)), needle)
+
+    def test_add_files(self) -> None:
+        self._touch("Jeddah/Jeddah room layout.pdf")
+        self._touch("Jeddah/readme.txt")  # not a drawing: ignored
+        self.index.add_entry("Jeddah", "Jeddah room layout.pdf", False)
+        self.index.add_entry("Jeddah", "readme.txt", False)
+        self.index.add_entry("Jeddah", "Jeddah room layout.pdf", False)  # reported twice
+        self._assert_same_as_fresh_scan()
+
+    def test_add_directory(self) -> None:
+        self._touch("Dammam/freq/Dammam 128.1.jpg")
+        self._touch("Dammam/Dammam rack room.pdf")
+        added = self.index.add_entry("", "Dammam", True)
+        self.assertEqual(sorted(added), sorted(["Dammam", os.path.join("Dammam", "freq")]))
+        self._assert_same_as_fresh_scan()
+
+    def test_remove_file(self) -> None:
+        (self.root / "Riyadh" / "site layout.pdf").unlink()
+        self.index.remove_entry("Riyadh", "site layout.pdf", False)
+        self.index.remove_entry("Riyadh", "never there.pdf", False)
+        self._assert_same_as_fresh_scan()
+
+    def test_remove_directory(self) -> None:
+        shutil.rmtree(self.root / "Riyadh")
+        removed = self.index.remove_entry("", "Riyadh", True)
+        self.assertEqual(sorted(removed), sorted(["Riyadh", os.path.join("Riyadh", "freq")]))
+        self._assert_same_as_fresh_scan()
+
+    def test_rename(self) -> None:
+        (self.root / "videos" / "Riyadh.mp4").rename(self.root / "videos" / "Jeddah.mp4")
+        self.index.remove_entry("videos", "Riyadh.mp4", False)
+        self.index.add_entry("videos", "Jeddah.mp4", False)
+        self._assert_same_as_fresh_scan()
+        self.assertIsNone(self.index.rack_video("Riyadh"))
+        self.assertEqual(self.index.rack_video("Jeddah"), os.path.join(self.root, "videos", "Jeddah.mp4"))
+
+
+if __name__ == "__main__":
+    unittest.main()
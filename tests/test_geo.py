@@ -0,0 +1,115 @@
+from __future__ import annotations
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.core import geo
+from app.core.geo import iter_features
+from app.core.models import GeometryBuilder
+from app.core.paths import config_path
+from tests.helpers import star_ring, write_collection
+
+
+class StreamingParserTest(unittest.TestCase):
+    def assert_matches_json_load(self, path: Path) -> None:
+        want = json.loads(path.read_text(encoding="utf-8"))["features"]
+        # tiny chunks put every token boundary across a refill
+        for chunk_size in (1, 7, 1 << 16):
+            self.assertEqual(list(iter_features(path, chunk_size)), want, f"chunk_size={chunk_size}")
+
+    def test_config_files(self) -> None:
+        checked = 0
+        for p in sorted(config_path().glob("*.json")):
+            doc = json.loads(p.read_text(encoding="utf-8"))
+            if isinstance(doc, dict) and "features" in doc:
+                with self.subTest(p.name):
+                    self.assertEqual(list(iter_features(p)), doc["features"])
+                checked += 1
+        if not checked:
+            self.skipTest("no FeatureCollections under config/")
+
+    def test_awkward_json(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "odd.json"
+            doc = {
+                "name": "features [not] {these}",
+                "crs": {"features": "decoy"},
+                "type": "FeatureCollection",
+                "features": [
+                    {"type": "Feature", "properties": {"site": "A \"quoted\" \\ name ]}", "n": None,
+                                                       "ok": True, "e": -1.5e-3, "u": "برج"},
+                     "geometry": {"type": "Point", "coordinates": [46.5, 24.75]}},
+                    {"type": "Feature", "properties": {}, "geometry": None},
+                ],
+                "trailer": [1, 2, {"x": "]"}],
+            }
+            path.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
+            self.assert_matches_json_load(path)
+            path.write_text(json.dumps(doc, separators=(",", ":")), encoding="utf-8")
+            self.assert_matches_json_load(path)
+
+    def test_generated_collection(self) -> None:
+        rng = random.Random(3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_collection(Path(tmp) / "gen.json",
+                                    [star_ring(rng.uniform(35, 55), rng.uniform(17, 32), 0.4, 40, rng) for _ in range(6)])
+            self.assert_matches_json_load(path)
+
+    def test_no_features(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "empty.json"
+            path.write_text('{"type": "FeatureCollection", "features": []}', encoding="utf-8")
+            self.assertEqual(list(iter_features(path)), [])
+            path.write_text('{"type": "FeatureCollection"}', encoding="utf-8")
+            self.assertEqual(list(iter_features(path)), [])
+
+
+@unittest.skipUnless(geo._NP_AVAILABLE, "needs NumPy")
+class NumpyFastPathTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(4)
+        b = GeometryBuilder()
+        for _ in range(8):
+            cx, cy = rng.uniform(35, 55), rng.uniform(17, 32)
+            shell = star_ring(cx, cy, 1.0, rng.randint(5, 60), rng)
+            hole = star_ring(cx, cy, 0.2, 6, rng, jitter=0.0)[::-1]
+            b.add_polygons([[shell, hole]] if rng.random() < 0.5 else [[shell]])
+        b.add_polygons([[[[40.0, 20.0], [41.0, 20.0], [40.5, 20.0], [40.0, 20.0]]]])  # zero area
+        self.store = b.build()
+
+    def _pure(self, fn, *args):
+        with mock.patch.object(geo, "_NP_AVAILABLE", False):
+            return fn(*args)
+
+    def test_store_math_matches_pure_python(self) -> None:
+        s = self.store
+        self.assertEqual(geo.compute_bounds(s), self._pure(geo.compute_bounds, s))
+        self.assertEqual(geo.ring_bounds_all(s), self._pure(geo.ring_bounds_all, s))
+        for got, want in zip(geo.ring_areas_all(s), self._pure(geo.ring_areas_all, s)):
+            self.assertAlmostEqual(got, want, places=9)
+        for got, want in zip(geo.ring_centroids_all(s), self._pure(geo.ring_centroids_all, s)):
+            self.assertAlmostEqual(got[0], want[0], places=7)
+            self.assertAlmostEqual(got[1], want[1], places=7)
+
+    def test_single_ring_math_matches_pure_python(self) -> None:
+        for r in range(len(self.store)):
+            ring = self.store[r]
+            self.assertEqual(geo.ring_bounds(ring), self._pure(geo.ring_bounds, ring))
+            self.assertAlmostEqual(geo.ring_area(ring), self._pure(geo.ring_area, ring), places=9)
+            got, want = geo.polygon_centroid(ring), self._pure(geo.polygon_centroid, ring)
+            self.assertAlmostEqual(got[0], want[0], places=7)
+            self.assertAlmostEqual(got[1], want[1], places=7)
+
+    def test_area_sign(self) -> None:
+        ccw = GeometryBuilder()
+        ccw.add_polygons([[[[0.0, 0.0], [2.0, 0.0], [2.0, 1.0], [0.0, 1.0], [0.0, 0.0]]]])
+        ring = ccw.build()[0]
+        self.assertAlmostEqual(geo.ring_area(ring), 2.0)
+        self.assertAlmostEqual(self._pure(geo.ring_area, list(ring)[::-1]), -2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
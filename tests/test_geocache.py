@@ -0,0 +1,98 @@
+from __future__ import annotations
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.core import config as C, geocache
+from app.core.geo import _parse_geojson, load_geo_from_json, load_layer
+from app.core.simplify import LodPyramid
+from tests.helpers import star_ring, write_collection
+
+
+@unittest.skipUnless(geocache._CACHE_SUPPORTED, "geocache needs a little-endian platform")
+class GeocacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        # keep cache files out of the project's cache/
+        patcher = mock.patch.object(geocache, "cache_path", lambda *parts: self.dir.joinpath("cache", *parts))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        rng = random.Random(1)
+        self.src = write_collection(
+            self.dir / "layer.json",
+            [star_ring(45.0 + i, 24.0, 0.5, 120, rng) for i in range(3)],
+            [{"lon": 46.1, "lat": 24.2, "props": {"site": "Riyadh", "sectorId": "C1",
+                                                   "freq": {"Riyadh Control": "Main 121.500 MHz"},
+                                                   "power": {"Main": "SEC"}}},
+             {"lon": 47.3, "lat": 23.9, "props": {"site": "Hofuf ✈", "sectorId": "E2"}}],
+        )
+
+    def test_round_trip(self) -> None:
+        store, points = _parse_geojson(self.src)
+        anchors = {0: (45.0, 24.0), 2: (47.1, 24.05)}
+        self.assertIsNotNone(geocache.write_cache(self.src, store, points, anchors))
+        cached = geocache.read_cache(self.src)
+        self.assertIsNotNone(cached)
+        c_store, c_points, c_anchors, c_lod = cached
+        self.assertEqual(list(c_store.coords), list(store.coords))
+        self.assertEqual(list(c_store.ring_offsets), list(store.ring_offsets))
+        self.assertEqual(list(c_store.polygon_offsets), list(store.polygon_offsets))
+        self.assertEqual(list(c_store.geom_offsets), list(store.geom_offsets))
+        self.assertEqual(c_points, points)
+        self.assertEqual(c_anchors, anchors)
+        self.assertIsNone(c_lod)
+
+    def test_lod_levels_round_trip(self) -> None:
+        store, points = _parse_geojson(self.src)
+        lod = LodPyramid(store, C.LOD_TOLERANCES, C.LOD_MAX_ERROR_PX)
+        geocache.write_cache(self.src, store, points, {}, (lod.tolerances, lod.levels[1:]))
+        tolerances, levels = geocache.read_cache(self.src)[3]
+        self.assertEqual(tolerances, lod.tolerances)
+        self.assertEqual([t for t, _s in levels], [t for t, _s in lod.levels[1:]])
+        for (_t, got), (_u, want) in zip(levels, lod.levels[1:]):
+            self.assertEqual(list(got.coords), list(want.coords))
+            self.assertEqual(list(got.ring_offsets), list(want.ring_offsets))
+            self.assertEqual(got.n_geoms, want.n_geoms)
+
+    def test_load_layer_reuses_cached_levels(self) -> None:
+        first = load_layer(self.src)
+        with mock.patch("app.core.geo._build_lod", side_effect=AssertionError("LOD rebuilt")):
+            second = load_layer(self.src)
+        self.assertEqual([t for t, _s in second.lod.levels], [t for t, _s in first.lod.levels])
+        self.assertEqual(list(second.lod.levels[-1][1].coords), list(first.lod.levels[-1][1].coords))
+
+    def test_source_change_invalidates(self) -> None:
+        store, points = load_geo_from_json(self.src)
+        self.assertIsNotNone(geocache.read_cache(self.src))
+        # same size, new mtime
+        st = self.src.stat()
+        os.utime(self.src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIsNone(geocache.read_cache(self.src))
+        # new contents: the next load recompiles them
+        write_collection(self.src, [star_ring(40.0, 20.0, 1.0, 8, random.Random(2))])
+        self.assertIsNone(geocache.read_cache(self.src))
+        store, points = load_geo_from_json(self.src)
+        self.assertEqual(store.n_geoms, 1)
+        self.assertEqual(points, [])
+        self.assertEqual(geocache.read_cache(self.src)[0].n_geoms, 1)
+
+    def test_rejects_other_versions_and_truncated_files(self) -> None:
+        load_geo_from_json(self.src)
+        dst = geocache.cache_file_for(self.src)
+        data = bytearray(dst.read_bytes())
+        dst.write_bytes(data[:-5])
+        self.assertIsNone(geocache.read_cache(self.src))
+        data[8] = (geocache.VERSION + 1) & 0xFF
+        dst.write_bytes(bytes(data))
+        self.assertIsNone(geocache.read_cache(self.src))
+        dst.write_bytes(b"")
+        self.assertIsNone(geocache.read_cache(self.src))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from unittest import mock
+
+from app.core import config as C, geocache, headless
+from app.core.headless import ViewSpec, export_view, export_views
+from app.core.models import Bounds
+from tests.helpers import write_collection
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _square(lon: float, lat: float, size: float):
+    return [[lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]
+
+
+class HeadlessExportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        patcher = mock.patch.object(geocache, "cache_path", lambda *parts: self.dir.joinpath("cache", *parts))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.src = write_collection(
+            self.dir / "layer.json",
+            [_square(44.0, 22.0, 2.0), _square(48.0, 26.0, 2.0)],
+            [{"lon": 45.0, "lat": 23.0, "props": {"site": "Riyadh & Co", "sectorId": "C1"}},
+             {"lon": 49.0, "lat": 27.0, "props": {"site": "Dammam", "sectorId": "E1"}}],
+        )
+        self.out = self.dir / "out"
+
+    def _svg(self, spec: ViewSpec) -> ET.Element:
+        (path,) = export_view(spec, self.out, formats=("svg",), width=400, height=300)
+        self.assertEqual(path, self.out / f"{spec.name}.svg")
+        return ET.parse(path).getroot()
+
+    def test_main_view_svg(self) -> None:
+        root = self._svg(ViewSpec("main", self.src))
+        self.assertEqual((root.get("width"), root.get("height")), ("400", "300"))
+        polys = root.findall(f"{SVG}polygon")
+        self.assertEqual([p.get("fill") for p in polys], list(C.SECTOR_COLORS[:2]))
+        # main view: sector labels, no sites
+        labels = [t.text for t in root.findall(f"{SVG}text")]
+        self.assertEqual(labels, [C.SECTOR_LABELS[i] for i in (0, 1)])
+        self.assertEqual(root.findall(f"{SVG}circle"), [])
+
+    def test_detail_view_svg(self) -> None:
+        root = self._svg(ViewSpec("detail", self.src, sector=1))
+        self.assertEqual({p.get("fill") for p in root.findall(f"{SVG}polygon")}, {C.SECTOR_COLORS[1]})
+        self.assertEqual(len(root.findall(f"{SVG}circle")), 2)
+        self.assertEqual([t.text for t in root.findall(f"{SVG}text")], ["Riyadh & Co", "Dammam"])
+
+    def test_bounds_cull_geometry(self) -> None:
+        root = self._svg(ViewSpec("zoomed", self.src, bounds=Bounds(44.5, 45.5, 22.5, 23.5)))
+        self.assertEqual(len(root.findall(f"{SVG}polygon")), 1)
+
+    @unittest.skipUnless(headless.PNG_AVAILABLE, "PNG export needs Pillow")
+    def test_png(self) -> None:
+        from PIL import Image
+        written = export_views([ViewSpec("main", self.src), ViewSpec("detail", self.src, sector=0)],
+                               self.out, formats=("png",), width=320, height=240, workers=1)
+        self.assertEqual(sorted(written), ["detail", "main"])
+        with Image.open(written["main"][0]) as img:
+            self.assertEqual(img.size, (320, 240))
+        self.assertEqual(sorted(p.name for p in self.out.iterdir()), ["detail.png", "main.png"])
+
+    def test_unknown_format(self) -> None:
+        with self.assertRaises(ValueError):
+            export_view(ViewSpec("main", self.src), self.out, formats=("gif",))
+
+
+if __name__ == "__main__":
+    unittest.main()
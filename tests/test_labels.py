@@ -0,0 +1,58 @@
+from __future__ import annotations
+import math
+import unittest
+from unittest import mock
+
+from app.core import config as C
+from app.core.geo import point_in_ring
+from app.core.labels import polylabel, sector_labels
+
+
+def _closed(pts):
+    return [c for p in pts + pts[:1] for c in p]
+
+
+class PolylabelTest(unittest.TestCase):
+    # concave shapes whose bbox centre (and centroid) fall outside them
+    C_SHAPE = _closed([(0, 0), (10, 0), (10, 2), (2, 2), (2, 8), (10, 8), (10, 10), (0, 10)])
+    L_SHAPE = _closed([(0, 0), (10, 0), (10, 1), (1, 1), (1, 10), (0, 10)])
+    HORSESHOE = _closed([(0, 0), (3, 0), (3, 7), (7, 7), (7, 0), (10, 0), (10, 10), (0, 10)])
+
+    def test_inside_concave_rings(self) -> None:
+        for name, ring in (("C", self.C_SHAPE), ("L", self.L_SHAPE), ("U", self.HORSESHOE)):
+            with self.subTest(name):
+                (x, y), d = polylabel([ring], 0.01)
+                self.assertTrue(point_in_ring(ring, x, y))
+                self.assertGreater(d, 0.0)
+
+    def test_distance_close_to_optimum(self) -> None:
+        # best spot is in an outer corner of the C, equally far from both outer
+        # edges and the inner corner (2, 2): d = sqrt(2) * (2 - d)
+        (_x, _y), d = polylabel([self.C_SHAPE], 0.001)
+        self.assertAlmostEqual(d, 2 * math.sqrt(2) / (1 + math.sqrt(2)), delta=0.002)
+
+    def test_avoids_holes(self) -> None:
+        shell = _closed([(0, 0), (10, 0), (10, 10), (0, 10)])
+        hole = _closed([(3, 3), (7, 3), (7, 7), (3, 7)])
+        (x, y), d = polylabel([shell, hole], 0.01)
+        self.assertTrue(point_in_ring(shell, x, y))
+        self.assertFalse(point_in_ring(hole, x, y))
+        # a corner again, against the hole's corner (3, 3): d = sqrt(2) * (3 - d)
+        self.assertAlmostEqual(d, 3 * math.sqrt(2) / (1 + math.sqrt(2)), delta=0.02)
+
+
+class SectorLabelsTest(unittest.TestCase):
+    def test_override_then_anchor(self) -> None:
+        anchors = {0: (45.0, 24.0), 1: (50.0, 20.0), 3: (40.0, 18.0)}
+        with mock.patch.object(C, "SECTOR_LABELS", {0: "East", 1: "Central", 2: "North", 3: ""}), \
+                mock.patch.object(C, "SECTOR_LABEL_POS", {1: (41, 29), 2: (40.0, 30.0)}):
+            self.assertEqual(sector_labels(4, anchors), [
+                (0, (45.0, 24.0), "East"),
+                (1, (41.0, 29.0), "Central"),   # the configured position wins
+                (2, (40.0, 30.0), "North"),     # no anchor needed with one
+            ])                                  # 3: no text, no label
+            self.assertEqual(sector_labels(1, {}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.core.layercache import LayerCache
+from app.core.models import GeometryStore, Layer
+
+
+def _layer(path: Path, n: int = 200) -> Layer:
+    path.write_text("{}", encoding="utf-8")
+    ring = [(float(i), float(i % 7)) for i in range(n)]
+    return Layer(path=path, rings=GeometryStore.from_rings([ring]), mtime_ns=path.stat().st_mtime_ns)
+
+
+class LayerCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.a, self.b, self.c = (_layer(self.dir / f"{name}.json") for name in "abc")
+        self.size = self.a.nbytes
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = LayerCache(max_bytes=int(self.size * 2.5))
+        cache.put(self.a)
+        cache.put(self.b)
+        self.assertIs(cache.get(self.a.path), self.a)  # a is now the most recent
+        cache.put(self.c)
+        self.assertIn(self.a.path, cache)
+        self.assertNotIn(self.b.path, cache)
+        self.assertIn(self.c.path, cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.nbytes, self.a.nbytes + self.c.nbytes)
+
+    def test_replacing_an_entry_keeps_the_byte_count(self) -> None:
+        cache = LayerCache(max_bytes=self.size * 10)
+        cache.put(self.a)
+        again = _layer(self.a.path)
+        cache.put(again)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, again.nbytes)
+        self.assertIs(cache.get(self.a.path), again)
+
+    def test_oversized_layer_is_not_kept(self) -> None:
+        cache = LayerCache(max_bytes=self.size * 2)
+        cache.put(self.a)
+        big = _layer(self.dir / "big.json", n=5000)
+        cache.put(big)
+        self.assertNotIn(big.path, cache)
+        self.assertIs(cache.get(self.a.path), self.a)
+
+    def test_modified_source_invalidates(self) -> None:
+        cache = LayerCache(max_bytes=self.size * 10)
+        cache.put(self.a)
+        st = self.a.path.stat()
+        os.utime(self.a.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIsNone(cache.get(self.a.path))
+        self.assertEqual((len(cache), cache.nbytes), (0, 0))
+        cache.put(self.b)
+        self.b.path.unlink()
+        self.assertIsNone(cache.get(self.b.path))
+
+    def test_invalidate_and_clear(self) -> None:
+        cache = LayerCache(max_bytes=self.size * 10)
+        for layer in (self.a, self.b, self.c):
+            cache.put(layer)
+        cache.invalidate(self.b.path)
+        self.assertNotIn(self.b.path, cache)
+        self.assertEqual(cache.nbytes, self.a.nbytes + self.c.nbytes)
+        cache.clear()
+        self.assertEqual((len(cache), cache.nbytes), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+import unittest
+
+from app.core.models import GeometryBuilder, GeometryStore, RingView
+
+
+class GeometryStoreTest(unittest.TestCase):
+    SQUARE = [[0.0, 0.0], [4.0, 0.0], [4.0, 4.0], [0.0, 4.0], [0.0, 0.0]]
+    HOLE = [[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 1.0]]
+    TRI = [[10.0, 0.0], [12.0, 0.0], [11.0, 3.0], [10.0, 0.0]]
+
+    def setUp(self) -> None:
+        b = GeometryBuilder()
+        b.add_polygons([[self.SQUARE, self.HOLE], [self.TRI]])  # feature 0: MultiPolygon, first part holed
+        b.add_polygons([[self.TRI]])                            # feature 1
+        self.store = b.build()
+
+    def test_offsets(self) -> None:
+        s = self.store
+        self.assertEqual((len(s), s.n_polygons, s.n_geoms), (4, 3, 2))
+        self.assertEqual(s.n_vertices, 5 + 4 + 4 + 4)
+        self.assertEqual(list(s.ring_offsets), [0, 5, 9, 13, 17])
+        self.assertEqual(list(s.polygon_offsets), [0, 2, 3, 4])
+        self.assertEqual(list(s.geom_offsets), [0, 2, 3])
+
+    def test_ring_lookups(self) -> None:
+        s = self.store
+        self.assertEqual([s.is_hole(r) for r in range(4)], [False, True, False, False])
+        self.assertEqual([s.geom_of_ring(r) for r in range(4)], [0, 0, 0, 1])
+        self.assertEqual(list(s.geom_rings(0)), [0, 1, 2])
+        self.assertEqual(list(s.geom_rings(1)), [3])
+        self.assertEqual(s.geom_shells(0), [0, 2])
+
+    def test_ring_views(self) -> None:
+        s = self.store
+        self.assertEqual(s[1], [tuple(p) for p in self.HOLE])
+        self.assertEqual(s[-1][2], (11.0, 3.0))
+        self.assertEqual(s[0][-1], (0.0, 0.0))
+        self.assertEqual(s.ring_coords(2).tolist(), [c for p in self.TRI for c in p])
+        self.assertEqual([list(r) for r in s[2:]], [[tuple(p) for p in self.TRI]] * 2)
+        with self.assertRaises(IndexError):
+            s[1][4]
+        self.assertIsInstance(s[0], RingView)
+
+    def test_from_rings(self) -> None:
+        s = GeometryStore.from_rings([[tuple(p) for p in self.SQUARE], [tuple(p) for p in self.TRI]])
+        self.assertEqual((len(s), s.n_polygons, s.n_geoms), (2, 2, 2))
+        self.assertFalse(s.is_hole(1))
+        self.assertEqual(list(s), [[tuple(p) for p in self.SQUARE], [tuple(p) for p in self.TRI]])
+
+
+if __name__ == "__main__":
+    unittest.main()
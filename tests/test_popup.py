@@ -0,0 +1,103 @@
+from __future__ import annotations
+import threading
+import types
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+from app.ui import popup
+from app.ui.popup import SectionPopup
+from tests.helpers import FakeWidget
+
+_FAKE_TK = types.SimpleNamespace(
+    Toplevel=FakeWidget, Frame=FakeWidget, Label=FakeWidget, Canvas=FakeWidget,
+    Scrollbar=FakeWidget, PhotoImage=FakeWidget,
+    RAISED="raised", SUNKEN="sunken", FLAT="flat", SOLID="solid",
+)
+
+def _files(tag: str) -> dict:
+    return {"site_drawing": f"{tag}.pdf", "equipment_drawing": None,
+            "frequency_images": [], "rack_video": None}
+
+
+class LookupPoolTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        popup.shutdown_lookups()
+
+    def test_one_pool_across_threads(self) -> None:
+        pools = []
+        threads = [threading.Thread(target=lambda: pools.append(popup._lookups())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len({id(p) for p in pools}), 1)
+        self.assertEqual(pools[0].submit(lambda: 42).result(timeout=10), 42)
+
+    def test_shutdown_and_restart(self) -> None:
+        popup.shutdown_lookups()  # nothing started yet: a no-op
+        first = popup._lookups()
+        popup.shutdown_lookups()
+        with self.assertRaises(RuntimeError):
+            first.submit(lambda: None)
+        second = popup._lookups()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.submit(lambda: 1).result(timeout=10), 1)
+
+
+class SharedPopupTest(unittest.TestCase):
+    """The pooled popup on a fake widget tree; lookups resolve when the test says so."""
+
+    def setUp(self) -> None:
+        self.lookups: list = []  # (site id, future) per show()
+        def submit(_fn, site_id):
+            fut: Future = Future()
+            self.lookups.append((site_id, fut))
+            return fut
+        for patcher in (mock.patch.object(popup, "tk", _FAKE_TK),
+                        mock.patch.object(popup, "_lookups", lambda: types.SimpleNamespace(submit=submit)),
+                        mock.patch.dict(SectionPopup._pool, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.root = FakeWidget()
+
+    def _show(self, pop: SectionPopup, site: str) -> Future:
+        pop.show(site, {"site": site})
+        self.assertEqual(self.lookups[-1][0], site)
+        return self.lookups[-1][1]
+
+    def test_one_popup_per_parent(self) -> None:
+        pop = SectionPopup.shared(self.root)
+        self.assertIs(SectionPopup.shared(self.root), pop)
+        self.assertIsNot(SectionPopup.shared(FakeWidget()), pop)
+        pop.popup.destroy()  # e.g. the parent went away: built again
+        self.assertIsNot(SectionPopup.shared(self.root), pop)
+
+    def test_stale_lookup_is_dropped(self) -> None:
+        pop = SectionPopup.shared(self.root)
+        first = self._show(pop, "A")
+        second = self._show(pop, "B")
+        first.set_result(_files("A"))
+        pop.popup.run_pending()
+        self.assertEqual(pop._files, {})  # A's files never reach B's popup
+        second.set_result(_files("B"))
+        pop.popup.run_pending()
+        self.assertEqual(pop._files, _files("B"))
+
+    def test_close_withdraws_and_is_reused(self) -> None:
+        pop = SectionPopup.shared(self.root)
+        fut = self._show(pop, "A")
+        self.assertFalse(pop.popup.withdrawn)
+        pop.close()
+        self.assertTrue(pop.popup.withdrawn)
+        self.assertFalse(pop.popup.destroyed)
+        fut.set_result(_files("A"))
+        pop.popup.run_pending()
+        self.assertEqual(pop._files, {})  # landed after close: dropped
+        self.assertIs(SectionPopup.shared(self.root), pop)
+        self._show(pop, "B")
+        self.assertFalse(pop.popup.withdrawn)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import random
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.core import geocache
+from app.core.geo import load_layer
+from app.core.layercache import LayerCache
+from app.core.prefetch import LayerPrefetcher
+from tests.helpers import star_ring, write_collection
+
+
+class LayerPrefetcherTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        patcher = mock.patch.object(geocache, "cache_path", lambda *parts: self.dir.joinpath("cache", *parts))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        rng = random.Random(9)
+        self.paths = [write_collection(self.dir / f"layer{i}.json", [star_ring(40.0 + i, 22.0, 0.5, 30, rng)])
+                      for i in range(3)]
+        self.prefetcher = LayerPrefetcher(max_workers=2, cache=LayerCache(max_bytes=1 << 30))
+        self.addCleanup(self.prefetcher.shutdown)
+
+    def test_loads_on_workers(self) -> None:
+        threads = []
+
+        def load(path):
+            threads.append(threading.current_thread())
+            return load_layer(path)
+
+        with mock.patch("app.core.prefetch.load_layer", side_effect=load):
+            futures = [self.prefetcher.submit(p) for p in self.paths]
+            layers = [f.result(timeout=10) for f in futures]
+        self.assertEqual([layer.path for layer in layers], self.paths)
+        self.assertEqual(layers[1].rings.n_geoms, 1)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_in_flight_requests_share_a_future(self) -> None:
+        release = threading.Event()
+        calls = []
+
+        def slow(path):
+            calls.append(path)
+            release.wait(10)
+            return load_layer(path)
+
+        with mock.patch("app.core.prefetch.load_layer", side_effect=slow):
+            first = self.prefetcher.submit(self.paths[0])
+            second = self.prefetcher.submit(str(self.paths[0]))
+            self.assertIs(first, second)
+            release.set()
+            layer = first.result(timeout=10)
+        self.assertEqual(calls, [self.paths[0]])
+        # later requests are served from the cache, already resolved
+        with mock.patch("app.core.prefetch.load_layer", side_effect=AssertionError("loaded twice")):
+            again = self.prefetcher.submit(self.paths[0])
+            self.assertTrue(again.done())
+            self.assertIs(again.result(), layer)
+
+    def test_failure_is_reported(self) -> None:
+        with self.assertRaises(OSError):
+            self.prefetcher.submit(self.dir / "missing.json").result(timeout=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+import random
+import unittest
+from unittest import mock
+
+from app.core import projection
+from app.core.models import Bounds, GeometryStore
+from app.core.projection import ProjectedStore, ProjectionCache, Viewport, project_flat, project_points
+from tests.helpers import flat, star_ring
+
+
+class ProjectionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.vp = Viewport(Bounds(34.0, 56.0, 16.0, 33.0), 900, 700, 24)
+        rng = random.Random(21)
+        self.rings = [star_ring(rng.uniform(36, 54), rng.uniform(18, 31), 1.0, n, rng) for n in (5, 40, 300)]
+        self.store = GeometryStore.from_rings([[tuple(p) for p in r] for r in self.rings])
+
+    def test_corners_and_inverse(self) -> None:
+        vp = self.vp
+        self.assertEqual(vp.project(34.0, 33.0), (24.0, 24.0))
+        x, y = vp.project(56.0, 16.0)
+        self.assertAlmostEqual(x, 900 - 24)
+        self.assertAlmostEqual(y, 700 - 24)
+        lon, lat = vp.inv_project(*vp.project(45.5, 20.25))
+        self.assertAlmostEqual(lon, 45.5)
+        self.assertAlmostEqual(lat, 20.25)
+        # clamped to the padded area unless asked not to
+        self.assertEqual(vp.inv_project(0.0, 0.0), (34.0, 33.0))
+        lon, _lat = vp.inv_project(0.0, 0.0, clamp=False)
+        self.assertLess(lon, 34.0)
+
+    def _assert_flat(self, got, want) -> None:
+        self.assertEqual(len(got), len(want))
+        for a, b in zip(got, want):
+            self.assertAlmostEqual(a, b, places=9)
+
+    def test_batch_matches_single_points(self) -> None:
+        for ring in self.rings:
+            want = [c for lon, lat in ring for c in self.vp.project(lon, lat)]
+            self._assert_flat(project_flat(flat(ring), self.vp), want)
+            with mock.patch.object(projection, "_NP_AVAILABLE", False):
+                self._assert_flat(project_flat(flat(ring), self.vp), want)
+        points = [(46.0, 24.0, "a", "", {}, {}), (50.5, 26.5, "b", "", {}, {})]
+        got = project_points(points, self.vp)
+        self._assert_flat([c for xy in got for c in xy], [*self.vp.project(46.0, 24.0), *self.vp.project(50.5, 26.5)])
+        self.assertEqual(project_points([], self.vp), [])
+
+    def test_projected_store(self) -> None:
+        for use_np in {False, projection._NP_AVAILABLE}:
+            with mock.patch.object(projection, "_NP_AVAILABLE", use_np):
+                proj = ProjectedStore(self.store, self.vp)
+                for r, ring in enumerate(self.rings):
+                    self._assert_flat(proj.ring(r), project_flat(flat(ring), self.vp))
+                self.assertIs(proj.ring(1), proj.ring(1))
+
+    def test_cache_follows_the_view(self) -> None:
+        cache = ProjectionCache()
+        first = cache.get(self.store, self.vp)
+        self.assertIs(cache.get(self.store, Viewport(self.vp.bounds, 900, 700, 24)), first)
+        moved = cache.get(self.store, Viewport(Bounds(35.0, 57.0, 16.0, 33.0), 900, 700, 24))
+        self.assertIsNot(moved, first)
+        self.assertIsNot(cache.get(self.store, Viewport(Bounds(35.0, 57.0, 16.0, 33.0), 800, 700, 24)), moved)
+        cache.clear()
+        self.assertIsNot(cache.get(self.store, self.vp), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
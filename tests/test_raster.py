@@ -0,0 +1,122 @@
+from __future__ import annotations
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from app.core import geocache, raster
+from app.core.geo import load_layer
+from app.core.models import Bounds
+from app.core.projection import Viewport
+from app.core.diskcache import PngDiskCache
+from app.core.raster import TileCache, TilePyramid, TileStyle
+from tests.helpers import write_collection
+
+RED, GREEN, BLUE = (255, 0, 0), (0, 255, 0), (0, 0, 255)
+STYLE = TileStyle(("#ff0000", "#00ff00"), "#000000", 1, "#0000ff")
+
+
+def _square(lon: float, lat: float, size: float):
+    return [[lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]
+
+
+@unittest.skipUnless(raster.AVAILABLE, "basemap tiles need Pillow")
+class TilePyramidTest(unittest.TestCase):
+    TILE = 128
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.disk = PngDiskCache(1 << 30, self.dir / "cache" / "tiles")
+        for patcher in (mock.patch.object(geocache, "cache_path", lambda *parts: self.dir.joinpath("cache", *parts)),
+                        mock.patch.object(raster, "tile_disk_cache", lambda: self.disk)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        src = write_collection(self.dir / "layer.json", [_square(44.0, 22.0, 2.0), _square(48.0, 26.0, 2.0)])
+        self.layer = load_layer(src)
+        # 50 px/degree: drawn from level 6 (64 px/degree), 2 degrees per tile
+        self.vp = Viewport(Bounds(43.0, 51.0, 21.0, 29.0), 400, 400, 0)
+
+    def _pyramid(self, pool=None) -> TilePyramid:
+        return TilePyramid(self.layer, STYLE, self.TILE, TileCache(64), pool)
+
+    @staticmethod
+    def _tile_of(lon: float, lat: float, z: int = 6):
+        x, y = (lon + 180.0) * 2 ** z, (90.0 - lat) * 2 ** z
+        return int(x // 128), int(y // 128)
+
+    def _rgb(self, img, lon: float, lat: float):
+        return img.convert("RGB").getpixel(tuple(int(v) for v in self.vp.project(lon, lat)))
+
+    def test_tiles(self) -> None:
+        pyr = self._pyramid()
+        self.assertEqual(pyr.zoom_for(50.0), 6)
+        self.assertIsNone(pyr.tile(6, 6, *self._tile_of(0.0, 0.0)))
+        tile = pyr.tile(6, 6, *self._tile_of(45.0, 23.0))
+        self.assertEqual(tile.size, (self.TILE, self.TILE))
+        self.assertEqual(tile.getpixel((64, 64)), RED)
+        self.assertEqual(len(list(self.dir.joinpath("cache", "tiles").rglob("*.png"))), 1)
+
+    def test_tiles_are_read_back_from_disk(self) -> None:
+        self._pyramid().tile(6, 6, *self._tile_of(49.0, 27.0))
+        fresh = self._pyramid()  # new memory cache, same files
+        with mock.patch.object(TilePyramid, "_render", side_effect=AssertionError("rendered again")):
+            tile = fresh.tile(6, 6, *self._tile_of(49.0, 27.0))
+        self.assertEqual(tile.getpixel((64, 64)), GREEN)
+
+    def test_least_recently_used_tiles_are_deleted(self) -> None:
+        pyr = self._pyramid()
+        files = {}
+        for z in (6, 7, 8):
+            pyr.tile(z, z, *self._tile_of(45.0, 23.0, z))
+            (files[z],) = self.disk.dir.rglob(f"{z}_{z}/*.png")
+        # last used: level 7 longest ago, then 8, then 6
+        for age, z in enumerate((6, 8, 7)):
+            os.utime(files[z], ns=(10**18 - age * 10**9,) * 2)
+        # a store in a new process: the order comes from file mtimes
+        small = PngDiskCache(files[6].stat().st_size + files[8].stat().st_size, self.disk.dir)
+        name = files[8].relative_to(self.disk.dir).with_suffix("").as_posix()
+        small.put(name, self.disk.get(name))
+        self.assertEqual(sorted(self.disk.dir.rglob("*.png")), sorted([files[6], files[8]]))
+        self.assertFalse(files[7].parent.exists())
+
+    def test_render_view(self) -> None:
+        img, final = self._pyramid().render_view(self.vp)  # no pool: rendered right here
+        self.assertTrue(final)
+        self.assertEqual(img.size, (400, 400))
+        self.assertEqual(self._rgb(img, 45.0, 23.0), RED)
+        self.assertEqual(self._rgb(img, 49.0, 27.0), GREEN)
+        self.assertEqual(self._rgb(img, 47.0, 25.0), BLUE)
+
+    def test_views_never_render_on_the_caller(self) -> None:
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        threads = []
+        load_or_render = TilePyramid._load_or_render
+
+        def spy(pyr, *args):
+            threads.append(threading.current_thread())
+            return load_or_render(pyr, *args)
+
+        for fast in (True, False):
+            with self.subTest(fast=fast), mock.patch.object(TilePyramid, "_load_or_render", spy):
+                pyr = TilePyramid(self.layer, STYLE, self.TILE, TileCache(64), pool)
+                img, final = pyr.render_view(self.vp, fast)
+                self.assertEqual(img.size, (400, 400))
+                self.assertFalse(final)
+                pool.submit(lambda: None).result(timeout=10)  # the tile requests queued before it are done
+                self.assertFalse(pyr.pending)
+                img, final = pyr.render_view(self.vp, fast)
+                self.assertTrue(final)
+                self.assertEqual(self._rgb(img, 45.0, 23.0), RED)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertNotIn(threading.current_thread(), threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
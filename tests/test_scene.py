@@ -0,0 +1,83 @@
+from __future__ import annotations
+import unittest
+
+from app.ui.scene import Scene
+from tests.helpers import FakeTk
+
+
+class SceneTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.canvas = FakeTk()
+        self.scene = Scene(self.canvas)  # type: ignore[arg-type]
+        self.polys = self.scene.layer("polygon", "scene-ring", ordered=True)
+        self.labels = self.scene.layer("text", "scene-label")
+
+    def _frame(self, polys, labels=None):
+        self.scene.begin_frame()
+        for key, coords, opts in polys:
+            self.polys.put(key, coords, ("ring", key), **opts)
+        for key, text in (labels or {}).items():
+            self.labels.put(key, (0.0, 0.0), ("label", key), text=text)
+        return self.scene.end_frame()
+
+    def test_items_are_retained(self) -> None:
+        self.assertTrue(self._frame([(0, [0, 0, 1, 0, 1, 1], {"fill": "red"}),
+                                     (1, [5, 5, 6, 5, 6, 6], {"fill": "blue"})]))
+        items = dict(zip((0, 1), self.polys.items()))
+        self.assertFalse(self._frame([(0, [2, 2, 3, 2, 3, 3], {"fill": "red"}),
+                                      (1, [5, 5, 6, 5, 6, 6], {"fill": "green"})]))
+        self.assertEqual(dict(zip((0, 1), self.polys.items())), items)
+        self.assertEqual(self.canvas.items[items[0]]["coords"], [2, 2, 3, 2, 3, 3])
+        # only what changed is reconfigured
+        self.assertEqual(self.canvas.configured, [(items[1], {"fill": "green"})])
+        self.assertEqual(self.canvas.items[items[1]]["options"]["tags"], ("scene-ring",))
+
+    def test_features_map_back(self) -> None:
+        self._frame([(3, [0, 0, 1, 0, 1, 1], {})], {7: "North"})
+        (poly,), (label,) = self.polys.items(), self.labels.items()
+        self.assertEqual(self.scene.feature_at(poly), ("ring", 3))
+        self.assertEqual(self.scene.feature_at(label), ("label", 7))
+        self.assertIsNone(self.scene.feature_at(12345))
+
+    def test_vanished_keys_are_deleted(self) -> None:
+        self._frame([(0, [0, 0, 1, 0, 1, 1], {}), (1, [0, 0, 2, 0, 2, 2], {})], {0: "A"})
+        gone = self.polys.items()[1]
+        self._frame([(0, [0, 0, 1, 0, 1, 1], {})])
+        self.assertEqual(len(self.polys), 1)
+        self.assertEqual(len(self.labels), 0)
+        self.assertNotIn(gone, self.canvas.items)
+        self.assertIsNone(self.scene.feature_at(gone))
+
+    def test_new_items_restack(self) -> None:
+        self._frame([(1, [0, 0, 1, 0, 1, 1], {}), (0, [0, 0, 2, 0, 2, 2], {})], {0: "A"})
+        # ordered layer raised by key, then layers bottom to top
+        p1, p0 = self.polys.items()
+        self.assertEqual(self.canvas.raised, [p0, p1, "scene-ring", "scene-label"])
+        self.canvas.raised.clear()
+        self._frame([(1, [0, 0, 1, 0, 1, 1], {}), (0, [0, 0, 2, 0, 2, 2], {})], {0: "A"})
+        self.assertEqual(self.canvas.raised, [])
+
+    def test_end_returns_created_items(self) -> None:
+        self.polys.begin()
+        first = self.polys.put(0, [0, 0, 1, 0, 1, 1])
+        self.assertEqual(self.polys.end(), [first])
+        self.polys.begin()
+        self.polys.put(0, [0, 0, 2, 0, 2, 2])
+        second = self.polys.put(1, [5, 5, 6, 5, 6, 6])
+        self.assertEqual(self.polys.end(), [second])
+        self.polys.begin()
+        self.polys.put(1, [5, 5, 6, 5, 6, 6])
+        self.assertEqual(self.polys.end(), [])
+
+    def test_partial_frame_leaves_other_layers(self) -> None:
+        self._frame([(0, [0, 0, 1, 0, 1, 1], {})], {0: "A"})
+        self.scene.begin_frame([self.labels])
+        self.scene.end_frame([self.labels])
+        self.assertEqual(len(self.polys), 1)
+        self.assertEqual(len(self.labels), 0)
+        self.polys.clear()
+        self.assertEqual(len(self.polys), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+import unittest
+from unittest import mock
+
+from app.ui.scene import ALL_LAYERS, LAYER_GEOMETRY, LAYER_HOVER, LAYER_LABELS
+from app.ui.scheduler import RenderScheduler
+from tests.helpers import FakeTk
+
+
+class RenderSchedulerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tk = FakeTk()
+        patcher = mock.patch("app.ui.scheduler.time.perf_counter", self.tk.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.renders = []
+        self.scheduler = RenderScheduler(self.tk, lambda dirty: self.renders.append((self.tk.now_ms, dirty)),  # type: ignore[arg-type]
+                                         min_interval_ms=16)
+
+    def test_requests_coalesce(self) -> None:
+        self.scheduler.mark_dirty(LAYER_HOVER)
+        self.scheduler.mark_dirty(LAYER_GEOMETRY)
+        self.scheduler.mark_dirty(LAYER_HOVER)
+        self.assertEqual(self.tk.pending, 1)
+        self.tk.run_pending()
+        self.assertEqual([d for _t, d in self.renders], [{LAYER_HOVER, LAYER_GEOMETRY}])
+        self.assertEqual(self.scheduler.dirty, set())
+
+    def test_no_arguments_means_everything(self) -> None:
+        self.scheduler.mark_dirty()
+        self.tk.run_pending()
+        self.assertEqual(self.renders[0][1], set(ALL_LAYERS))
+
+    def test_rate_limited(self) -> None:
+        self.tk.now_ms = 1000.0
+        self.scheduler.mark_dirty(LAYER_HOVER)
+        self.tk.run_pending()
+        self.tk.now_ms += 5.0
+        self.scheduler.mark_dirty(LAYER_HOVER)
+        self.tk.run_pending()
+        first, second = (t for t, _d in self.renders)
+        self.assertGreaterEqual(second - first, 16.0)
+
+    def test_clean_drops_pending_work(self) -> None:
+        self.scheduler.mark_dirty(LAYER_GEOMETRY, LAYER_LABELS)
+        self.scheduler.clean({LAYER_GEOMETRY})
+        self.assertEqual(self.scheduler.dirty, {LAYER_LABELS})
+        self.scheduler.clean({LAYER_LABELS})
+        self.assertEqual(self.tk.pending, 0)
+        self.tk.run_pending()
+        self.assertEqual(self.renders, [])
+
+    def test_flush_renders_now(self) -> None:
+        self.scheduler.mark_dirty(LAYER_HOVER)
+        self.scheduler.flush()
+        self.assertEqual([d for _t, d in self.renders], [{LAYER_HOVER}])
+        self.assertEqual(self.tk.pending, 0)
+        self.scheduler.flush()  # nothing dirty: no render
+        self.assertEqual(len(self.renders), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+import random
+import string
+import unittest
+
+from app.core.search import SiteSearch, tokens
+
+POINTS = {
+    0: [(50.1, 26.3, "Dammam", "EPS", {"Dammam APP": "Main 121.100 MHz"}, {}),
+        (49.6, 25.4, "Hofuf", "EPS", {"Riyadh Control": "Main/Standby 128.100 MHz"}, {})],
+    1: [(46.7, 24.7, "Riyadh", "CPS", {"Riyadh Control": "Main 125.850 MHz, 243.000 MHz"}, {}),
+        (41.7, 27.5, "Hail", "NPS", {"Hail APP": "Main 119.500 MHz"}, {}),
+        (53.8, 22.5, "Shaybah", "EPS", {}, {})],
+}
+
+
+class SiteSearchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.search = SiteSearch.build(POINTS)
+
+    def _names(self, text: str, limit: int = 10):
+        return [h.site for h in self.search.query(text, limit)]
+
+    def test_tokens(self) -> None:
+        self.assertEqual(tokens("Main/Standby 128.100 MHz"), ["main", "standby", "128.1", "mhz"])
+        self.assertEqual(tokens("Al-Jouf_2"), ["al", "jouf", "2"])
+        self.assertEqual(tokens("121.000"), ["121"])
+
+    def test_prefixes(self) -> None:
+        self.assertEqual(self._names("riy")[0], "Riyadh")
+        self.assertEqual(self._names("h")[0], "Hail")  # a whole-word prefix, ties by name
+        self.assertEqual(self._names("hai")[0], "Hail")
+        self.assertNotIn("Shaybah", self._names("hai")[:1])
+
+    def test_typo(self) -> None:
+        self.assertEqual(self._names("dammma")[0], "Dammam")
+
+    def test_sector_and_frequency_fields(self) -> None:
+        self.assertEqual(set(self._names("EPS")), {"Dammam", "Hofuf", "Shaybah"})
+        self.assertEqual(self._names("128.1")[0], "Hofuf")
+        self.assertEqual(self._names("128.100")[0], "Hofuf")
+        # a name match outranks the same words in another site's frequency list
+        self.assertEqual(self._names("riyadh")[:2], ["Riyadh", "Hofuf"])
+
+    def test_hit_points_back_at_the_layer(self) -> None:
+        (hit,) = self.search.query("Hail", limit=1)
+        self.assertEqual((hit.ring, hit.index, hit.sector_id, hit.lon, hit.lat), (1, 1, "NPS", 41.7, 27.5))
+        self.assertEqual(len(self.search), 5)
+        self.assertEqual(len(self.search.query("a", limit=2)), 2)
+        self.assertEqual(self.search.query(" - "), [])
+        self.assertEqual(self.search.query("zzzz"), [])
+
+
+class _CountingList(list):
+    """A list that counts its item reads."""
+    reads = 0
+
+    def __getitem__(self, i):
+        self.reads += 1
+        return super().__getitem__(i)
+
+
+class CommonGramTest(unittest.TestCase):
+    """A few thousand sites that all carry the guard frequency and share five sector IDs."""
+
+    def setUp(self) -> None:
+        rng = random.Random(9)
+        self.sectors = {}
+        points = {}
+        for ring in range(5):
+            points[ring] = []
+            for i in range(600):
+                name = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))).title()
+                sector = f"S{rng.randint(1, 5)}"
+                freq = {"Jeddah Control": f"Main {rng.randrange(118000, 137000, 25) / 1000:.3f} MHz, 121.500 MHz"}
+                points[ring].append((40.0, 24.0, name, sector, freq, {}))
+                self.sectors[(ring, i)] = (name, sector)
+        self.search = SiteSearch.build(points)
+        self.search._fields = _CountingList(self.search._fields)
+
+    def _query(self, text: str):
+        self.search._fields.reads = 0
+        hits = self.search.query(text, limit=8)
+        # walking every posting would read each of the 3,000 matching fields
+        self.assertLess(self.search._fields.reads, 100)
+        return hits
+
+    def test_guard_frequency(self) -> None:
+        hits = self._query("121.5")
+        by_name = sorted(self.sectors.values(), key=lambda ns: ns[0].lower())
+        self.assertEqual([h.site for h in hits], [n for n, _s in by_name[:8]])
+        self.assertEqual({h.score for h in hits}, {2.0})
+
+    def test_sector_prefix(self) -> None:
+        hits = self._query("s3")
+        s3 = sorted(n.lower() for n, s in self.sectors.values() if s == "S3")
+        self.assertEqual([h.site.lower() for h in hits], s3[:8])
+        self.assertEqual({h.score for h in hits}, {4.0})
+        self.assertEqual({h.sector_id for h in hits}, {"S3"})
+
+    def test_rare_name_still_found(self) -> None:
+        name, _sector = self.sectors[(3, 123)]
+        self.assertEqual(self.search.query(name.lower(), limit=1)[0].site, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import random
+import unittest
+
+from app.core.separation import ADJACENT, CO_CHANNEL, SeparationAnalyzer
+from app.core.sites import SiteRegistry
+from app.core.spatial import haversine_km
+
+CO_KM, ADJ_KM, CHANNEL = 300.0, 50.0, 25
+CHANNELS = [118000 + CHANNEL * k for k in range(12)] + [121500]
+
+
+def _registry(n: int, rng: random.Random) -> SiteRegistry:
+    points = []
+    for i in range(n):
+        khz = rng.sample(CHANNELS, rng.randint(0, 3))
+        freq = {"Unit": ", ".join(f"{k / 1000:.3f} MHz" for k in khz)}
+        points.append((rng.uniform(36.0, 50.0), rng.uniform(18.0, 30.0), f"s{i}", "", freq, {}))
+    return SiteRegistry.from_points({0: points})
+
+
+def _brute_force(lon, lat, khz):
+    out = set()
+    for a in range(len(lon)):
+        for b in range(a + 1, len(lon)):
+            d = haversine_km(lon[a], lat[a], lon[b], lat[b])
+            for fa in khz[a]:
+                for fb in khz[b]:
+                    if 121500 in (fa, fb):
+                        continue
+                    if fa == fb and d < CO_KM:
+                        out.add((a, b, fa, fb, CO_CHANNEL))
+                    elif fa != fb and abs(fa - fb) <= CHANNEL and d < ADJ_KM:
+                        out.add((a, b, fa, fb, ADJACENT))
+    return out
+
+
+class SeparationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rng = random.Random(13)
+        self.registry = _registry(80, self.rng)
+
+    def _analyzer(self) -> SeparationAnalyzer:
+        return SeparationAnalyzer.from_registry(self.registry, co_channel_km=CO_KM, adjacent_km=ADJ_KM,
+                                                channel_khz=CHANNEL, exempt_mhz=(121.5,))
+
+    @staticmethod
+    def _keys(conflicts):
+        return {(c.a, c.b, c.khz_a, c.khz_b, c.kind) for c in conflicts}
+
+    def test_matches_brute_force(self) -> None:
+        sites = self.registry.sites
+        want = _brute_force([s.lon for s in sites], [s.lat for s in sites], [s.khz for s in sites])
+        analyzer = self._analyzer()
+        got = analyzer.conflicts()
+        self.assertTrue(want)
+        self.assertEqual(self._keys(got), want)
+        shortfall = [c.distance_km - c.required_km for c in got]
+        self.assertEqual(shortfall, sorted(shortfall))
+        for c in got:
+            self.assertAlmostEqual(c.distance_km, haversine_km(sites[c.a].lon, sites[c.a].lat,
+                                                               sites[c.b].lon, sites[c.b].lat), delta=0.05)
+
+    def test_update_site_matches_brute_force(self) -> None:
+        analyzer = self._analyzer()
+        sites = self.registry.sites
+        lon, lat, khz = [s.lon for s in sites], [s.lat for s in sites], [s.khz for s in sites]
+        for _ in range(25):
+            i = self.rng.randrange(len(sites))
+            lon[i], lat[i] = self.rng.uniform(36.0, 50.0), self.rng.uniform(18.0, 30.0)
+            khz[i] = tuple(sorted(self.rng.sample(CHANNELS, self.rng.randint(0, 3))))
+            mine = analyzer.update_site(i, lon[i], lat[i], khz[i])
+            want = _brute_force(lon, lat, khz)
+            self.assertEqual(self._keys(analyzer.conflicts()), want)
+            self.assertEqual(self._keys(mine), {k for k in want if i in (k[0], k[1])})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+import random
+import unittest
+
+from app.core.models import GeometryStore
+from app.core.simplify import MIN_RING_POINTS, LodPyramid, simplify_ring, simplify_store_levels
+from tests.helpers import flat, seg_dist, star_ring
+
+
+class DouglasPeuckerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(11)
+        # long enough rings take the NumPy farthest-point path when it is available
+        self.rings = [flat(star_ring(46.0, 24.0, 1.0, n, rng)) for n in (12, 80, 600)]
+
+    def _assert_within(self, ring, kept, tolerance: float) -> None:
+        pts = list(zip(ring[0::2], ring[1::2]))
+        out = list(zip(kept[0::2], kept[1::2]))
+        # kept vertices are a subsequence of the ring's, endpoints included
+        idx, j = [], 0
+        for p in out:
+            while pts[j] != p:
+                j += 1
+            idx.append(j)
+            j += 1
+        self.assertEqual(idx[0], 0)
+        self.assertEqual(idx[-1], len(pts) - 1)
+        # every dropped vertex lies within `tolerance` of the segment replacing it
+        for a, b in zip(idx, idx[1:]):
+            for i in range(a + 1, b):
+                self.assertLessEqual(seg_dist(*pts[i], *pts[a], *pts[b]), tolerance + 1e-12)
+
+    def test_error_bound(self) -> None:
+        for ring in self.rings:
+            for tol in (0.0005, 0.01, 0.05, 0.2, 5.0):
+                kept = simplify_ring(ring, tol)
+                self.assertGreaterEqual(len(kept) // 2, min(MIN_RING_POINTS, len(ring) // 2))
+                self._assert_within(ring, kept, tol)
+
+    def test_levels_match_single_tolerance(self) -> None:
+        store = GeometryStore.from_rings([list(zip(r[0::2], r[1::2])) for r in self.rings])
+        tols = [0.001, 0.01, 0.1]
+        for tol, level in zip(tols, simplify_store_levels(store, tols)):
+            self.assertEqual(len(level), len(store))
+            for r in range(len(store)):
+                self.assertEqual(level.ring_coords(r).tolist(), list(simplify_ring(store.ring_coords(r).tolist(), tol)))
+
+    def test_pyramid_levels_shrink(self) -> None:
+        store = GeometryStore.from_rings([list(zip(r[0::2], r[1::2])) for r in self.rings])
+        lod = LodPyramid(store, (0.1, 0.001, 0.01), 0.75)
+        self.assertEqual(lod.tolerances, (0.001, 0.01, 0.1))
+        sizes = [s.n_vertices for _t, s in lod.levels]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertEqual(len(set(sizes)), len(sizes))
+        self.assertIs(lod.for_scale(1e9), store)
+
+
+if __name__ == "__main__":
+    unittest.main()
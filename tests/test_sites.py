@@ -0,0 +1,90 @@
+from __future__ import annotations
+import unittest
+
+from app.core.sites import SiteRegistry, control_units, parse_frequencies, to_khz
+
+
+class FrequencyParsingTest(unittest.TestCase):
+    def test_parse_frequencies(self) -> None:
+        self.assertEqual(parse_frequencies("Main/Standby 121.500 MHz; 243.000 MHz"), [121500, 243000])
+        self.assertEqual(parse_frequencies("Main 128.1MHz, Standby 134 mhz"), [128100, 134000])
+        self.assertEqual(parse_frequencies("118.0255 MHz"), [118026])
+        self.assertEqual(parse_frequencies("VHF 121.500"), [])
+        self.assertEqual(parse_frequencies(""), [])
+        self.assertEqual(parse_frequencies(None), [])
+
+    def test_to_khz(self) -> None:
+        self.assertEqual(to_khz(121.5), 121500)
+        self.assertEqual(to_khz(128.1), 128100)  # not 128099 from float noise
+        self.assertEqual(to_khz("121.500"), 121500)
+        self.assertEqual(to_khz("121.500 MHz"), 121500)
+        self.assertEqual(to_khz(" 243 mhz "), 243000)
+        with self.assertRaises(ValueError):
+            to_khz("VHF")
+
+
+class SiteRegistryTest(unittest.TestCase):
+    POINTS = {
+        0: [(50.1, 26.3, "Dammam", "EPS", {"Dammam APP": "Main 121.100 MHz"},
+             {"Primary": "SEC", "Back-up": "Sans Generator, SANS UPS"}),
+            (49.6, 25.4, "Hofuf", "EPS", {"Riyadh Control": "Main/Standby 128.100 MHz, 134.000 MHz"},
+             {"Backup": "Sans UPS"})],
+        1: [(46.7, 24.7, "Riyadh", "CPS", {"Riyadh Control": "Main 125.850 MHz"}, {"Primary": "SEC"})],
+    }
+
+    def setUp(self) -> None:
+        self.reg = SiteRegistry.from_points(self.POINTS)
+
+    def _names(self, sites):
+        return [s.name for s in sites]
+
+    def test_sites(self) -> None:
+        self.assertEqual(len(self.reg), 3)
+        riyadh = self.reg.sites[2]
+        self.assertEqual((riyadh.id, riyadh.ring, riyadh.index, riyadh.sector_id), (2, 1, 0, "CPS"))
+        self.assertEqual(self.reg.sites[1].khz, (128100, 134000))
+        self.assertEqual(self.reg.sites[0].power, (("primary", "sec"), ("backup", "sans generator"), ("backup", "sans ups")))
+
+    def test_lookups(self) -> None:
+        reg = self.reg
+        self.assertEqual(self._names(reg.by_name("dammam")), ["Dammam"])
+        self.assertEqual(self._names(reg.by_sector("eps")), ["Dammam", "Hofuf"])
+        self.assertEqual(self._names(reg.by_unit("RIYADH control")), ["Hofuf", "Riyadh"])
+        self.assertEqual(self._names(reg.on_frequency(128.1)), ["Hofuf"])
+        self.assertEqual(self._names(reg.on_frequency("134.000 MHz")), ["Hofuf"])
+        self.assertEqual(reg.on_frequency("118.000"), [])
+
+    def test_band(self) -> None:
+        self.assertEqual(self._names(self.reg.in_band(125, "128.100")), ["Hofuf", "Riyadh"])
+        self.assertEqual(self._names(self.reg.in_band("121.1", 121.1)), ["Dammam"])
+        self.assertEqual(self.reg.in_band(130, 133), [])
+
+    def test_power(self) -> None:
+        reg = self.reg
+        self.assertEqual(self._names(reg.by_power("SANS UPS")), ["Dammam", "Hofuf"])
+        self.assertEqual(self._names(reg.by_power("sans ups", role="Back-up")), ["Dammam", "Hofuf"])
+        self.assertEqual(self._names(reg.by_power("SEC", role="primary")), ["Dammam", "Riyadh"])
+        self.assertEqual(reg.by_power("SEC", role="backup"), [])
+
+    def test_listings(self) -> None:
+        self.assertEqual(self.reg.sectors(), ["CPS", "EPS"])
+        self.assertEqual(self.reg.frequencies(), [121100, 125850, 128100, 134000])
+        self.assertEqual(self.reg.power_sources(), ["sans generator", "sans ups", "sec"])
+
+    def test_numbered_and_shared_units(self) -> None:
+        reg = SiteRegistry.from_points({0: [
+            (41.6, 27.4, "Hail", "NRS", {"Hail APP (2)": "Standby 119.000 MHz"}, {}),
+            (39.2, 21.7, "KFIA", "WRS", {"Jeddah/Riyadh Control": "Main 132.300 MHz"}, {}),
+            (38.7, 26.6, "Layla", "WRS", {"Jeddah Control (2)": "Main 124.100 MHz"}, {}),
+        ]})
+        self.assertEqual(control_units("Jeddah Control (2)"), ["Jeddah Control"])
+        self.assertEqual(control_units("Jeddah/Riyadh Control"), ["Jeddah Control", "Riyadh Control"])
+        self.assertEqual(self._names(reg.by_unit("Jeddah Control")), ["KFIA", "Layla"])
+        self.assertEqual(self._names(reg.by_unit("riyadh control")), ["KFIA"])
+        self.assertEqual(self._names(reg.by_unit("Hail APP")), ["Hail"])
+        self.assertEqual(self._names(reg.by_unit("Jeddah Control (2)")), ["KFIA", "Layla"])
+        self.assertEqual(reg.units(), ["Hail APP", "Jeddah Control", "Riyadh Control"])
+
+
+if __name__ == "__main__":
+    unittest.main()
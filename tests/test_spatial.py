@@ -0,0 +1,62 @@
+from __future__ import annotations
+import random
+import unittest
+
+from app.core.models import Bounds
+from app.core.spatial import SiteIndex, haversine_km
+
+
+def _points(n: int, rng: random.Random):
+    pts = [(rng.uniform(34.0, 56.0), rng.uniform(16.0, 33.0), f"s{i}", "", {}, {}) for i in range(n)]
+    pts.append(pts[5])  # a duplicate location
+    return pts
+
+
+class SiteIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rng = random.Random(7)
+        self.points = _points(300, self.rng)
+        self.index = SiteIndex(self.points)
+
+    def _linear(self, lon: float, lat: float):
+        return sorted((haversine_km(lon, lat, p[0], p[1]), i) for i, p in enumerate(self.points))
+
+    def test_nearest_matches_linear_scan(self) -> None:
+        for _ in range(100):
+            lon, lat = self.rng.uniform(30.0, 60.0), self.rng.uniform(12.0, 36.0)
+            want = self._linear(lon, lat)
+            for k in (1, 5):
+                got = self.index.nearest(lon, lat, k)
+                self.assertEqual(len(got), k)
+                for (gd, _gi), (wd, _wi) in zip(got, want[:k]):
+                    self.assertAlmostEqual(gd, wd, places=6)
+            got = self.index.nearest(lon, lat, 3, max_km=150.0)
+            self.assertEqual([round(d, 6) for d, _i in got], [round(d, 6) for d, _i in want[:3] if d <= 150.0])
+
+    def test_within_radius_matches_linear_scan(self) -> None:
+        for _ in range(100):
+            lon, lat = self.rng.uniform(30.0, 60.0), self.rng.uniform(12.0, 36.0)
+            radius = self.rng.uniform(0.0, 400.0)
+            want = {i for d, i in self._linear(lon, lat) if d <= radius - 1e-6}
+            near_edge = {i for d, i in self._linear(lon, lat) if abs(d - radius) <= 1e-6}
+            got = self.index.within_radius(lon, lat, radius)
+            self.assertEqual([d for d, _i in got], sorted(d for d, _i in got))
+            self.assertEqual({i for _d, i in got} - near_edge, want)
+
+    def test_within_bbox_matches_linear_scan(self) -> None:
+        for _ in range(100):
+            a, b = sorted(self.rng.uniform(32.0, 58.0) for _ in range(2))
+            c, d = sorted(self.rng.uniform(14.0, 34.0) for _ in range(2))
+            box = Bounds(a, b, c, d)
+            want = [i for i, p in enumerate(self.points) if a <= p[0] <= b and c <= p[1] <= d]
+            self.assertEqual(self.index.within_bbox(box), want)
+
+    def test_empty(self) -> None:
+        index = SiteIndex([])
+        self.assertEqual(index.nearest(46.0, 24.0), [])
+        self.assertEqual(index.within_radius(46.0, 24.0, 100.0), [])
+        self.assertEqual(index.within_bbox(Bounds(0.0, 90.0, 0.0, 60.0)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
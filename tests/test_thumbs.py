@@ -0,0 +1,106 @@
+from __future__ import annotations
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.core import thumbs
+from app.core.thumbs import ThumbnailCache, ThumbnailLoader, decode_thumbnail
+
+
+@unittest.skipUnless(thumbs._PIL_AVAILABLE, "thumbnails need Pillow")
+class ThumbnailTest(unittest.TestCase):
+    def setUp(self) -> None:
+        from PIL import Image
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.images = []
+        for i, (size, fmt) in enumerate((((1200, 600), "JPEG"), ((300, 900), "PNG"), ((80, 40), "PNG"))):
+            path = self.dir / f"img{i}.{fmt.lower()}"
+            Image.new("RGB", size, (200, 40 * i, 10)).save(path, format=fmt)
+            self.images.append(os.fspath(path))
+        self.cache = ThumbnailCache(1 << 20, self.dir / "thumbs")
+        patcher = mock.patch.object(thumbs, "thumbnail_cache", lambda: self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_decode_fits_the_box(self) -> None:
+        self.assertEqual(decode_thumbnail(self.images[0], 140, 100).size, (140, 70))
+        self.assertEqual(decode_thumbnail(self.images[1], 140, 100).size, (33, 100))
+        self.assertEqual(decode_thumbnail(self.images[2], 140, 100).size, (80, 40))  # never enlarged
+
+    def test_loader_decodes_on_workers(self) -> None:
+        loader = ThumbnailLoader(max_workers=2)
+        self.addCleanup(loader.shutdown)
+        release = threading.Event()
+        threads = []
+
+        def slow(path, max_w, max_h):
+            threads.append(threading.current_thread())
+            release.wait(10)
+            return decode_thumbnail(path, max_w, max_h)
+
+        with mock.patch.object(self.cache, "fetch", side_effect=slow):
+            first = loader.submit(self.images[0], 140, 100)
+            self.assertIs(loader.submit(self.images[0], 140, 100), first)
+            other = loader.submit(self.images[0], 70, 50)
+            self.assertIsNot(other, first)
+            release.set()
+            self.assertEqual(first.result(timeout=10).size, (140, 70))
+            self.assertEqual(other.result(timeout=10).size, (70, 35))
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_cache_round_trip(self) -> None:
+        first = self.cache.fetch(self.images[0], 140, 100)
+        self.assertEqual(len(list(self.cache.dir.glob("*.png"))), 1)
+        with mock.patch.object(thumbs, "decode_thumbnail", side_effect=AssertionError("decoded again")):
+            again = self.cache.fetch(self.images[0], 140, 100)
+            self.assertEqual(ThumbnailLoader.cached(self.images[0], 140, 100).size, first.size)
+        self.assertEqual(again.size, first.size)
+        self.assertEqual(again.getpixel((5, 5)), first.getpixel((5, 5)))
+        self.assertIsNone(ThumbnailLoader.cached(self.images[0], 70, 50))
+
+    def test_key_follows_the_source(self) -> None:
+        key = ThumbnailCache.key(self.images[1], 140, 100)
+        self.assertEqual(ThumbnailCache.key(self.images[1], 140, 100), key)
+        self.assertNotEqual(ThumbnailCache.key(self.images[1], 140, 100, variant="logo"), key)
+        self.assertNotEqual(ThumbnailCache.key(self.images[1], 70, 50), key)
+        st = os.stat(self.images[1])
+        os.utime(self.images[1], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertNotEqual(ThumbnailCache.key(self.images[1], 140, 100), key)
+        self.assertIsNone(ThumbnailCache.key(os.fspath(self.dir / "missing.png"), 140, 100))
+
+    def test_least_recently_used_are_evicted(self) -> None:
+        keys = [ThumbnailCache.key(p, 140, 100) for p in self.images]
+        for p in self.images:
+            self.cache.fetch(p, 140, 100)
+        sizes = {k: (self.cache.dir / f"{k}.png").stat().st_size for k in keys}
+        self.assertIsNotNone(self.cache.get(keys[0]))  # now the most recent
+        # a cache in a new process: the order comes from file mtimes
+        small = ThumbnailCache(sizes[keys[0]] + sizes[keys[2]], self.cache.dir)
+        small.put(keys[2], self.cache.get(keys[2]))
+        on_disk = {p.stem for p in self.cache.dir.glob("*.png")}
+        self.assertEqual(on_disk, {keys[0], keys[2]})
+
+
+class LoaderLifetimeTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        thumbs.shutdown_thumbnail_loader()
+
+    def test_shutdown_without_a_loader_creates_none(self) -> None:
+        thumbs.shutdown_thumbnail_loader()
+        self.assertIsNone(thumbs._loader)
+
+    def test_shutdown_and_restart(self) -> None:
+        first = thumbs.thumbnail_loader()
+        self.assertIs(thumbs.thumbnail_loader(), first)
+        thumbs.shutdown_thumbnail_loader()
+        self.assertIsNone(thumbs._loader)
+        self.assertIsNot(thumbs.thumbnail_loader(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()